@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析上下文
+
+一次分析所涉及的全部路径：老师/学生视频、部件标注图片目录、输出目录。
+分析器只通过上下文解析相对路径，不依赖进程当前工作目录（os.chdir），
+因此同一进程内可以同时运行多个互不干扰的分析任务。
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class AnalysisContext:
+    """一次分析的路径上下文（所有路径在创建时转换为绝对路径）"""
+
+    teacher_video: Optional[str] = None
+    student_video: Optional[str] = None
+    template_dir: str = '.'
+    output_dir: str = '.'
+
+    def __post_init__(self):
+        for field_name in ('teacher_video', 'student_video', 'template_dir', 'output_dir'):
+            value = getattr(self, field_name)
+            if value is not None:
+                object.__setattr__(self, field_name, os.path.abspath(value))
+
+    @classmethod
+    def from_directory(cls, base_dir: str = '.', output_dir: Optional[str] = None) -> 'AnalysisContext':
+        """按原有目录约定创建上下文：base_dir下的 teacher.mp4、student.mp4 和 part*.png"""
+        return cls(
+            teacher_video=os.path.join(base_dir, 'teacher.mp4'),
+            student_video=os.path.join(base_dir, 'student.mp4'),
+            template_dir=base_dir,
+            output_dir=output_dir or base_dir
+        )
+
+    def video_path(self, video_type: str) -> str:
+        """获取 'teacher' 或 'student' 视频的路径"""
+        path = self.teacher_video if video_type == 'teacher' else self.student_video
+        if path is None:
+            raise ValueError(f"分析上下文中未设置 {video_type} 视频路径")
+        return path
+
+    def template_path(self, part_file: str) -> str:
+        """解析部件标注图片路径（相对路径相对于template_dir）"""
+        return os.path.join(self.template_dir, part_file)
+
+    def output_path(self, name: str) -> str:
+        """解析输出文件或目录路径（相对路径相对于output_dir）"""
+        return os.path.join(self.output_dir, name)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检测结果标注渲染
+
+逐个检测调用 draw_chinese_text 时，每个标签都要把整帧转换为PIL图像再转换回NumPy（两次整帧复制）。
+这里把一帧的全部标注合并为一次绘制：
+- 边界框和置信度文字用OpenCV直接画在NumPy帧上
+- 中文部件名称要么在一次PIL转换中全部绘制，
+  要么（启用字形缓存时）使用预先栅格化的标签位图直接在NumPy帧上做alpha混合，完全不经过PIL整帧转换
+中文标签在所有边界框之后绘制，不会被相邻部件的边界框压住。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from font_registry import FontRegistry, font_registry as default_font_registry
+
+
+class AnnotationRenderer:
+    """把一帧的全部检测结果（边界框、中文名称、置信度）一次性绘制到帧上"""
+
+    def __init__(self, fonts: Optional[FontRegistry] = None, glyph_cache: bool = True,
+                 glyph_cache_size: int = 256, font_size: int = 30, box_thickness: int = 3):
+        """
+        Args:
+            fonts: 字体仓库，默认使用进程内共享的字体仓库
+            glyph_cache: 是否缓存栅格化的标签位图并用alpha混合绘制
+            glyph_cache_size: 最多缓存的标签位图数量（按 (文字, 字号) 区分，LRU淘汰）
+            font_size: 中文标签字号
+            box_thickness: 边界框线宽
+        """
+        self.fonts = fonts or default_font_registry
+        self.glyph_cache = glyph_cache
+        self.glyph_cache_size = glyph_cache_size
+        self.font_size = font_size
+        self.box_thickness = box_thickness
+        self._glyphs: 'OrderedDict[Tuple[str, int], Tuple[int, int, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _rasterize(self, text: str, font_size: int) -> Optional[Tuple[int, int, np.ndarray]]:
+        """栅格化标签：返回 (相对绘制位置的x偏移, y偏移, alpha位图 float32 0~1)"""
+        font = self.fonts.get(font_size)
+        if font is None:
+            return None
+        left, top, right, bottom = font.getbbox(text)
+        width, height = max(right - left, 1), max(bottom - top, 1)
+        mask = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        alpha = np.asarray(mask, dtype=np.float32) / 255.0
+        return left, top, alpha
+
+    def glyph(self, text: str, font_size: int) -> Optional[Tuple[int, int, np.ndarray]]:
+        """获取缓存的标签位图（不存在时栅格化并缓存）"""
+        key = (text, font_size)
+        with self._lock:
+            cached = self._glyphs.get(key)
+            if cached is not None:
+                self._glyphs.move_to_end(key)
+                return cached
+        glyph = self._rasterize(text, font_size)
+        if glyph is None:
+            return None
+        with self._lock:
+            self._glyphs[key] = glyph
+            while len(self._glyphs) > self.glyph_cache_size:
+                self._glyphs.popitem(last=False)
+        return glyph
+
+    @staticmethod
+    def _blend(frame: np.ndarray, glyph: Tuple[int, int, np.ndarray], position: Tuple[int, int],
+               color: Sequence[int]) -> None:
+        """把标签位图按alpha混合到帧上（超出帧的部分裁掉）"""
+        offset_x, offset_y, alpha = glyph
+        x0, y0 = position[0] + offset_x, position[1] + offset_y
+        height, width = alpha.shape
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + width, frame.shape[1]), min(y0 + height, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        a = alpha[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0, None]
+        region = frame[fy0:fy1, fx0:fx1].astype(np.float32)
+        region += (np.asarray(color, dtype=np.float32) - region) * a
+        frame[fy0:fy1, fx0:fx1] = np.rint(region).astype(np.uint8)
+
+    def render(self, frame: np.ndarray, detections: List[Dict], colors: Sequence[Sequence[int]]) -> np.ndarray:
+        """在帧的副本上绘制全部检测结果，返回RGB帧
+
+        Args:
+            frame: RGB帧（单通道帧会先转换为RGB）
+            detections: 检测结果列表，包含 name、bbox (x1, y1, x2, y2)、confidence
+            colors: 按检测序号循环使用的颜色
+        """
+        if frame.ndim == 2:
+            result = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+        else:
+            result = frame.copy()
+
+        labels = []
+        for i, detection in enumerate(detections):
+            x1, y1, x2, y2 = detection['bbox']
+            color = colors[i % len(colors)]
+
+            # 边界框和置信度（英文数字，OpenCV直接绘制）
+            cv2.rectangle(result, (x1, y1), (x2, y2), color, self.box_thickness)
+            cv2.putText(result, f"{detection['confidence']:.3f}", (x1, y2 + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+            labels.append((detection['name'], (x1, max(30, y1 - 10)), color))
+
+        if not labels:
+            return result
+
+        if self.glyph_cache:
+            glyphs = [self.glyph(text, self.font_size) for text, _, _ in labels]
+            if all(glyph is not None for glyph in glyphs):
+                for glyph, (_, position, color) in zip(glyphs, labels):
+                    self._blend(result, glyph, position, color)
+                return result
+
+        font = self.fonts.get(self.font_size)
+        if font is None:
+            # 没有任何可用字体时退回OpenCV绘制
+            for text, position, color in labels:
+                cv2.putText(result, text, position, cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+            return result
+
+        # 一次转换，绘制全部标签，再转换回NumPy
+        image = Image.fromarray(result)
+        draw = ImageDraw.Draw(image)
+        for text, position, color in labels:
+            draw.text(position, text, font=font, fill=tuple(color))
+        return np.array(image)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._glyphs.clear()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部件模板特征描述子库
+
+把所有部件模板的SIFT/ORB描述子合并为一个描述子库：
+- 模板描述子只在建库时计算一次（来自TemplateStore的预计算结果）
+- 目标帧的特征点每帧只检测一次，所有部件共享
+- SIFT每帧只做一次批量knn匹配（全部模板描述子一起查询目标帧），再按模板归类做单应性估计
+
+匹配方向与feature_based_matching一致（模板特征点 -> 目标帧特征点），
+比率测试语义不变；若反过来以模板库建FLANN索引、用目标帧查询，
+比率测试会在不同模板之间比较，实测会让部分部件定位到错误位置。
+匹配本身只占单帧耗时的很小一部分，因此使用精确的暴力匹配。
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from template_store import create_feature_detector
+
+logger = logging.getLogger('analyzer.descriptor_bank')
+
+# Lowe比率测试阈值（与feature_based_matching保持一致）
+RATIO_TEST = 0.75
+
+# 单应性估计所需的最少匹配点数
+MIN_MATCH_COUNT = 4
+
+
+class DescriptorBank:
+    """部件模板特征描述子库"""
+
+    def __init__(self, template_entries: Dict[str, Dict]):
+        """
+        Args:
+            template_entries: 部件键 -> TemplateStore条目（需包含keypoints/descriptors/detector/template）
+        """
+        self.detector, self.detector_name = create_feature_detector()
+
+        self.keys: List[str] = []
+        self.template_keypoints: Dict[str, List] = {}
+        self.template_sizes: Dict[str, Tuple[int, int]] = {}
+
+        descriptors = []
+        labels = []
+        local_indices = []
+        for key, entry in template_entries.items():
+            des = entry.get('descriptors')
+            if des is None or len(des) == 0 or entry.get('detector') != self.detector_name:
+                continue
+            label = len(self.keys)
+            self.keys.append(key)
+            self.template_keypoints[key] = entry['keypoints']
+            h, w = entry['template'].shape[:2]
+            self.template_sizes[key] = (w, h)
+            descriptors.append(des)
+            labels.append(np.full(len(des), label, dtype=np.int32))
+            local_indices.append(np.arange(len(des), dtype=np.int32))
+
+        self.descriptors = None
+        if descriptors:
+            self.descriptors = np.vstack(descriptors)
+            self.labels = np.concatenate(labels)
+            self.local_indices = np.concatenate(local_indices)
+
+    def compute_frame_features(self, target_img: np.ndarray):
+        """检测目标帧的特征点和描述子（每帧一次）"""
+        return self.detector.detectAndCompute(target_img, None)
+
+    def match_frame(self, target_img: np.ndarray, frame_features=None) -> Dict[str, Optional[Dict]]:
+        """对一帧做一次匹配，返回 部件键 -> 匹配结果（结构同feature_based_matching）"""
+        results: Dict[str, Optional[Dict]] = {key: None for key in self.keys}
+        if self.descriptors is None:
+            return results
+
+        if frame_features is None:
+            frame_features = self.compute_frame_features(target_img)
+        frame_keypoints, frame_descriptors = frame_features
+        if frame_descriptors is None or len(frame_descriptors) < 2:
+            return results
+
+        logger.debug("%s描述子库: %d 个模板共 %d 个描述子, 目标图像特征点: %d",
+                     self.detector_name, len(self.keys), len(self.descriptors), len(frame_keypoints))
+
+        if self.detector_name == "SIFT":
+            good_matches = self._match_sift(frame_descriptors)
+        else:
+            good_matches = self._match_orb(frame_descriptors)
+
+        for label, pairs in good_matches.items():
+            key = self.keys[label]
+            results[key] = self._estimate_box(key, pairs, frame_keypoints)
+
+        return results
+
+    def _match_sift(self, frame_descriptors) -> Dict[int, List[Tuple[int, int]]]:
+        """全部模板描述子一次性查询目标帧，按模板归类通过比率测试的匹配 (模板特征点下标, 帧特征点下标)"""
+        good_matches: Dict[int, List[Tuple[int, int]]] = {}
+        matches = cv2.BFMatcher().knnMatch(self.descriptors, frame_descriptors, k=2)
+        for query_idx, match_pair in enumerate(matches):
+            if len(match_pair) != 2:
+                continue
+            m, n = match_pair
+            if m.distance < RATIO_TEST * n.distance:
+                label = int(self.labels[query_idx])
+                good_matches.setdefault(label, []).append((int(self.local_indices[query_idx]), m.trainIdx))
+        return good_matches
+
+    def _match_orb(self, frame_descriptors) -> Dict[int, List[Tuple[int, int]]]:
+        """ORB交叉验证需按模板分别匹配（与feature_based_matching一致，取距离最小的50个）"""
+        good_matches: Dict[int, List[Tuple[int, int]]] = {}
+        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        for label in range(len(self.keys)):
+            template_descriptors = self.descriptors[self.labels == label]
+            matches = sorted(bf.match(template_descriptors, frame_descriptors), key=lambda x: x.distance)[:50]
+            good_matches[label] = [(m.queryIdx, m.trainIdx) for m in matches]
+        return good_matches
+
+    def _estimate_box(self, key: str, pairs: List[Tuple[int, int]], frame_keypoints) -> Optional[Dict]:
+        if len(pairs) < MIN_MATCH_COUNT:
+            return None
+
+        template_keypoints = self.template_keypoints[key]
+        src_pts = np.float32([template_keypoints[t].pt for t, _ in pairs]).reshape(-1, 1, 2)
+        dst_pts = np.float32([frame_keypoints[f].pt for _, f in pairs]).reshape(-1, 1, 2)
+
+        M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+        if M is None:
+            return None
+
+        w, h = self.template_sizes[key]
+        corners = np.float32([[0, 0], [w, 0], [w, h], [0, h]]).reshape(-1, 1, 2)
+        transformed_corners = cv2.perspectiveTransform(corners, M)
+
+        x_coords = transformed_corners[:, 0, 0]
+        y_coords = transformed_corners[:, 0, 1]
+        x_min, x_max = int(np.min(x_coords)), int(np.max(x_coords))
+        y_min, y_max = int(np.min(y_coords)), int(np.max(y_coords))
+
+        return {
+            'location': (x_min, y_min),
+            'size': (x_max - x_min, y_max - y_min),
+            'score': np.sum(mask) / len(pairs),
+            'method': f'{self.detector_name}_HOMOGRAPHY'
+        }
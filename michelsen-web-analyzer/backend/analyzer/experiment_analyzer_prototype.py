@@ -7,25 +7,111 @@
 基于现有的video_test.py和imagetest_batch.py代码
 """
 
+import contextvars
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import json
+import logging
+import multiprocessing
+import queue
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta
-from PIL import Image, ImageDraw, ImageFont
-from typing import List, Dict, Any, Optional, Tuple
+from PIL import Image, ImageDraw
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
-# 设置matplotlib支持中文
-plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'WenQuanYi Micro Hei', 'WenQuanYi Zen Hei', 'Noto Sans CJK SC', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+from template_store import TemplateStore
+from descriptor_bank import DescriptorBank
+from fft_correlation import FFTCorrelator
+from analysis_context import AnalysisContext
+from instrumentation import SpanRecorder, timed
+from font_registry import font_registry
+from annotation_renderer import AnnotationRenderer
+from screenshot_compositor import ScreenshotCompositor
+from screenshot_writer import ScreenshotWriter
+
+logger = logging.getLogger('analyzer.experiment_analyzer_prototype')
 
 class MichelsonInterferometerAnalyzer:
     """迈克尔逊干涉仪实验分析器"""
     
-    def __init__(self):
-        """初始化分析器"""
+    # 多尺度模板匹配使用的匹配方法
+    TEMPLATE_MATCH_METHODS = [cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED]
+    
+    # 进度事件阶段 -> 结构化进度中累加的计数
+    PROGRESS_COUNTERS = {
+        'video_frames': 'frames_decoded',
+        'key_frames': 'frames_decoded',
+        'components': 'components_matched',
+        'screenshots': 'screenshots_written'
+    }
+
+    def __init__(self, match_mode: str = 'exhaustive', pyramid_levels: int = 2, pyramid_tolerance: float = 0.05,
+                 match_backend: str = 'opencv', detection_workers: int = 1,
+                 context: Optional[AnalysisContext] = None,
+                 progress_hook: Optional[Callable[[Dict], None]] = None,
+                 screenshot_options: Optional[Dict[str, Any]] = None, screenshot_workers: int = 2,
+                 worker_initializer: Optional[Callable[[], None]] = None):
+        """初始化分析器
+        
+        Args:
+            match_mode: 多尺度模板匹配模式，'exhaustive'为全分辨率穷举搜索，
+                'pyramid'为先在降采样帧上粗搜索、再在全分辨率小区域内精修
+            pyramid_levels: 金字塔模式的降采样层数（每层边长减半）
+            pyramid_tolerance: 金字塔模式下，粗搜索得分与最佳粗得分相差不超过该值的候选都会被精修；
+                越大越接近穷举结果，越小越快
+            match_backend: 整幅图像相关运算的后端，'opencv'为cv2.matchTemplate，
+                'fft'为频域归一化互相关（目标帧频谱在所有尺度和部件间复用，
+                得分与OpenCV的误差见fft_correlation.FFT_SCORE_TOLERANCE）
+            detection_workers: detect_equipment_in_frame中并行检测部件的线程数，
+                1为串行，0或None为使用全部CPU核心
+            context: 分析上下文（视频、部件标注图片目录和输出目录），
+                默认为创建时的当前工作目录
+            progress_hook: 进度回调，分析循环中每处理完一帧、一个部件或一张截图时调用，
+                参数为 {'stage', 'current', 'total', 'time', 'counters', ...} 字典，
+                counters为结构化进度快照（见self.progress）；可能在工作线程中被调用
+            screenshot_options: 步骤截图的编码参数（image_format、quality、png_compression、
+                derivative_widths，见ScreenshotWriter），默认为只写原图的PNG
+            screenshot_workers: 步骤截图后台编码写盘的线程数
+            worker_initializer: 流水线解码/检测子进程启动后首先调用的函数（须可pickle），
+                用于在子进程中配置日志、绑定analysis_id等（spawn启动的子进程不继承父进程的日志配置）
+        """
+        if match_mode not in ('exhaustive', 'pyramid'):
+            raise ValueError(f"不支持的匹配模式: {match_mode}")
+        if match_backend not in ('opencv', 'fft'):
+            raise ValueError(f"不支持的匹配后端: {match_backend}")
+        self.match_mode = match_mode
+        self.match_backend = match_backend
+        self.detection_workers = detection_workers or os.cpu_count() or 1
+        self.context = context or AnalysisContext()
+        self.progress_hook = progress_hook
+        self.worker_initializer = worker_initializer
+        # 结构化进度：计划处理量（由plan_progress设置）和已完成量
+        self.progress = {
+            'frames_planned': 0, 'frames_decoded': 0,
+            'components_planned': 0, 'components_matched': 0,
+            'screenshots_planned': 0, 'screenshots_written': 0
+        }
+        self._progress_lock = threading.Lock()
+        # 热点路径耗时直方图（解码、匹配、绘制、截图），随分析结果一起返回
+        self.timings = SpanRecorder()
+        
+        # 构造参数，供子进程（视频流水线工作进程）重建同配置的分析器
+        self.config = {
+            'match_mode': match_mode,
+            'pyramid_levels': pyramid_levels,
+            'pyramid_tolerance': pyramid_tolerance,
+            'match_backend': match_backend,
+            'detection_workers': detection_workers,
+            'context': self.context,
+            'screenshot_options': dict(screenshot_options or {}),
+            'screenshot_workers': screenshot_workers
+        }
+        self.pyramid_levels = pyramid_levels
+        self.pyramid_tolerance = pyramid_tolerance
+        
         # 预定义的教师实验步骤（标准流程 - 适应1分55秒视频）
         self.teacher_steps = [
             {
@@ -107,10 +193,67 @@ class MichelsonInterferometerAnalyzer:
             (128, 0, 128),  # 紫色
             (255, 165, 0)   # 橙色
         ]
+        
+        # 检测结果标注：一帧的全部边界框和标签一次绘制，标签位图按名称缓存
+        self.annotation_renderer = AnnotationRenderer()
+        # 分析截图合成：标题栏、时间戳和检测说明直接绘制到帧上
+        self.screenshot_compositor = ScreenshotCompositor()
+        # 步骤截图在后台线程中编码写盘，分析线程不等待压缩和磁盘
+        self.screenshot_writer = ScreenshotWriter(workers=screenshot_workers, timings=self.timings,
+                                                  **(screenshot_options or {}))
+        
+        # 部件模板仓库：每个partN.png只读取和提取一次，结果按内容哈希缓存到磁盘
+        self.template_store = TemplateStore(self.extract_template_improved, pyramid_levels=pyramid_levels)
+        
+        # 特征描述子库：按 (部件路径, 内容哈希) 组合缓存，模板不变时复用合并后的模板描述子（暴力匹配，不建索引）
+        self._descriptor_bank = None
+        self._descriptor_bank_key = None
+
+    def plan_progress(self, frames: int = 0, components: int = 0, screenshots: int = 0) -> None:
+        """设置本次分析计划处理的帧数、部件数和截图数，并发出'plan'事件"""
+        with self._progress_lock:
+            self.progress.update(frames_planned=frames, components_planned=components,
+                                 screenshots_planned=screenshots)
+        self.report_progress('plan', 0, frames + components + screenshots)
+
+    def report_progress(self, stage: str, current: int, total: int, **details) -> None:
+        """累加结构化进度，并向progress_hook报告进度事件（回调出错不影响分析）"""
+        with self._progress_lock:
+            counter = self.PROGRESS_COUNTERS.get(stage)
+            if counter is not None:
+                self.progress[counter] += 1
+            snapshot = dict(self.progress)
+        if self.progress_hook is None:
+            return
+        try:
+            self.progress_hook({'stage': stage, 'current': current, 'total': total,
+                                'time': time.time(), 'counters': snapshot, **details})
+        except Exception as e:
+            logger.warning("进度回调失败: %s", e)
 
     def extract_key_frames(self, video_path: str, interval: int = 15) -> List[Dict]:
-        """提取视频关键帧"""
-        print(f"正在分析视频: {video_path}")
+        """提取视频关键帧（全部物化为列表，长视频请使用iter_key_frames）"""
+        return list(self.iter_key_frames(video_path, interval))
+
+    @staticmethod
+    def key_frame_timestamps(fps: float, total_frames: int, interval: int) -> List[int]:
+        """关键帧时间点：每interval秒一帧，超出视频帧数的时间点被忽略"""
+        duration = total_frames / fps
+        return [t for t in range(0, int(duration), interval) if int(t * fps) < total_frames]
+
+    def count_key_frames(self, video_path: str, interval: int = 15) -> int:
+        """iter_key_frames将生成的关键帧数量（只读取视频元数据）"""
+        cap = cv2.VideoCapture(video_path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            cap.release()
+        return len(self.key_frame_timestamps(fps, total_frames, interval)) if fps > 0 else 0
+
+    def iter_key_frames(self, video_path: str, interval: int = 15):
+        """逐个生成视频关键帧，任一时刻只持有一帧图像"""
+        logger.info("正在分析视频: %s", video_path)
         
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -120,30 +263,61 @@ class MichelsonInterferometerAnalyzer:
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration = total_frames / fps
         
-        print(f"视频信息: {total_frames} 帧, {fps:.2f} FPS, 时长: {timedelta(seconds=int(duration))}")
+        logger.info("视频信息: %d 帧, %.2f FPS, 时长: %s", total_frames, fps, timedelta(seconds=int(duration)))
         
-        key_frames = []
-        timestamps = list(range(0, int(duration), interval))
+        timestamps = self.key_frame_timestamps(fps, total_frames, interval)
+        video_path = os.path.abspath(video_path)
         
-        for timestamp in timestamps:
-            frame_number = int(timestamp * fps)
-            if frame_number >= total_frames:
-                continue
-                
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            ret, frame = cap.read()
-            
-            if ret:
-                key_frames.append({
+        try:
+            for timestamp, frame in self.iter_frames_at_timestamps(cap, timestamps, fps):
+                yield {
                     'timestamp': timestamp,
-                    'frame_number': frame_number,
-                    'frame': cv2.cvtColor(frame, cv2.COLOR_BGR2RGB),
+                    'frame_number': int(timestamp * fps),
+                    'frame': frame,
+                    'video_path': video_path,
                     'analysis': None
-                })
+                }
+        finally:
+            cap.release()
+
+    def iter_point_frames(self, points: List[Dict]):
+        """依次生成 (分析点, RGB帧)
+        
+        分析点中保留了帧图像时直接使用；流式分析中被丢弃的帧按 video_path/timestamp
+        重新解码（每个视频只打开一次、顺序读取），任一时刻只持有一帧。
+        生成顺序为：已有帧的分析点按原顺序在前，需重新解码的按时间戳升序在后。
+        无法重新解码的分析点返回的帧为None。
+        """
+        pending: Dict[str, List[Dict]] = {}
+        for point in points:
+            if point.get('frame') is not None:
+                yield point, point['frame']
+            elif point.get('video_path'):
+                pending.setdefault(point['video_path'], []).append(point)
+            else:
+                yield point, None
         
-        cap.release()
-        return key_frames
+        for video_path, video_points in pending.items():
+            by_timestamp: Dict[Any, List[Dict]] = {}
+            for point in video_points:
+                by_timestamp.setdefault(point['timestamp'], []).append(point)
+            
+            cap = cv2.VideoCapture(video_path)
+            try:
+                if cap.isOpened():
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    for timestamp, frame in self.iter_frames_at_timestamps(cap, list(by_timestamp), fps):
+                        for point in by_timestamp.pop(timestamp, []):
+                            yield point, frame
+            finally:
+                cap.release()
+            
+            # 重新解码失败的分析点
+            for remaining in by_timestamp.values():
+                for point in remaining:
+                    yield point, None
 
+    @timed('draw_chinese_text')
     def draw_chinese_text(self, img, text, position, font_size=24, text_color=(0, 0, 255)):
         """Draw Chinese text on image without encoding issues"""
         # 判断输入图像格式并转换为RGB用于PIL
@@ -157,36 +331,12 @@ class MichelsonInterferometerAnalyzer:
         # Create a drawing context
         draw = ImageDraw.Draw(img_pil)
 
-        # 尝试多种字体路径
-        font_paths = [
-            "/usr/share/fonts/truetype/windows/msyh.ttc",  # Microsoft YaHei (Linux)
-            "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",  # WenQuanYi Micro Hei
-            "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",  # WenQuanYi Zen Hei
-            "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",  # Noto Sans CJK
-            "C:/Windows/Fonts/simhei.ttf",  # Windows SimHei
-            "C:/Windows/Fonts/msyh.ttf",    # Windows Microsoft YaHei
-            "C:/Windows/Fonts/simsun.ttc",  # Windows SimSun
-            "/System/Library/Fonts/PingFang.ttc",  # macOS
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"  # Linux fallback
-        ]
-        
-        font = None
-        for font_path in font_paths:
-            try:
-                if os.path.exists(font_path):
-                    font = ImageFont.truetype(font_path, font_size)
-                    break
-            except:
-                continue
-        
+        # 字体路径只解析一次，字体对象按字号缓存
+        font = font_registry.get(font_size)
         if font is None:
-            # Fallback to default font
-            try:
-                font = ImageFont.load_default()
-            except:
-                # 如果连默认字体都加载失败，使用OpenCV绘制
-                cv2.putText(img, text, position, cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
-                return img
+            # 连默认字体都加载失败，使用OpenCV绘制
+            cv2.putText(img, text, position, cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
+            return img
 
         # Draw the text
         draw.text(position, text, font=font, fill=text_color)
@@ -196,7 +346,7 @@ class MichelsonInterferometerAnalyzer:
 
     def extract_template_improved(self, labeled_img):
         """Improved template extraction with better red box detection"""
-        print("    改进的模板提取方法...")
+        logger.debug("改进的模板提取方法...")
         
         # Convert to different color spaces for better red detection
         hsv = cv2.cvtColor(labeled_img, cv2.COLOR_BGR2HSV)
@@ -257,18 +407,60 @@ class MichelsonInterferometerAnalyzer:
             # Fallback to manual detection
             h, w = labeled_img.shape[:2]
             best_box = (int(0.11*w), int(0.16*h), int(0.30*w), int(0.22*h))
-            print("      使用手动估计的边界框")
+            logger.debug("使用手动估计的边界框")
         else:
-            print(f"      自动检测到红色边界框: {best_box}")
+            logger.debug("自动检测到红色边界框: %s", best_box)
         
         x1, y1, x2, y2 = best_box
         template = labeled_img[y1:y2, x1:x2]
         
         return template, best_box
 
-    def multi_scale_template_matching(self, target_img, template, scales=[0.8, 0.9, 1.0, 1.1, 1.2]):
-        """Multi-scale template matching for better accuracy"""
-        print("    执行多尺度模板匹配...")
+    @staticmethod
+    def _match_peak(result, method):
+        """从matchTemplate结果中取最佳得分和位置（SQDIFF转换为相似度）"""
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        if method == cv2.TM_SQDIFF_NORMED:
+            return 1 - min_val, min_loc
+        return max_val, max_loc
+
+    def _match_all_methods(self, target_img, template, correlator: Optional[FFTCorrelator] = None) -> Dict:
+        """对整幅目标图像计算所有匹配方法的结果图 (方法 -> 结果)"""
+        if self.match_backend == 'fft':
+            if correlator is None:
+                correlator = FFTCorrelator(target_img)
+            return correlator.match(template, self.TEMPLATE_MATCH_METHODS)
+        return {method: cv2.matchTemplate(target_img, template, method) for method in self.TEMPLATE_MATCH_METHODS}
+
+    def build_target_pyramid(self, target_img: np.ndarray) -> List[np.ndarray]:
+        """构建目标帧金字塔，第0层为原图"""
+        pyramid = [target_img]
+        for _ in range(self.pyramid_levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+        return pyramid
+
+    @timed('multi_scale_template_matching')
+    def multi_scale_template_matching(self, target_img, template, scales=[0.8, 0.9, 1.0, 1.1, 1.2],
+                                      template_pyramid: Optional[List[np.ndarray]] = None,
+                                      target_pyramid: Optional[List[np.ndarray]] = None,
+                                      target_correlators: Optional[Dict[int, FFTCorrelator]] = None):
+        """Multi-scale template matching for better accuracy
+        
+        match_mode为'pyramid'时使用由粗到精的金字塔搜索，返回结构相同。
+        template_pyramid/target_pyramid可传入预先计算的金字塔（模板仓库/整帧共享），
+        target_correlators为FFT后端下按金字塔层号缓存的目标帧相关器（整帧共享）。
+        """
+        if target_correlators is None:
+            target_correlators = {}
+        
+        if self.match_mode == 'pyramid' and self.pyramid_levels > 0:
+            return self._pyramid_template_matching(target_img, template, scales, template_pyramid, target_pyramid,
+                                                   target_correlators)
+        
+        logger.debug("执行多尺度模板匹配...")
+        
+        if self.match_backend == 'fft' and 0 not in target_correlators:
+            target_correlators[0] = FFTCorrelator(target_img)
         
         best_match = None
         best_score = 0
@@ -287,19 +479,10 @@ class MichelsonInterferometerAnalyzer:
             scaled_template = cv2.resize(template, (new_w, new_h))
             
             # Template matching with multiple methods
-            methods = [cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED]
+            results = self._match_all_methods(target_img, scaled_template, target_correlators.get(0))
             
-            for method in methods:
-                result = cv2.matchTemplate(target_img, scaled_template, method)
-                
-                if method == cv2.TM_SQDIFF_NORMED:
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    score = 1 - min_val  # Convert to similarity score
-                    loc = min_loc
-                else:
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    score = max_val
-                    loc = max_loc
+            for method in self.TEMPLATE_MATCH_METHODS:
+                score, loc = self._match_peak(results[method], method)
                 
                 if score > best_score:
                     best_score = score
@@ -313,9 +496,116 @@ class MichelsonInterferometerAnalyzer:
         
         return best_match
 
+    def _pyramid_template_matching(self, target_img, template, scales, template_pyramid=None, target_pyramid=None,
+                                   target_correlators=None):
+        """由粗到精的多尺度模板匹配
+        
+        1. 在降采样 2^levels 倍的目标帧上，对每个尺度和方法做一次粗匹配，取各自的峰值
+        2. 粗得分与最佳粗得分相差不超过pyramid_tolerance的峰值，在全分辨率下
+           只在峰值周围的小区域内重新匹配，得到精确位置和得分
+        模板过小无法降采样的尺度直接在全分辨率下匹配。
+        """
+        logger.debug("执行多尺度模板匹配（金字塔模式）...")
+        
+        levels = self.pyramid_levels
+        factor = 2 ** levels
+        if target_pyramid is None or len(target_pyramid) <= levels:
+            target_pyramid = self.build_target_pyramid(target_img)
+        coarse_target = target_pyramid[levels]
+        
+        if target_correlators is None:
+            target_correlators = {}
+        if self.match_backend == 'fft' and levels not in target_correlators:
+            target_correlators[levels] = FFTCorrelator(coarse_target)
+        
+        # 降采样模板的基准：优先使用模板仓库中的金字塔
+        if template_pyramid is not None and len(template_pyramid) >= levels:
+            coarse_base = template_pyramid[levels - 1]
+        else:
+            coarse_base = template
+            for _ in range(levels):
+                coarse_base = cv2.pyrDown(coarse_base)
+        
+        template_h, template_w = template.shape[:2]
+        base_h, base_w = coarse_base.shape[:2]
+        # 精修区域在粗定位基础上向四周扩展的像素数
+        margin = factor * 3
+        
+        candidates = []
+        for scale in scales:
+            new_w = int(template_w * scale)
+            new_h = int(template_h * scale)
+            
+            if new_w <= 0 or new_h <= 0 or new_w > target_img.shape[1] or new_h > target_img.shape[0]:
+                continue
+            
+            scaled_template = cv2.resize(template, (new_w, new_h))
+            coarse_w = int(base_w * scale)
+            coarse_h = int(base_h * scale)
+            
+            if (min(coarse_w, coarse_h) < 8 or coarse_w > coarse_target.shape[1]
+                    or coarse_h > coarse_target.shape[0]):
+                # 模板太小无法粗搜索：直接全分辨率匹配
+                if self.match_backend == 'fft' and 0 not in target_correlators:
+                    target_correlators[0] = FFTCorrelator(target_img)
+                results = self._match_all_methods(target_img, scaled_template, target_correlators.get(0))
+                for method in self.TEMPLATE_MATCH_METHODS:
+                    score, loc = self._match_peak(results[method], method)
+                    candidates.append({'coarse_score': score, 'full': True, 'location': loc,
+                                       'template': scaled_template, 'scale': scale, 'method': method})
+                continue
+            
+            coarse_template = cv2.resize(coarse_base, (coarse_w, coarse_h))
+            results = self._match_all_methods(coarse_target, coarse_template, target_correlators.get(levels))
+            for method in self.TEMPLATE_MATCH_METHODS:
+                score, loc = self._match_peak(results[method], method)
+                candidates.append({'coarse_score': score, 'full': False, 'location': loc,
+                                   'template': scaled_template, 'scale': scale, 'method': method})
+        
+        if not candidates:
+            return None
+        
+        best_coarse = max(c['coarse_score'] for c in candidates)
+        target_h, target_w = target_img.shape[:2]
+        
+        best_match = None
+        best_score = 0
+        for candidate in candidates:
+            if candidate['coarse_score'] < best_coarse - self.pyramid_tolerance:
+                continue
+            
+            scaled_template = candidate['template']
+            new_h, new_w = scaled_template.shape[:2]
+            method = candidate['method']
+            
+            if candidate['full']:
+                score, loc = candidate['coarse_score'], candidate['location']
+            else:
+                # 在全分辨率下只搜索粗定位周围的区域
+                cx, cy = candidate['location'][0] * factor, candidate['location'][1] * factor
+                x0 = max(0, min(cx - margin, target_w - new_w))
+                y0 = max(0, min(cy - margin, target_h - new_h))
+                x1, y1 = min(target_w, cx + new_w + margin), min(target_h, cy + new_h + margin)
+                roi = target_img[y0:y1, x0:x1]
+                score, roi_loc = self._match_peak(cv2.matchTemplate(roi, scaled_template, method), method)
+                loc = (roi_loc[0] + x0, roi_loc[1] + y0)
+            
+            if score > best_score:
+                best_score = score
+                best_match = {
+                    'location': loc,
+                    'size': (new_w, new_h),
+                    'score': score,
+                    'scale': candidate['scale'],
+                    'method': method
+                }
+        
+        return best_match
+
+    @timed('feature_based_matching')
     def feature_based_matching(self, target_img, template):
         """Feature-based matching using SIFT/ORB as backup"""
-        print("    尝试基于特征点的匹配...")
+        logger.debug("尝试基于特征点的匹配...")
         
         try:
             # Try SIFT first
@@ -334,7 +624,7 @@ class MichelsonInterferometerAnalyzer:
             if des1 is None or des2 is None:
                 return None
                 
-            print(f"      使用{detector_name}检测到模板特征点: {len(kp1)}, 目标图像特征点: {len(kp2)}")
+            logger.debug("使用%s检测到模板特征点: %d, 目标图像特征点: %d", detector_name, len(kp1), len(kp2))
             
             # Match features
             if detector_name == "SIFT":
@@ -353,7 +643,7 @@ class MichelsonInterferometerAnalyzer:
                 matches = bf.match(des1, des2)
                 good_matches = sorted(matches, key=lambda x: x.distance)[:50]
             
-            print(f"      找到{len(good_matches)}个有效匹配点")
+            logger.debug("找到%d个有效匹配点", len(good_matches))
             
             if len(good_matches) >= 4:
                 # Extract matched keypoints
@@ -390,35 +680,78 @@ class MichelsonInterferometerAnalyzer:
             return None
             
         except Exception as e:
-            print(f"      特征匹配失败: {e}")
+            logger.debug("特征匹配失败: %s", e)
             return None
 
-    def detect_single_component(self, labeled_img_path, target_img, component_name, min_confidence=0.3):
-        """Detect a single component in the target image"""
-        
-        # Load labeled image
-        if not os.path.exists(labeled_img_path):
-            print(f"    错误: 标注文件 {labeled_img_path} 不存在")
-            return None
-            
-        labeled_img = cv2.imread(labeled_img_path)
-        if labeled_img is None:
-            print(f"    错误: 无法加载标注图片 {labeled_img_path}")
+    def component_part_paths(self) -> List[str]:
+        """所有部件标注图片在分析上下文中的路径"""
+        return [self.context.template_path(part_file) for part_file in self.component_mapping]
+
+    def get_descriptor_bank(self, part_files: List[str]) -> DescriptorBank:
+        """获取覆盖给定部件的特征描述子库（模板未变化时复用）"""
+        entries = {}
+        for part_file in part_files:
+            entry = self.template_store.get(part_file)
+            if entry is not None:
+                entries[os.path.abspath(part_file)] = entry
+        
+        bank_key = tuple((key, entry['hash']) for key, entry in entries.items())
+        if self._descriptor_bank is None or bank_key != self._descriptor_bank_key:
+            self._descriptor_bank = DescriptorBank(entries)
+            self._descriptor_bank_key = bank_key
+        return self._descriptor_bank
+
+    def prepare_frame_context(self, target_img: np.ndarray, part_files: List[str]) -> Dict:
+        """预计算一帧内所有部件共享的数据（目标帧特征点只检测一次）"""
+        logger.debug("计算目标帧特征并匹配描述子库...")
+        bank = self.get_descriptor_bank(part_files)
+        frame_ctx = {
+            'feature_matches': bank.match_frame(target_img)
+        }
+        if self.match_mode == 'pyramid':
+            frame_ctx['target_pyramid'] = self.build_target_pyramid(target_img)
+        if self.match_backend == 'fft':
+            # 目标帧（金字塔模式下为粗搜索层）的频谱只计算一次，所有部件和尺度共享
+            if self.match_mode == 'pyramid' and self.pyramid_levels > 0:
+                level = self.pyramid_levels
+                frame_ctx['target_correlators'] = {level: FFTCorrelator(frame_ctx['target_pyramid'][level])}
+            else:
+                frame_ctx['target_correlators'] = {0: FFTCorrelator(target_img)}
+        return frame_ctx
+
+    @timed('detect_single_component')
+    def detect_single_component(self, labeled_img_path, target_img, component_name, min_confidence=0.3,
+                                frame_ctx: Optional[Dict] = None):
+        """Detect a single component in the target image
+        
+        frame_ctx为prepare_frame_context的结果，提供时复用整帧共享的特征匹配结果。
+        """
+        
+        # Load template from the template store (extracted once per part file)
+        template_entry = self.template_store.get(labeled_img_path)
+        if template_entry is None:
+            logger.warning("无法加载标注图片 %s", labeled_img_path)
             return None
 
-        print(f"    标注图片尺寸: {labeled_img.shape}")
+        logger.debug("标注图片尺寸: %s", template_entry['labeled_shape'])
 
-        # Extract template with improved method
-        template, template_box = self.extract_template_improved(labeled_img)
-        x1, y1, x2, y2 = template_box
-        print(f"    提取的模板区域: ({x1}, {y1}) - ({x2}, {y2})")
-        print(f"    模板尺寸: {template.shape}")
+        template = template_entry['template']
+        x1, y1, x2, y2 = template_entry['bbox']
+        logger.debug("提取的模板区域: (%d, %d) - (%d, %d), 模板尺寸: %s", x1, y1, x2, y2, template.shape)
 
         # Method 1: Multi-scale template matching
-        multi_scale_result = self.multi_scale_template_matching(target_img, template)
+        multi_scale_result = self.multi_scale_template_matching(
+            target_img, template,
+            template_pyramid=template_entry['pyramid'],
+            target_pyramid=frame_ctx.get('target_pyramid') if frame_ctx else None,
+            target_correlators=frame_ctx.get('target_correlators') if frame_ctx else None
+        )
         
         # Method 2: Feature-based matching
-        feature_result = self.feature_based_matching(target_img, template)
+        if frame_ctx is not None and 'feature_matches' in frame_ctx:
+            feature_result = frame_ctx['feature_matches'].get(os.path.abspath(labeled_img_path))
+        else:
+            feature_result = self.feature_based_matching(target_img, template)
         
         # Choose the best result
         best_result = None
@@ -439,7 +772,7 @@ class MichelsonInterferometerAnalyzer:
             method_used = "特征点匹配"
         else:
             # Fallback to basic template matching
-            print("    所有高级方法失败，使用基础模板匹配")
+            logger.debug("所有高级方法失败，使用基础模板匹配")
             result = cv2.matchTemplate(target_img, template, cv2.TM_CCOEFF_NORMED)
             min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
             
@@ -452,7 +785,7 @@ class MichelsonInterferometerAnalyzer:
 
         # Check if confidence is above threshold
         if best_result['score'] < min_confidence:
-            print(f"    检测置信度 {best_result['score']:.3f} 低于阈值 {min_confidence}，认为未检测到")
+            logger.debug("检测置信度 %.3f 低于阈值 %s，认为未检测到", best_result['score'], min_confidence)
             return None
 
         # Extract detection information
@@ -461,10 +794,8 @@ class MichelsonInterferometerAnalyzer:
         bottom_right = (top_left[0] + w, top_left[1] + h)
         score = best_result['score']
 
-        print(f"    最佳检测方法: {method_used}")
-        print(f"    检测置信度: {score:.3f}")
-        print(f"    检测到的组件位置: {top_left} - {bottom_right}")
-        print(f"    组件大小: {w} x {h} 像素")
+        logger.debug("最佳检测方法: %s, 检测置信度: %.3f, 组件位置: %s - %s, 组件大小: %d x %d 像素",
+                     method_used, score, top_left, bottom_right, w, h)
 
         return {
             'name': component_name,
@@ -475,9 +806,10 @@ class MichelsonInterferometerAnalyzer:
             'component_name': component_name  # 兼容imagetest_batch.py格式
         }
 
+    @timed('detect_equipment_in_frame')
     def detect_equipment_in_frame(self, frame: np.ndarray, min_confidence: float = 0.3) -> List[Dict]:
         """在帧中检测实验设备（真实检测版本）"""
-        print("  正在进行实验设备检测...")
+        logger.debug("正在进行实验设备检测...")
         
         detections = []
         
@@ -488,42 +820,72 @@ class MichelsonInterferometerAnalyzer:
         else:
             target_img = frame.copy()
         
-        print(f"目标图片尺寸: {target_img.shape}")
-        print("="*70)
+        logger.debug("目标图片尺寸: %s", target_img.shape)
         
-        # 遍历每个部件模板进行检测（与imagetest_batch.py保持一致的顺序和逻辑）
-        detected_count = 0
-        for i, (part_file, component_info) in enumerate(self.component_mapping.items()):
-            print(f"\n[{i+1}/7] 正在检测: {component_info['chinese']} ({component_info['english']})")
-            print(f"使用标注文件: {part_file}")
-            
-            # 检查标注文件是否存在
-            if not os.path.exists(part_file):
-                print(f"  警告: 标注文件 {part_file} 不存在，跳过")
+        # 整帧共享的特征匹配只计算一次
+        frame_ctx = self.prepare_frame_context(target_img, self.component_part_paths())
+        
+        # 检查标注文件是否存在（模板仓库中已缓存的部件不再访问磁盘）
+        components = []
+        for part_file, component_info in self.component_mapping.items():
+            part_file = self.context.template_path(part_file)
+            if self.template_store.get(part_file) is None:
+                logger.warning("标注文件 %s 不存在，跳过", part_file)
                 continue
+            components.append((part_file, component_info))
+        
+        completed = 0
+        completed_lock = threading.Lock()
+        
+        def detect_component(index: int, part_file: str, component_info: Dict) -> Optional[Dict]:
+            nonlocal completed
+            logger.debug("[%d/%d] 正在检测: %s (%s), 使用标注文件: %s", index + 1, len(components),
+                         component_info['chinese'], component_info['english'], part_file)
             
             # 检测单个组件（使用与imagetest_batch.py相同的参数）
             detection = self.detect_single_component(
                 part_file, 
                 target_img, 
                 component_info['chinese'], 
-                min_confidence
+                min_confidence,
+                frame_ctx=frame_ctx
             )
-            
+            with completed_lock:
+                completed += 1
+                self.report_progress('components', completed, len(components),
+                                     component=component_info['chinese'], detected=detection is not None)
+            return detection
+        
+        # 各部件检测相互独立：配置了多个工作线程时并行执行（OpenCV/NumPy运算期间释放GIL），
+        # 结果仍按component_mapping的顺序返回
+        indices = range(len(components))
+        part_files = [part_file for part_file, _ in components]
+        component_infos = [component_info for _, component_info in components]
+        workers = min(self.detection_workers, len(components))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # 每个任务带上调用方的contextvars副本，日志上下文（如analysis_id）在工作线程中保持不变
+                futures = [
+                    executor.submit(contextvars.copy_context().run, detect_component, *args)
+                    for args in zip(indices, part_files, component_infos)
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = list(map(detect_component, indices, part_files, component_infos))
+        
+        # 遍历每个部件的检测结果（与imagetest_batch.py保持一致的顺序和逻辑）
+        detected_count = 0
+        for (part_file, component_info), detection in zip(components, results):
             if detection:
                 detected_count += 1
                 detections.append(detection)
-                print(f"  ✅ 检测成功!")
+                logger.debug("%s 检测成功", component_info['chinese'])
             else:
-                print(f"  ❌ 未检测到")
+                logger.debug("%s 未检测到", component_info['chinese'])
         
-        # 输出汇总信息（与imagetest_batch.py保持一致）
-        print("\n" + "="*70)
-        print("检测结果汇总:")
-        print("="*70)
-        print(f"总计检测部件数: {len(self.component_mapping)}")
-        print(f"成功检测部件数: {detected_count}")
-        print(f"检测成功率: {detected_count/len(self.component_mapping)*100:.1f}%")
+        # 输出汇总信息
+        logger.info("设备检测完成: 总计检测部件数 %d, 成功检测部件数 %d, 检测成功率 %.1f%%",
+                    len(self.component_mapping), detected_count, detected_count / len(self.component_mapping) * 100)
         
         return detections
 
@@ -565,17 +927,38 @@ class MichelsonInterferometerAnalyzer:
             'timestamp': timestamp
         }
 
-    def analyze_video(self, video_path: str, video_type: str = 'student') -> Dict:
-        """分析视频的完整流程"""
-        print(f"\n开始分析{video_type}视频...")
-        
-        # 提取关键帧
-        key_frames = self.extract_key_frames(video_path)
+    def analyze_video(self, video_path: Optional[str] = None, video_type: str = 'student', workers: int = 1,
+                      queue_size: Optional[int] = None, keep_frames: bool = True) -> Dict:
+        """分析视频的完整流程
+        
+        Args:
+            video_path: 视频路径，为None时使用分析上下文中video_type对应的视频
+            workers: 设备检测工作进程数，1为在当前进程中串行分析，
+                大于1时使用解码进程 + 多个检测进程的流水线，0或None为使用全部CPU核心
+            queue_size: 流水线模式下待检测帧队列的容量（默认为工作进程数的2倍），限制内存占用
+            keep_frames: 是否在结果中保留每个关键帧的图像；为False时内存占用与视频长度无关，
+                需要截图的帧由iter_point_frames按需重新解码
+        """
+        if video_path is None:
+            video_path = self.context.video_path(video_type)
+        logger.info("开始分析%s视频...", video_type)
+        
+        workers = workers or os.cpu_count() or 1
+        if workers > 1:
+            analysis_results = self._analyze_key_frames_pipelined(video_path, workers, queue_size, keep_frames)
+            return {
+                'video_path': video_path,
+                'video_type': video_type,
+                'total_frames_analyzed': len(analysis_results),
+                'key_frames': analysis_results,
+                'steps_detected': list(set([frame['analysis']['step']['step_id'] for frame in analysis_results]))
+            }
         
-        # 分析每一帧
+        # 逐帧提取并分析关键帧
         analysis_results = []
-        for i, frame_data in enumerate(key_frames):
-            print(f"分析第 {i+1}/{len(key_frames)} 帧 (t={frame_data['timestamp']}s)")
+        total_key_frames = self.count_key_frames(video_path)
+        for i, frame_data in enumerate(self.iter_key_frames(video_path)):
+            logger.debug("分析第 %d 帧 (t=%ss)", i + 1, frame_data['timestamp'])
             
             # 设备检测
             equipment_detections = self.detect_equipment_in_frame(frame_data['frame'], min_confidence=0.25)
@@ -588,7 +971,11 @@ class MichelsonInterferometerAnalyzer:
             )
             
             frame_data['analysis'] = step_analysis
+            if not keep_frames:
+                # 只保留元数据，截图时由iter_point_frames按需重新解码
+                frame_data['frame'] = None
             analysis_results.append(frame_data)
+            self.report_progress('key_frames', i + 1, total_key_frames, timestamp=frame_data['timestamp'])
         
         return {
             'video_path': video_path,
@@ -598,9 +985,76 @@ class MichelsonInterferometerAnalyzer:
             'steps_detected': list(set([frame['analysis']['step']['step_id'] for frame in analysis_results]))
         }
 
+    def _analyze_key_frames_pipelined(self, video_path: str, workers: int, queue_size: Optional[int] = None,
+                                      keep_frames: bool = True, interval: int = 15) -> List[Dict]:
+        """流水线分析关键帧：一个解码进程把帧写入有界队列，多个检测进程并行检测，
+        结果按时间戳顺序重新排列"""
+        ctx = multiprocessing.get_context()
+        frame_queue = ctx.Queue(maxsize=queue_size or workers * 2)
+        result_queue = ctx.Queue()
+        
+        # 每个检测进程各自持有预热好的分析器；进程间并行，进程内部串行检测部件
+        worker_config = dict(self.config, detection_workers=1)
+        part_files = self.component_part_paths()
+        
+        decoder = ctx.Process(
+            target=_pipeline_decode_worker,
+            args=(video_path, interval, frame_queue, result_queue, workers, self.worker_initializer),
+            daemon=True
+        )
+        detectors = [
+            ctx.Process(
+                target=_pipeline_detect_worker,
+                args=(worker_config, part_files, frame_queue, result_queue, keep_frames, self.worker_initializer),
+                daemon=True
+            )
+            for _ in range(workers)
+        ]
+        
+        logger.info("启动流水线: 1 个解码进程, %d 个检测进程", workers)
+        processes = [decoder] + detectors
+        for process in processes:
+            process.start()
+        
+        results = {}
+        total_frames = None
+        finished_detectors = 0
+        try:
+            while finished_detectors < workers:
+                try:
+                    kind, payload = result_queue.get(timeout=1)
+                except queue.Empty:
+                    dead = [p for p in processes if not p.is_alive() and p.exitcode not in (0, None)]
+                    if dead:
+                        raise RuntimeError(f"流水线进程异常退出 (exitcode={dead[0].exitcode})")
+                    continue
+                
+                if kind == 'frame':
+                    index, frame_data = payload
+                    results[index] = frame_data
+                    total = f"/{total_frames}" if total_frames is not None else ""
+                    logger.debug("完成第 %d%s 帧 (t=%ss)", len(results), total, frame_data['timestamp'])
+                    self.report_progress('key_frames', len(results), total_frames or len(results),
+                                         timestamp=frame_data['timestamp'])
+                elif kind == 'total':
+                    total_frames = payload
+                elif kind == 'timings':
+                    self.timings.merge(payload)
+                elif kind == 'done':
+                    finished_detectors += 1
+                elif kind == 'error':
+                    raise RuntimeError(f"流水线分析失败: {payload}")
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        
+        return [results[index] for index in sorted(results)]
+
     def compare_student_with_teacher(self, student_analysis: Dict, teacher_analysis: Dict = None) -> Dict:
         """对比学生和教师的实验步骤"""
-        print("\n开始对比分析...")
+        logger.info("开始对比分析...")
         
         student_frames = student_analysis['key_frames']
         comparison_results = []
@@ -635,6 +1089,7 @@ class MichelsonInterferometerAnalyzer:
             comparison_result = {
                 'timestamp': timestamp,
                 'frame': frame_data['frame'],
+                'video_path': frame_data.get('video_path'),
                 'student_step': student_step,
                 'expected_step': expected_step,
                 'is_correct': is_correct,
@@ -658,111 +1113,62 @@ class MichelsonInterferometerAnalyzer:
             'issues_found': issues_found
         }
 
+    @timed('draw_detections_on_frame')
     def draw_detections_on_frame(self, frame: np.ndarray, detections: List[Dict]) -> np.ndarray:
-        """在帧上绘制检测结果"""
-        result_frame = frame.copy()
-        
-        for i, detection in enumerate(detections):
-            name = detection['name']
-            bbox = detection['bbox']
-            confidence = detection['confidence']
-            
-            x1, y1, x2, y2 = bbox
-            color = self.colors[i % len(self.colors)]
-            
-            # 绘制边界框
-            cv2.rectangle(result_frame, (x1, y1), (x2, y2), color, 3)
-            
-            # 使用改进的中文文本绘制
-            text_position = (x1, max(30, y1 - 10))
-            result_frame = self.draw_chinese_text(
-                result_frame,
-                name,
-                text_position,
-                font_size=30,
-                text_color=color
-            )
-            
-            # 在右下角添加置信度信息（使用英文，避免字体问题）
-            confidence_text = f"{confidence:.3f}"
-            cv2.putText(result_frame, confidence_text, (x1, y2 + 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            
-        return result_frame
+        """在帧上绘制检测结果（边界框、中文名称和置信度一次绘制完成，不修改输入帧）"""
+        return self.annotation_renderer.render(frame, detections, self.colors)
 
+    @timed('save_analysis_screenshots')
     def save_analysis_screenshots(self, comparison_results: Dict, output_dir: str = 'analysis_output') -> None:
         """保存分析截图"""
+        output_dir = self.context.output_path(output_dir)
         os.makedirs(output_dir, exist_ok=True)
         
-        print(f"\n保存分析截图到: {output_dir}")
+        logger.info("保存分析截图到: %s", output_dir)
         
-        # 保存问题截图
-        for i, issue in enumerate(comparison_results['issues_found']):
-            fig, ax = plt.subplots(1, 1, figsize=(15, 10))
-            
-            # 获取检测结果并绘制
-            detections = issue.get('detected_equipment', [])
-            annotated_frame = self.draw_detections_on_frame(issue['frame'], detections)
-            
-            ax.imshow(annotated_frame)
-            ax.set_title(f"问题截图 {i+1}: {issue['issue_type']}\n{issue['issue_description']}", 
-                        fontsize=14, pad=20)
-            ax.axis('off')
-            
-            # 添加时间戳
-            ax.text(0.02, 0.98, f"时间: {issue['timestamp']}s", 
-                   transform=ax.transAxes, fontsize=12, 
-                   verticalalignment='top', 
-                   bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.8))
-            
-            # 添加检测信息
-            if detections:
-                detection_info = f"检测到设备: {', '.join([d['name'] for d in detections])}"
-                ax.text(0.02, 0.02, detection_info, 
-                       transform=ax.transAxes, fontsize=10, 
-                       verticalalignment='bottom',
-                       bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
-            
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/issue_{i+1:02d}_t{issue['timestamp']}s.png", 
-                       dpi=150, bbox_inches='tight')
-            plt.close()
+        # 保存问题截图（未保留帧图像的分析点按需重新解码）
+        issues = comparison_results['issues_found']
+        issue_index = {id(issue): i for i, issue in enumerate(issues)}
+        for issue, frame in self.iter_point_frames(issues):
+            if frame is None:
+                continue
+            i = issue_index[id(issue)]
+            self._save_composed_screenshot(
+                frame, issue.get('detected_equipment', []),
+                os.path.join(output_dir, f"issue_{i+1:02d}_t{issue['timestamp']}s.png"),
+                title=f"问题截图 {i+1}: {issue['issue_type']}\n{issue['issue_description']}",
+                timestamp=issue['timestamp'], badge_color='yellow')
         
         # 保存正确步骤的示例截图
-        correct_steps = [r for r in comparison_results['comparison_details'] if r['is_correct']]
-        for i, correct in enumerate(correct_steps[:3]):  # 只保存前3个正确示例
-            fig, ax = plt.subplots(1, 1, figsize=(15, 10))
-            
-            # 获取检测结果并绘制
-            detections = correct.get('detected_equipment', [])
-            annotated_frame = self.draw_detections_on_frame(correct['frame'], detections)
-            
-            ax.imshow(annotated_frame)
-            ax.set_title(f"正确示例 {i+1}: {correct['issue_description']}", 
-                        fontsize=14, pad=20)
-            ax.axis('off')
-            
-            ax.text(0.02, 0.98, f"时间: {correct['timestamp']}s", 
-                   transform=ax.transAxes, fontsize=12, 
-                   verticalalignment='top', 
-                   bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.8))
-            
-            # 添加检测信息
-            if detections:
-                detection_info = f"检测到设备: {', '.join([d['name'] for d in detections])}"
-                ax.text(0.02, 0.02, detection_info, 
-                       transform=ax.transAxes, fontsize=10, 
-                       verticalalignment='bottom',
-                       bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
-            
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/correct_{i+1:02d}_t{correct['timestamp']}s.png", 
-                       dpi=150, bbox_inches='tight')
-            plt.close()
+        correct_steps = [r for r in comparison_results['comparison_details'] if r['is_correct']][:3]  # 只保存前3个正确示例
+        correct_index = {id(correct): i for i, correct in enumerate(correct_steps)}
+        for correct, frame in self.iter_point_frames(correct_steps):
+            if frame is None:
+                continue
+            i = correct_index[id(correct)]
+            self._save_composed_screenshot(
+                frame, correct.get('detected_equipment', []),
+                os.path.join(output_dir, f"correct_{i+1:02d}_t{correct['timestamp']}s.png"),
+                title=f"正确示例 {i+1}: {correct['issue_description']}",
+                timestamp=correct['timestamp'], badge_color='lightgreen')
+
+    def _save_composed_screenshot(self, frame: np.ndarray, detections: List[Dict], screenshot_path: str,
+                                  title: str, timestamp: int, badge_color: str) -> bool:
+        """绘制检测结果并合成标题栏、时间戳和检测说明后保存为PNG"""
+        annotated_frame = self.draw_detections_on_frame(frame, detections)
+        caption = f"检测到设备: {', '.join([d['name'] for d in detections])}" if detections else None
+        composed = self.screenshot_compositor.compose(annotated_frame, title, badge=f"时间: {timestamp}s",
+                                                      badge_color=badge_color, caption=caption)
+        with self.timings.span('write_screenshot'):
+            success = cv2.imwrite(screenshot_path, cv2.cvtColor(composed, cv2.COLOR_RGB2BGR))
+        if not success:
+            logger.warning("保存失败: %s", screenshot_path)
+        return success
 
     def generate_analysis_report(self, student_analysis: Dict, comparison_results: Dict, 
                                output_file: str = 'analysis_report.json') -> None:
         """生成详细的分析报告"""
+        output_file = self.context.output_path(output_file)
         
         report = {
             'analysis_time': time.strftime('%Y-%m-%d %H:%M:%S'),
@@ -796,7 +1202,7 @@ class MichelsonInterferometerAnalyzer:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
-        print(f"\n详细报告已保存到: {output_file}")
+        logger.info("详细报告已保存到: %s", output_file)
         return report
 
     def extract_frame_at_timestamp(self, video_path: str, timestamp: int) -> np.ndarray:
@@ -816,21 +1222,65 @@ class MichelsonInterferometerAnalyzer:
             return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return None
 
-    def analyze_video_steps(self, video_path: str, video_type: str = 'student', interval: int = 30) -> List[Dict]:
-        """分析视频的实验步骤（基于video_test.py的逻辑）"""
-        print(f"\n开始分析 {video_type} 视频的实验步骤...")
-        
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"无法打开视频文件: {video_path}")
-        
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / fps
-        
-        print(f"视频信息: {total_frames} 帧, {fps:.2f} FPS, 时长: {timedelta(seconds=int(duration))}")
-        
-        # 定义分析时间点
+    # 顺序grab跳帧与关键帧seek的分界（秒）：间隔更长时seek更快
+    SEQUENTIAL_GRAB_MAX_GAP = 4.0
+
+    def iter_frames_at_timestamps(self, cap, timestamps: List[int], fps: float,
+                                  max_grab_gap: Optional[int] = None):
+        """顺序遍历视频，依次返回各时间戳对应的帧 (timestamp, RGB帧)
+        
+        只打开一次解码器并向前推进：非目标帧只调用grab()跳过，
+        目标帧才调用retrieve()解码为图像。当两个目标帧相距超过
+        max_grab_gap帧（默认约4秒）时，逐帧grab比从关键帧seek更慢，
+        此时在同一个cap上seek。时间戳按升序输出，
+        无法读取的时间戳（超出视频末尾等）会被跳过。
+        """
+        if max_grab_gap is None:
+            max_grab_gap = int(fps * self.SEQUENTIAL_GRAB_MAX_GAP)
+        
+        frame_numbers = sorted((int(t * fps), t) for t in timestamps)
+        
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        last_frame_number = None
+        last_frame = None
+        
+        for frame_number, t in frame_numbers:
+            # 多个时间戳落在同一帧时直接复用
+            if frame_number == last_frame_number:
+                yield t, last_frame
+                continue
+            
+            decode_start = time.perf_counter_ns()
+            if frame_number < position or frame_number - position > max_grab_gap:
+                # 目标帧已越过或相距太远，在同一个cap上seek
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                position = frame_number
+            
+            grabbed = True
+            while position < frame_number:
+                if not cap.grab():
+                    grabbed = False
+                    break
+                position += 1
+            if not grabbed:
+                break
+            
+            ret = cap.grab()
+            if not ret:
+                break
+            position += 1
+            
+            ret, frame = cap.retrieve()
+            if not ret:
+                continue
+            
+            last_frame_number = frame_number
+            last_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.timings.observe('decode_frame', time.perf_counter_ns() - decode_start)
+            yield t, last_frame
+
+    def step_timestamps(self, duration: float, video_type: str, interval: int = 30) -> List[int]:
+        """analyze_video_steps的分析时间点（秒，只保留视频时长内的）"""
         if video_type == 'teacher':
             # 老师视频：根据预定义步骤时间点分析
             timestamps = [step['start_time'] for step in self.teacher_steps]
@@ -840,24 +1290,63 @@ class MichelsonInterferometerAnalyzer:
             # 添加最后时间点
             if int(duration) - timestamps[-1] > interval/2:
                 timestamps.append(int(duration) - 5)
+        return [t for t in timestamps if t < duration]
+
+    def count_step_frames(self, video_path: Optional[str] = None, video_type: str = 'student',
+                          interval: int = 30) -> int:
+        """analyze_video_steps将解码的帧数（只读取视频元数据，用于进度规划）"""
+        if video_path is None:
+            video_path = self.context.video_path(video_type)
+        cap = cv2.VideoCapture(video_path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            cap.release()
+        if fps <= 0 or total_frames <= 0:
+            return 0
+        return len(self.step_timestamps(total_frames / fps, video_type, interval))
+
+    @timed('analyze_video_steps')
+    def analyze_video_steps(self, video_path: Optional[str] = None, video_type: str = 'student', interval: int = 30,
+                            keep_frames: bool = True) -> List[Dict]:
+        """分析视频的实验步骤（基于video_test.py的逻辑）
+        
+        video_path为None时使用分析上下文中video_type对应的视频。
+        keep_frames为False时分析点只保留元数据（frame为None），
+        截图时由iter_point_frames按video_path/timestamp重新解码。
+        """
+        if video_path is None:
+            video_path = self.context.video_path(video_type)
+        logger.info("开始分析 %s 视频的实验步骤...", video_type)
+        
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"无法打开视频文件: {video_path}")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = total_frames / fps
+        
+        logger.info("视频信息: %d 帧, %.2f FPS, 时长: %s", total_frames, fps, timedelta(seconds=int(duration)))
         
         analysis_points = []
         
-        for t in timestamps:
-            if t >= duration:
-                continue
-                
-            frame = self.extract_frame_at_timestamp(video_path, t)
-            if frame is None:
-                continue
-            
+        # 单次顺序解码：复用已打开的cap，按时间顺序grab跳帧，只在目标帧retrieve
+        valid_timestamps = self.step_timestamps(duration, video_type, interval)
+        
+        for index, (t, frame) in enumerate(self.iter_frames_at_timestamps(cap, valid_timestamps, fps)):
             # 识别当前步骤
             current_step = self.identify_step_from_time_and_frame(t, frame, video_type)
+            self.report_progress('video_frames', index + 1, len(valid_timestamps),
+                                 video_type=video_type, timestamp=t)
             
             analysis_points.append({
                 'timestamp': t,
                 'time_str': f"{int(t//60):02d}:{int(t%60):02d}",
-                'frame': frame,
+                'frame_number': int(t * fps),
+                'frame': frame if keep_frames else None,
+                'video_path': os.path.abspath(video_path),
                 'current_step': current_step,
                 'video_type': video_type
             })
@@ -865,6 +1354,7 @@ class MichelsonInterferometerAnalyzer:
         cap.release()
         return analysis_points
 
+    @timed('identify_step_from_time_and_frame')
     def identify_step_from_time_and_frame(self, timestamp: int, frame: np.ndarray, video_type: str) -> Dict:
         """根据时间和帧内容识别实验步骤"""
         
@@ -934,7 +1424,7 @@ class MichelsonInterferometerAnalyzer:
 
     def compare_student_teacher_steps(self, teacher_analysis: List[Dict], student_analysis: List[Dict]) -> Dict:
         """对比学生和老师的实验步骤"""
-        print("\n开始步骤对比分析...")
+        logger.info("开始步骤对比分析...")
         
         comparison_results = []
         issues_found = []
@@ -986,7 +1476,8 @@ class MichelsonInterferometerAnalyzer:
                 'is_correct': is_correct,
                 'issue_type': issue_type,
                 'issue_description': issue_description,
-                'frame': student_point['frame']
+                'frame': student_point['frame'],
+                'video_path': student_point.get('video_path')
             })
         
         return {
@@ -999,28 +1490,63 @@ class MichelsonInterferometerAnalyzer:
             'correct_steps': correct_steps
         }
 
+    def _submit_screenshot(self, frame: np.ndarray, output_dir: str, stem: str,
+                           pending_writes: Dict[str, Tuple[Future, int]]) -> str:
+        """提交后台写入一张步骤截图，返回截图文件名（扩展名取决于截图格式）"""
+        screenshot_name = self.screenshot_writer.filename(stem)
+        future = self.screenshot_writer.submit(frame, os.path.join(output_dir, screenshot_name))
+        pending_writes[screenshot_name] = (future, frame.shape[1])
+        return screenshot_name
+
+    def _finish_screenshots(self, pending_writes: Dict[str, Tuple[Future, int]],
+                            screenshot_explanations: Dict[str, Dict]) -> None:
+        """等待后台写入完成：写入失败的截图从解释中去掉，成功的记录修订号和各宽度缩小版本的文件名"""
+        self.screenshot_writer.flush()
+        for screenshot_name, (future, frame_width) in pending_writes.items():
+            revision = future.result()
+            if revision is None:
+                logger.warning("保存失败: %s", screenshot_name)
+                screenshot_explanations.pop(screenshot_name, None)
+                continue
+            logger.debug("成功保存: %s", screenshot_name)
+            explanation = screenshot_explanations.get(screenshot_name)
+            if explanation is None:
+                continue
+            explanation['revision'] = revision
+            explanation['variants'] = {
+                str(width): self.screenshot_writer.derivative_filename(screenshot_name, width)
+                for width in self.screenshot_writer.derivative_widths_for(frame_width)
+            }
+
+    @timed('save_step_analysis_screenshots')
     def save_step_analysis_screenshots(self, teacher_analysis: List[Dict], student_analysis: List[Dict], 
                                      comparison_results: Dict, output_dir: str = 'step_analysis_output') -> Dict:
         """保存步骤分析截图和对应解释"""
+        output_dir = self.context.output_path(output_dir)
         os.makedirs(output_dir, exist_ok=True)
         
-        print(f"\n保存步骤分析截图到: {output_dir}")
+        logger.info("保存步骤分析截图到: %s", output_dir)
         
         screenshot_explanations = {}
+        pending_writes: Dict[str, Tuple[Future, int]] = {}
+        details = comparison_results['comparison_details']
+        issue_details = [c for c in details if not c['is_correct']]
+        screenshots_total = len(teacher_analysis) + len(comparison_results['correct_steps']) + len(issue_details)
+        screenshots_done = 0
         
         # 1. 保存老师步骤截图
-        print("保存老师示范步骤截图...")
-        for i, point in enumerate(teacher_analysis):
+        logger.debug("保存老师示范步骤截图...")
+        for point, frame in self.iter_point_frames(teacher_analysis):
+            screenshots_done += 1
+            self.report_progress('screenshots', screenshots_done, screenshots_total, video_type='teacher')
+            if frame is None:
+                continue
             step = point['current_step']
             timestamp = point['timestamp']
             
-            # 保存截图
-            screenshot_name = f"teacher_step_{step['step_id']:02d}_t{timestamp}s.png"
-            screenshot_path = os.path.join(output_dir, screenshot_name)
-            
-            # 转换为BGR保存
-            frame_bgr = cv2.cvtColor(point['frame'], cv2.COLOR_RGB2BGR)
-            cv2.imwrite(screenshot_path, frame_bgr)
+            # 提交后台写入截图
+            screenshot_name = self._submit_screenshot(frame, output_dir, f"teacher_step_{step['step_id']:02d}_t{timestamp}s",
+                                                      pending_writes)
             
             # 保存解释
             screenshot_explanations[screenshot_name] = {
@@ -1034,16 +1560,17 @@ class MichelsonInterferometerAnalyzer:
             }
         
         # 2. 保存学生正确步骤截图
-        print("保存学生正确步骤截图...")
-        for i, point in enumerate(comparison_results['correct_steps']):
+        logger.debug("保存学生正确步骤截图...")
+        for point, frame in self.iter_point_frames(comparison_results['correct_steps']):
+            screenshots_done += 1
+            self.report_progress('screenshots', screenshots_done, screenshots_total, video_type='student')
+            if frame is None:
+                continue
             step = point['current_step']
             timestamp = point['timestamp']
             
-            screenshot_name = f"student_correct_{step['step_id']:02d}_t{timestamp}s.png"
-            screenshot_path = os.path.join(output_dir, screenshot_name)
-            
-            frame_bgr = cv2.cvtColor(point['frame'], cv2.COLOR_RGB2BGR)
-            cv2.imwrite(screenshot_path, frame_bgr)
+            screenshot_name = self._submit_screenshot(frame, output_dir, f"student_correct_{step['step_id']:02d}_t{timestamp}s",
+                                                      pending_writes)
             
             screenshot_explanations[screenshot_name] = {
                 'type': '学生正确操作',
@@ -1056,17 +1583,18 @@ class MichelsonInterferometerAnalyzer:
             }
         
         # 3. 保存学生问题步骤截图
-        print("保存学生问题步骤截图...")
-        for i, comparison in enumerate(comparison_results['comparison_details']):
-            if not comparison['is_correct']:
+        logger.debug("保存学生问题步骤截图...")
+        detail_index = {id(comparison): i for i, comparison in enumerate(details)}
+        for comparison, frame in self.iter_point_frames(issue_details):
+            screenshots_done += 1
+            self.report_progress('screenshots', screenshots_done, screenshots_total, video_type='student')
+            if frame is not None:
+                i = detail_index[id(comparison)]
                 step = comparison['student_step']
                 timestamp = comparison['timestamp']
                 
-                screenshot_name = f"student_issue_{i+1:02d}_t{timestamp}s.png"
-                screenshot_path = os.path.join(output_dir, screenshot_name)
-                
-                frame_bgr = cv2.cvtColor(comparison['frame'], cv2.COLOR_RGB2BGR)
-                cv2.imwrite(screenshot_path, frame_bgr)
+                screenshot_name = self._submit_screenshot(frame, output_dir, f"student_issue_{i+1:02d}_t{timestamp}s",
+                                                          pending_writes)
                 
                 screenshot_explanations[screenshot_name] = {
                     'type': '学生操作问题',
@@ -1079,13 +1607,16 @@ class MichelsonInterferometerAnalyzer:
                     'explanation': f"学生在{timestamp}秒时的操作存在问题: {comparison['issue_description']}"
                 }
         
+        # 等待后台写入完成，去掉写入失败的截图
+        self._finish_screenshots(pending_writes, screenshot_explanations)
+        
         # 保存解释到JSON文件
         explanations_file = os.path.join(output_dir, 'screenshot_explanations.json')
         with open(explanations_file, 'w', encoding='utf-8') as f:
             json.dump(screenshot_explanations, f, ensure_ascii=False, indent=2)
         
-        print(f"✅ 截图解释已保存到: {explanations_file}")
-        print(f"✅ 共保存 {len(screenshot_explanations)} 张截图及解释")
+        logger.info("截图解释已保存到: %s", explanations_file)
+        logger.info("共保存 %d 张截图及解释", len(screenshot_explanations))
         
         return screenshot_explanations
 
@@ -1093,6 +1624,7 @@ class MichelsonInterferometerAnalyzer:
                                     comparison_results: Dict, screenshot_explanations: Dict, 
                                     output_file: str = 'step_analysis_report.json') -> Dict:
         """生成完整的步骤分析报告"""
+        output_file = self.context.output_path(output_file)
         
         report = {
             'analysis_time': time.strftime('%Y-%m-%d %H:%M:%S'),
@@ -1149,7 +1681,7 @@ class MichelsonInterferometerAnalyzer:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
-        print(f"\n详细步骤分析报告已保存到: {output_file}")
+        logger.info("详细步骤分析报告已保存到: %s", output_file)
         return report
 
     def generate_step_recommendations(self, comparison_results: Dict) -> List[str]:
@@ -1252,29 +1784,46 @@ class MichelsonInterferometerAnalyzer:
             
             print()  # 空行分隔
 
+    @timed('save_simple_analysis_screenshots')
     def save_simple_analysis_screenshots(self, teacher_analysis: List[Dict], student_analysis: List[Dict], 
-                                       output_dir: str = 'step_analysis_output') -> Dict:
-        """保存简化的分析截图"""
+                                       output_dir: str = 'step_analysis_output',
+                                       teacher_explanations: Optional[Dict] = None) -> Dict:
+        """保存简化的分析截图
+        
+        teacher_explanations为已有的老师示范截图解释（如来自老师视频分析缓存）时，
+        不再重新生成老师截图，调用方需保证对应截图已在output_dir中。
+        """
+        output_dir = self.context.output_path(output_dir)
         os.makedirs(output_dir, exist_ok=True)
         
-        print(f"保存分析截图到: {output_dir}")
-        print(f"📊 数据统计: 老师分析数据 {len(teacher_analysis)} 条, 学生分析数据 {len(student_analysis)} 条")
+        logger.info("保存分析截图到: %s", output_dir)
+        logger.debug("数据统计: 老师分析数据 %d 条, 学生分析数据 %d 条", len(teacher_analysis), len(student_analysis))
         
         screenshot_explanations = {}
+        pending_writes: Dict[str, Tuple[Future, int]] = {}
         
         # 1. 保存老师步骤截图
-        print("\n保存老师示范步骤截图...")
-        for i, point in enumerate(teacher_analysis):
+        if teacher_explanations is not None:
+            logger.info("复用已有的老师示范步骤截图: %d 张", len(teacher_explanations))
+            screenshot_explanations.update(teacher_explanations)
+            teacher_analysis = []
+        else:
+            logger.debug("保存老师示范步骤截图...")
+        screenshots_total = len(teacher_analysis) + len(student_analysis)
+        screenshots_done = 0
+        for point, frame in self.iter_point_frames(teacher_analysis):
+            screenshots_done += 1
+            self.report_progress('screenshots', screenshots_done, screenshots_total, video_type='teacher')
             step = point['current_step']
             timestamp = point['timestamp']
+            screenshot_stem = f"teacher_step_{step['step_id']:02d}_t{timestamp}s"
             
-            # 保存截图
-            screenshot_name = f"teacher_step_{step['step_id']:02d}_t{timestamp}s.png"
-            screenshot_path = os.path.join(output_dir, screenshot_name)
+            if frame is None:
+                logger.warning("无法读取帧: %s", screenshot_stem)
+                continue
             
-            # 转换为BGR保存
-            frame_bgr = cv2.cvtColor(point['frame'], cv2.COLOR_RGB2BGR)
-            cv2.imwrite(screenshot_path, frame_bgr)
+            # 提交后台写入截图
+            screenshot_name = self._submit_screenshot(frame, output_dir, screenshot_stem, pending_writes)
             
             # 保存解释
             screenshot_explanations[screenshot_name] = {
@@ -1286,50 +1835,36 @@ class MichelsonInterferometerAnalyzer:
                 'description': step['description'],
                 'explanation': f"老师在{timestamp}秒时执行: {step['name']}"
             }
-            print(f"  ✅ 保存: {screenshot_name}")
+            logger.debug("已提交写入: %s", screenshot_name)
         
         # 2. 保存学生步骤截图
-        print(f"\n保存学生操作步骤截图...")
+        logger.debug("保存学生操作步骤截图...")
         if not student_analysis:
-            print("  ⚠️  警告: 学生分析数据为空，无法保存学生截图")
+            logger.warning("学生分析数据为空，无法保存学生截图")
         else:
-            print(f"  📝 学生分析数据条数: {len(student_analysis)}")
+            logger.debug("学生分析数据条数: %d", len(student_analysis))
             
-        for i, point in enumerate(student_analysis):
-            print(f"  正在处理第 {i+1} 条学生数据...")
+        # 帧图像未保留时按需重新解码，任一时刻只持有一帧
+        for i, (point, frame) in enumerate(self.iter_point_frames(student_analysis)):
+            screenshots_done += 1
+            self.report_progress('screenshots', screenshots_done, screenshots_total, video_type='student')
             
             step = point['current_step']
             timestamp = point['timestamp']
             
-            screenshot_name = f"student_step_{step['step_id']:02d}_t{timestamp}s.png"
-            screenshot_path = os.path.join(output_dir, screenshot_name)
+            screenshot_stem = f"student_step_{step['step_id']:02d}_t{timestamp}s"
             
-            print(f"    - 截图名称: {screenshot_name}")
-            print(f"    - 时间戳: {timestamp}s")
-            print(f"    - 步骤: {step['name']}")
+            logger.debug("处理第 %d 条学生数据: %s (时间戳: %ss, 步骤: %s)", i + 1, screenshot_stem, timestamp, step['name'])
             
             try:
-                # 检查frame是否存在
-                if 'frame' not in point:
-                    print(f"    ❌ 错误: 数据中缺少 frame 字段")
-                    continue
-                
-                frame = point['frame']
                 if frame is None:
-                    print(f"    ❌ 错误: frame 为 None")
+                    logger.warning("无法读取帧: %s", screenshot_stem)
                     continue
                 
-                print(f"    - 帧尺寸: {frame.shape}")
+                logger.debug("帧尺寸: %s", frame.shape)
                 
-                # 转换为BGR保存
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                success = cv2.imwrite(screenshot_path, frame_bgr)
-                
-                if success:
-                    print(f"    ✅ 成功保存: {screenshot_name}")
-                else:
-                    print(f"    ❌ 保存失败: {screenshot_name}")
-                    continue
+                # 提交后台写入截图（写入失败的截图在全部写完后从解释中去掉）
+                screenshot_name = self._submit_screenshot(frame, output_dir, screenshot_stem, pending_writes)
                 
                 # 保存解释
                 screenshot_explanations[screenshot_name] = {
@@ -1344,23 +1879,23 @@ class MichelsonInterferometerAnalyzer:
                 }
                 
             except Exception as e:
-                print(f"    ❌ 处理学生截图时出错: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("处理学生截图时出错: %s", e)
+        
+        # 等待后台写入完成，去掉写入失败的截图
+        self._finish_screenshots(pending_writes, screenshot_explanations)
         
         # 保存解释到JSON文件
         explanations_file = os.path.join(output_dir, 'screenshot_explanations.json')
         with open(explanations_file, 'w', encoding='utf-8') as f:
             json.dump(screenshot_explanations, f, ensure_ascii=False, indent=2)
         
-        print(f"\n✅ 截图解释已保存到: {explanations_file}")
-        print(f"✅ 共保存 {len(screenshot_explanations)} 张截图及解释")
+        logger.info("截图解释已保存到: %s", explanations_file)
+        logger.info("共保存 %d 张截图及解释", len(screenshot_explanations))
         
         # 统计保存的截图
         teacher_count = len([k for k in screenshot_explanations.keys() if k.startswith('teacher_')])
         student_count = len([k for k in screenshot_explanations.keys() if k.startswith('student_')])
-        print(f"   - 老师截图: {teacher_count} 张")
-        print(f"   - 学生截图: {student_count} 张")
+        logger.info("老师截图: %d 张, 学生截图: %d 张", teacher_count, student_count)
         
         return screenshot_explanations
 
@@ -1368,13 +1903,14 @@ class MichelsonInterferometerAnalyzer:
                                       screenshot_explanations: Dict, 
                                       output_file: str = 'experiment_steps_analysis.json') -> Dict:
         """生成简化的实验步骤分析报告"""
+        output_file = self.context.output_path(output_file)
         
         report = {
             'analysis_time': time.strftime('%Y-%m-%d %H:%M:%S'),
             'analysis_type': '实验步骤AI分析（老师示范 + 学生操作）',
             'videos_analyzed': {
-                'teacher_video': 'teacher.mp4',
-                'student_video': 'student.mp4'
+                'teacher_video': os.path.basename(self.context.teacher_video or 'teacher.mp4'),
+                'student_video': os.path.basename(self.context.student_video or 'student.mp4')
             },
             'teacher_analysis': {
                 'video_type': '老师示范',
@@ -1419,7 +1955,7 @@ class MichelsonInterferometerAnalyzer:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
-        print(f"详细实验步骤分析报告已保存到: {output_file}")
+        logger.info("详细实验步骤分析报告已保存到: %s", output_file)
         return report
 
     def generate_recommendations(self, comparison_results: Dict) -> List[str]:
@@ -1483,9 +2019,70 @@ class MichelsonInterferometerAnalyzer:
         for i, rec in enumerate(report['recommendations'], 1):
             print(f"  {i}. {rec}")
 
+def _pipeline_decode_worker(video_path: str, interval: int, frame_queue, result_queue, workers: int,
+                            initializer: Optional[Callable[[], None]] = None):
+    """流水线解码进程：按关键帧间隔解码视频，把帧依次写入有界队列"""
+    try:
+        if initializer is not None:
+            initializer()
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            result_queue.put(('error', f"无法打开视频: {video_path}"))
+            return
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if fps > 0:
+            result_queue.put(('total', len(MichelsonInterferometerAnalyzer.key_frame_timestamps(fps, total_frames, interval))))
+        
+        analyzer = MichelsonInterferometerAnalyzer()
+        for index, frame_data in enumerate(analyzer.iter_key_frames(video_path, interval)):
+            frame_queue.put((index, frame_data))
+        result_queue.put(('timings', analyzer.timings.snapshot()))
+    except Exception as e:
+        result_queue.put(('error', f"解码失败: {e}"))
+    finally:
+        # 每个检测进程一个结束标记
+        for _ in range(workers):
+            frame_queue.put(None)
+
+
+def _pipeline_detect_worker(config: Dict, part_files: List[str], frame_queue, result_queue, keep_frames: bool = True,
+                            initializer: Optional[Callable[[], None]] = None):
+    """流水线检测进程：持有自己的分析器和模板缓存，逐帧检测设备并识别步骤"""
+    try:
+        if initializer is not None:
+            initializer()
+        analyzer = MichelsonInterferometerAnalyzer(**config)
+        analyzer.template_store.preload(part_files)
+        
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            index, frame_data = item
+            
+            equipment_detections = analyzer.detect_equipment_in_frame(frame_data['frame'], min_confidence=0.25)
+            frame_data['analysis'] = analyzer.identify_experiment_step(
+                frame_data['frame'],
+                frame_data['timestamp'],
+                equipment_detections
+            )
+            if not keep_frames:
+                frame_data['frame'] = None
+            result_queue.put(('frame', (index, frame_data)))
+        # 检测进程的耗时直方图交给主进程合并
+        result_queue.put(('timings', analyzer.timings.snapshot()))
+    except Exception as e:
+        import traceback
+        result_queue.put(('error', f"{e}\n{traceback.format_exc()}"))
+    finally:
+        result_queue.put(('done', os.getpid()))
+
+
 def extract_frame_at_time(video_path: str, time_seconds: float = 113.0, output_path: str = 'Identify_target.png'):
     """提取视频指定时间点的帧作为目标图片"""
-    print(f"正在提取 {video_path} 在 {time_seconds}秒 的帧...")
+    logger.info("正在提取 %s 在 %s秒 的帧...", video_path, time_seconds)
     
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -1496,18 +2093,18 @@ def extract_frame_at_time(video_path: str, time_seconds: float = 113.0, output_p
     fps = cap.get(cv2.CAP_PROP_FPS)
     duration = total_frames / fps
     
-    print(f"视频信息: {total_frames} 帧, {fps:.2f} FPS, 时长: {timedelta(seconds=int(duration))}")
+    logger.info("视频信息: %d 帧, %.2f FPS, 时长: %s", total_frames, fps, timedelta(seconds=int(duration)))
     
     # 检查时间点是否有效
     if time_seconds > duration:
-        print(f"⚠️  指定时间 {time_seconds}秒 超过视频总时长 {duration:.1f}秒，将提取最后一帧")
+        logger.warning("指定时间 %s秒 超过视频总时长 %.1f秒，将提取最后一帧", time_seconds, duration)
         target_frame_number = total_frames - 1
         time_seconds = duration
     else:
         # 计算目标帧号
         target_frame_number = int(time_seconds * fps)
     
-    print(f"目标时间: {time_seconds}秒 (第 {target_frame_number} 帧)")
+    logger.debug("目标时间: %s秒 (第 %d 帧)", time_seconds, target_frame_number)
     
     # 跳到指定帧
     cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame_number)
@@ -1516,8 +2113,8 @@ def extract_frame_at_time(video_path: str, time_seconds: float = 113.0, output_p
     if ret:
         # 保存指定时间的帧
         cv2.imwrite(output_path, frame)
-        print(f"✅ {time_seconds}秒的帧已保存为: {output_path}")
-        print(f"图片尺寸: {frame.shape}")
+        logger.info("%s秒的帧已保存为: %s", time_seconds, output_path)
+        logger.debug("图片尺寸: %s", frame.shape)
         cap.release()
         return frame
     else:
@@ -1642,8 +2239,8 @@ def analyze_single_frame_detection():
         print(f"  ⚪ part7.png - 二合一观察屏标注图片 (可选)")
     
     try:
-        # 初始化分析器
-        analyzer = MichelsonInterferometerAnalyzer()
+        # 初始化分析器（单帧检测时各部件并行，使用全部CPU核心）
+        analyzer = MichelsonInterferometerAnalyzer(detection_workers=0)
         
         # 步骤1: 提取指定时间的帧作为目标图片  
         print(f"\n{'='*60}")
@@ -1831,4 +2428,6 @@ def main():
         print("  🔬 设备检测: 检测108秒帧中的实验设备")
 
 if __name__ == "__main__":
+    # 命令行运行时输出INFO级别的分析过程日志
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main()
\ No newline at end of file
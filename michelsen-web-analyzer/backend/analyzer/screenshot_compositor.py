@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析截图合成
+
+原先每张问题截图都要创建一个15×10英寸的matplotlib图像、tight_layout后按150dpi保存，
+单张耗时数百毫秒，且模块加载时导入pyplot拖慢启动。
+这里直接在NumPy帧上合成同样的版式：
+- 帧上方的白色标题栏（多行标题逐行居中）
+- 帧左上角的时间戳标签、左下角的检测设备说明（圆角半透明底色）
+文字逐段栅格化为alpha位图后混合到画布上，不做整帧PIL转换。
+字号按matplotlib原图的比例（磅值 / 15英寸图宽）随帧宽缩放。
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from font_registry import FontRegistry, font_registry as default_font_registry
+
+# matplotlib 命名颜色（RGB）
+BADGE_COLORS = {
+    'yellow': (255, 255, 0),
+    'lightgreen': (144, 238, 144),
+    'lightblue': (173, 216, 230),
+}
+
+# 原matplotlib图像宽度（磅），用于把磅值字号换算为相对帧宽的像素字号
+FIGURE_WIDTH_POINTS = 15 * 72
+
+
+class ScreenshotCompositor:
+    """把标题栏、时间戳标签和检测说明合成到RGB帧上"""
+
+    def __init__(self, fonts: Optional[FontRegistry] = None, title_points: float = 14, badge_points: float = 12,
+                 caption_points: float = 10, box_alpha: float = 0.8, text_color: Sequence[int] = (0, 0, 0),
+                 background: Sequence[int] = (255, 255, 255)):
+        """
+        Args:
+            fonts: 字体仓库，默认使用进程内共享的字体仓库
+            title_points / badge_points / caption_points: 标题、时间戳、检测说明的字号（磅，与原matplotlib版式一致）
+            box_alpha: 标签底色的不透明度
+            text_color: 文字颜色
+            background: 标题栏背景色
+        """
+        self.fonts = fonts or default_font_registry
+        self.title_points = title_points
+        self.badge_points = badge_points
+        self.caption_points = caption_points
+        self.box_alpha = box_alpha
+        self.text_color = tuple(text_color)
+        self.background = tuple(background)
+
+    @staticmethod
+    def font_size(points: float, frame_width: int) -> int:
+        """磅值字号换算为当前帧宽下的像素字号"""
+        return max(10, int(round(points * frame_width / FIGURE_WIDTH_POINTS)))
+
+    def _rasterize(self, text: str, font_size: int) -> Optional[Tuple[int, int, np.ndarray]]:
+        """栅格化单行文字：返回 (x偏移, y偏移, alpha位图 float32 0~1)，没有可用字体时返回None"""
+        font = self.fonts.get(font_size)
+        if font is None:
+            return None
+        left, top, right, bottom = font.getbbox(text)
+        width, height = max(right - left, 1), max(bottom - top, 1)
+        mask = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        return left, top, np.asarray(mask, dtype=np.float32) / 255.0
+
+    @staticmethod
+    def _blend(canvas: np.ndarray, alpha: np.ndarray, x0: int, y0: int, color: Sequence[int]) -> None:
+        """按alpha位图把纯色混合到画布上（超出画布的部分裁掉）"""
+        height, width = alpha.shape
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x0 + width, canvas.shape[1]), min(y0 + height, canvas.shape[0])
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        a = alpha[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0, None]
+        region = canvas[cy0:cy1, cx0:cx1].astype(np.float32)
+        region += (np.asarray(color, dtype=np.float32) - region) * a
+        canvas[cy0:cy1, cx0:cx1] = np.rint(region).astype(np.uint8)
+
+    def _text(self, canvas: np.ndarray, text: str, position: Tuple[int, int], font_size: int,
+              rendered: Optional[Tuple[int, int, np.ndarray]] = None) -> None:
+        """在position（文字外接框左上角）处绘制单行文字"""
+        rendered = rendered or self._rasterize(text, font_size)
+        if rendered is None:
+            # 没有任何可用字体时退回OpenCV绘制
+            cv2.putText(canvas, text, (position[0], position[1] + font_size), cv2.FONT_HERSHEY_SIMPLEX,
+                        font_size / 30, self.text_color, 1)
+            return
+        self._blend(canvas, rendered[2], position[0], position[1], self.text_color)
+
+    def _text_size(self, rendered: Optional[Tuple[int, int, np.ndarray]], text: str, font_size: int) -> Tuple[int, int]:
+        if rendered is None:
+            return int(len(text) * font_size * 0.6), font_size
+        height, width = rendered[2].shape
+        return width, height
+
+    def _badge(self, canvas: np.ndarray, text: str, anchor: Tuple[int, int], font_size: int,
+               color: Sequence[int], bottom: bool = False) -> None:
+        """绘制带圆角半透明底色的文字标签，anchor为底色框的左上角（bottom=True时为左下角）"""
+        rendered = self._rasterize(text, font_size)
+        text_w, text_h = self._text_size(rendered, text, font_size)
+        pad = max(4, font_size // 3)
+        box_w, box_h = text_w + 2 * pad, text_h + 2 * pad
+        x0 = anchor[0]
+        y0 = anchor[1] - box_h if bottom else anchor[1]
+
+        mask = Image.new('L', (box_w, box_h), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, box_w - 1, box_h - 1), radius=pad, fill=255)
+        self._blend(canvas, np.asarray(mask, dtype=np.float32) * (self.box_alpha / 255.0), x0, y0, color)
+        self._text(canvas, text, (x0 + pad, y0 + pad), font_size, rendered)
+
+    def compose(self, frame: np.ndarray, title: str, badge: Optional[str] = None, badge_color: str = 'yellow',
+                caption: Optional[str] = None, caption_color: str = 'lightblue') -> np.ndarray:
+        """合成一张分析截图，返回RGB图像（标题栏 + 帧）
+
+        Args:
+            frame: RGB帧（通常已绘制检测结果）
+            title: 标题，可包含换行
+            badge: 帧左上角的标签文字（如时间戳）
+            badge_color: 标签底色（BADGE_COLORS中的名称）
+            caption: 帧左下角的说明文字（如检测到的设备）
+            caption_color: 说明底色（BADGE_COLORS中的名称）
+        """
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+        height, width = frame.shape[:2]
+        title_size = self.font_size(self.title_points, width)
+
+        # 标题栏：各行栅格化后统计总高度
+        lines: List[Tuple[str, Optional[Tuple[int, int, np.ndarray]]]] = [
+            (line, self._rasterize(line, title_size)) for line in title.split('\n')
+        ]
+        line_gap = title_size // 3
+        banner_pad = title_size
+        line_heights = [self._text_size(rendered, line, title_size)[1] for line, rendered in lines]
+        banner_h = sum(line_heights) + line_gap * (len(lines) - 1) + 2 * banner_pad
+
+        canvas = np.empty((banner_h + height, width, 3), dtype=np.uint8)
+        canvas[:banner_h] = self.background
+        canvas[banner_h:] = frame
+
+        y = banner_pad
+        for (line, rendered), line_h in zip(lines, line_heights):
+            line_w = self._text_size(rendered, line, title_size)[0]
+            self._text(canvas, line, ((width - line_w) // 2, y), title_size, rendered)
+            y += line_h + line_gap
+
+        # 与原版式一致：标签距帧边缘2%
+        margin_x, margin_y = int(width * 0.02), int(height * 0.02)
+        if badge:
+            self._badge(canvas, badge, (margin_x, banner_h + margin_y), self.font_size(self.badge_points, width),
+                        BADGE_COLORS.get(badge_color, BADGE_COLORS['yellow']))
+        if caption:
+            self._badge(canvas, caption, (margin_x, banner_h + height - margin_y),
+                        self.font_size(self.caption_points, width),
+                        BADGE_COLORS.get(caption_color, BADGE_COLORS['lightblue']), bottom=True)
+        return canvas
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步截图写入
+
+截图保存原先在分析线程中逐张同步执行：RGB→BGR转换、PNG压缩、写盘，
+老师和学生每一帧都要等编码和磁盘完成后才能解码下一帧。
+截图写入器把这些工作交给后台线程池并行执行（OpenCV编码时释放GIL），
+分析线程提交后立即继续；只有积压的截图达到上限时才等待，以限制内存占用。
+
+支持 PNG（压缩级别）、JPEG、WebP（质量）三种格式。
+写入时可同时生成若干宽度的缩小版本（如320、800像素），前端按显示尺寸选用，减少传输量。
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from instrumentation import SpanRecorder
+
+logger = logging.getLogger('analyzer.screenshot_writer')
+
+# 格式 -> 文件扩展名
+SCREENSHOT_FORMATS = {
+    'png': '.png',
+    'jpeg': '.jpg',
+    'webp': '.webp',
+}
+SCREENSHOT_EXTENSIONS = tuple(SCREENSHOT_FORMATS.values())
+
+# 缩小版本文件名：<截图名>_w<宽度><扩展名>
+DERIVATIVE_SUFFIX = '_w'
+
+
+class ScreenshotWriter:
+    """后台线程池编码并写入截图
+
+    - submit() 提交RGB帧后立即返回Future（结果为截图内容的修订号，写入失败时为None），帧在写入完成前不得被修改
+    - 等待写入的截图超过 max_pending 张时 submit() 阻塞，直到有截图写完
+    - flush() 等待全部截图写完并释放线程池，下次提交时重新创建
+    """
+
+    def __init__(self, image_format: str = 'png', quality: int = 90, png_compression: int = 3,
+                 derivative_widths: Sequence[int] = (), workers: int = 2, max_pending: Optional[int] = None,
+                 timings: Optional[SpanRecorder] = None):
+        """
+        Args:
+            image_format: 'png'、'jpeg' 或 'webp'
+            quality: JPEG/WebP 质量（1-100）
+            png_compression: PNG 压缩级别（0-9），越大文件越小、编码越慢
+            derivative_widths: 同时生成的缩小版本宽度（像素），为空时只写原图；不小于帧宽的版本不生成
+            workers: 编码写盘线程数
+            max_pending: 等待写入的截图上限，默认为线程数的4倍
+            timings: 记录 'write_screenshot'（编码+写盘）和 'screenshot_backpressure'（提交时等待）耗时
+        """
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"不支持的截图格式: {image_format}")
+        self.image_format = image_format
+        self.quality = quality
+        self.png_compression = png_compression
+        self.derivative_widths = sorted({int(width) for width in derivative_widths if width and width > 0})
+        self.workers = max(1, workers or 1)
+        self.max_pending = max_pending or self.workers * 4
+        self.timings = timings or SpanRecorder()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def extension(self) -> str:
+        return SCREENSHOT_FORMATS[self.image_format]
+
+    @property
+    def encode_params(self) -> List[int]:
+        if self.image_format == 'png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        if self.image_format == 'jpeg':
+            return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+
+    def options(self) -> Dict:
+        """影响输出文件的编码参数（不含并行度），用于缓存键"""
+        return {
+            'image_format': self.image_format,
+            'quality': self.quality,
+            'png_compression': self.png_compression,
+            'derivative_widths': self.derivative_widths
+        }
+
+    def filename(self, stem: str) -> str:
+        """截图文件名（按当前格式加扩展名）"""
+        return stem + self.extension
+
+    @staticmethod
+    def derivative_filename(filename: str, width: int) -> str:
+        """截图指定宽度的缩小版本文件名"""
+        stem, extension = os.path.splitext(filename)
+        return f"{stem}{DERIVATIVE_SUFFIX}{width}{extension}"
+
+    def derivative_widths_for(self, frame_width: int) -> List[int]:
+        """对给定帧宽实际生成的缩小版本宽度"""
+        return [width for width in self.derivative_widths if width < frame_width]
+
+    def _encode_to_file(self, image_bgr: np.ndarray, path: str) -> Optional[bytes]:
+        """编码并写入文件，返回编码后的内容（编码失败时为None）"""
+        ok, encoded = cv2.imencode(self.extension, image_bgr, self.encode_params)
+        if not ok:
+            return None
+        data = encoded.tobytes()
+        with open(path, 'wb') as f:
+            f.write(data)
+        return data
+
+    def _write(self, frame: np.ndarray, path: str) -> Optional[str]:
+        start = time.perf_counter_ns()
+        try:
+            image_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) if frame.ndim == 3 else frame
+            data = self._encode_to_file(image_bgr, path)
+            if data is None:
+                logger.warning("截图编码失败: %s", path)
+                return None
+
+            # 从大到小逐级缩小，每级只在上一级的基础上做区域插值
+            height, width = image_bgr.shape[:2]
+            filename = os.path.basename(path)
+            for derivative_width in reversed(self.derivative_widths_for(width)):
+                size = (derivative_width, max(1, round(height * derivative_width / width)))
+                image_bgr = cv2.resize(image_bgr, size, interpolation=cv2.INTER_AREA)
+                derivative_path = os.path.join(os.path.dirname(path), self.derivative_filename(filename, derivative_width))
+                if self._encode_to_file(image_bgr, derivative_path) is None:
+                    logger.warning("缩小版本编码失败: %s", derivative_path)
+
+            # 修订号：原图内容哈希，内容不变时不变，可用作前端缓存的版本号
+            return hashlib.sha256(data).hexdigest()[:16]
+        except (cv2.error, OSError) as e:
+            logger.warning("写入截图失败 %s: %s", path, e)
+            return None
+        finally:
+            self.timings.observe('write_screenshot', time.perf_counter_ns() - start)
+            self._slots.release()
+
+    def submit(self, frame: np.ndarray, path: str) -> 'Future[Optional[str]]':
+        """提交一张RGB截图（单通道帧按灰度图写入），返回修订号的Future"""
+        with self.timings.span('screenshot_backpressure'):
+            self._slots.acquire()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='screenshot-writer')
+            return self._executor.submit(self._write, frame, path)
+
+    def flush(self) -> None:
+        """等待已提交的截图全部写完，并释放线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
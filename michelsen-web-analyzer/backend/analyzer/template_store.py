@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部件模板仓库
+
+缓存 partN.png 标注图片提取出的模板及其派生数据（灰度图、金字塔、特征点），
+避免每帧每个部件都重复读取图片并重新提取红框模板。
+
+- 内存缓存：按文件绝对路径记忆，稳态下不产生任何模板I/O
+- 磁盘缓存：按文件内容SHA-256保存为 .npz，进程重启后无需重新提取
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('analyzer.template_store')
+
+# 磁盘缓存格式版本，提取逻辑或字段变化时递增使旧缓存失效
+TEMPLATE_CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIRNAME = '.template_cache'
+
+
+def create_feature_detector():
+    """创建特征点检测器：优先SIFT，不可用时退回ORB"""
+    try:
+        return cv2.SIFT_create(), "SIFT"
+    except Exception:
+        return cv2.ORB_create(), "ORB"
+
+
+def keypoints_to_array(keypoints) -> np.ndarray:
+    """将cv2.KeyPoint列表转换为可序列化的数组"""
+    return np.array(
+        [(kp.pt[0], kp.pt[1], kp.size, kp.angle, kp.response, kp.octave, kp.class_id) for kp in keypoints],
+        dtype=np.float32
+    ).reshape(-1, 7)
+
+
+def array_to_keypoints(array: np.ndarray) -> List:
+    """从数组恢复cv2.KeyPoint列表"""
+    return [
+        cv2.KeyPoint(float(x), float(y), float(size), float(angle), float(response), int(octave), int(class_id))
+        for x, y, size, angle, response, octave, class_id in array
+    ]
+
+
+class TemplateStore:
+    """部件模板仓库"""
+
+    def __init__(self, extractor: Callable[[np.ndarray], Tuple[np.ndarray, Tuple[int, int, int, int]]],
+                 cache_dir: Optional[str] = None, pyramid_levels: int = 2, use_disk_cache: bool = True):
+        """
+        Args:
+            extractor: 模板提取函数，输入BGR标注图，返回 (模板, (x1, y1, x2, y2))
+            cache_dir: 磁盘缓存目录，默认为标注图片所在目录下的 .template_cache
+            pyramid_levels: 额外生成的金字塔层数（每层边长减半）
+            use_disk_cache: 是否读写磁盘缓存
+        """
+        self.extractor = extractor
+        self.cache_dir = cache_dir
+        self.pyramid_levels = pyramid_levels
+        self.use_disk_cache = use_disk_cache
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, part_path: str) -> Optional[Dict]:
+        """获取部件模板，文件不存在或无法读取时返回None"""
+        key = os.path.abspath(part_path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._entries[key] = entry
+        return entry
+
+    def preload(self, part_paths: Iterable[str]) -> int:
+        """预先加载一组模板，返回成功加载的数量"""
+        return sum(1 for path in part_paths if self.get(path) is not None)
+
+    def content_hash(self, part_path: str) -> Optional[str]:
+        """获取部件文件的内容哈希"""
+        entry = self.get(part_path)
+        return entry['hash'] if entry else None
+
+    def clear(self) -> None:
+        """清空内存缓存（部件文件被替换后调用）"""
+        with self._lock:
+            self._entries.clear()
+
+    def _cache_path(self, part_path: str, content_hash: str) -> str:
+        cache_dir = self.cache_dir or os.path.join(os.path.dirname(part_path), DEFAULT_CACHE_DIRNAME)
+        return os.path.join(cache_dir, f"{content_hash}.npz")
+
+    def _load(self, part_path: str) -> Optional[Dict]:
+        if not os.path.exists(part_path):
+            return None
+
+        with open(part_path, 'rb') as f:
+            data = f.read()
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        cache_path = self._cache_path(part_path, content_hash)
+        if self.use_disk_cache and os.path.exists(cache_path):
+            entry = self._read_cache(cache_path)
+            if entry is not None:
+                entry.update({'path': part_path, 'hash': content_hash})
+                return entry
+
+        labeled_img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if labeled_img is None:
+            return None
+
+        entry = self._build(labeled_img)
+        entry.update({'path': part_path, 'hash': content_hash})
+
+        if self.use_disk_cache:
+            self._write_cache(cache_path, entry)
+        return entry
+
+    def _build(self, labeled_img: np.ndarray) -> Dict:
+        template, bbox = self.extractor(labeled_img)
+        template = np.ascontiguousarray(template)
+        gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+        pyramid = []
+        level = template
+        for _ in range(self.pyramid_levels):
+            if min(level.shape[:2]) < 2:
+                break
+            level = cv2.pyrDown(level)
+            pyramid.append(level)
+
+        detector, detector_name = create_feature_detector()
+        keypoints, descriptors = detector.detectAndCompute(template, None)
+
+        return {
+            'template': template,
+            'bbox': tuple(int(v) for v in bbox),
+            'gray': gray,
+            'pyramid': pyramid,
+            'keypoints': list(keypoints),
+            'descriptors': descriptors,
+            'detector': detector_name,
+            'labeled_shape': labeled_img.shape
+        }
+
+    def _read_cache(self, cache_path: str) -> Optional[Dict]:
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                if int(cached['version']) != TEMPLATE_CACHE_VERSION:
+                    return None
+                if int(cached['pyramid_levels']) != self.pyramid_levels:
+                    return None
+                pyramid = [cached[f'pyramid_{i}'] for i in range(int(cached['pyramid_count']))]
+                descriptors = cached['descriptors'] if bool(cached['has_descriptors']) else None
+                return {
+                    'template': cached['template'],
+                    'bbox': tuple(int(v) for v in cached['bbox']),
+                    'gray': cached['gray'],
+                    'pyramid': pyramid,
+                    'keypoints': array_to_keypoints(cached['keypoints']),
+                    'descriptors': descriptors,
+                    'detector': str(cached['detector']),
+                    'labeled_shape': tuple(int(v) for v in cached['labeled_shape'])
+                }
+        except Exception as e:
+            logger.warning("模板缓存读取失败，重新提取: %s (%s)", cache_path, e)
+            return None
+
+    def _write_cache(self, cache_path: str, entry: Dict) -> None:
+        arrays = {
+            'version': np.array(TEMPLATE_CACHE_VERSION),
+            'template': entry['template'],
+            'bbox': np.array(entry['bbox']),
+            'gray': entry['gray'],
+            'pyramid_levels': np.array(self.pyramid_levels),
+            'pyramid_count': np.array(len(entry['pyramid'])),
+            'keypoints': keypoints_to_array(entry['keypoints']),
+            'has_descriptors': np.array(entry['descriptors'] is not None),
+            'descriptors': entry['descriptors'] if entry['descriptors'] is not None else np.zeros((0, 0)),
+            'detector': np.array(entry['detector']),
+            'labeled_shape': np.array(entry['labeled_shape'])
+        }
+        for i, level in enumerate(entry['pyramid']):
+            arrays[f'pyramid_{i}'] = level
+
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning("模板缓存写入失败: %s (%s)", cache_path, e)
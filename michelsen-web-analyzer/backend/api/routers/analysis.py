@@ -1,28 +1,40 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from pathlib import Path
+import functools
+import hashlib
 import json
+import logging
+import shutil
 import uuid
 import os
 from typing import Dict, Any, Optional
 import asyncio
 
 from core.config import settings
-from services.analyzer_service import AnalyzerService
-from api.routers.upload import uploaded_files
+from core.logging_config import bind_analysis_id
+from services.job_executor import job_executor
+from services.job_store import job_store
+from services.progress_broker import progress_broker
+from services.progress_tracker import job_progress_callbacks
 
 router = APIRouter()
 
-# 全局变量存储分析结果
-analysis_results: Dict[str, Dict[str, Any]] = {}
-analysis_status: Dict[str, Dict[str, Any]] = {}
+# 步骤截图格式可配置（见 settings.screenshot_format）
+SCREENSHOT_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp"
+}
+
+logger = logging.getLogger(__name__)
 
 @router.post("/start")
 async def start_analysis(background_tasks: BackgroundTasks, include_device_detection: bool = True):
     """开始 AI 分析"""
     
     # 检查文件是否已上传
-    if not all(uploaded_files.values()):
+    if not all(job_store.get_uploads().values()):
         raise HTTPException(
             status_code=400, 
             detail="请先上传老师示范视频和学生实验视频"
@@ -32,14 +44,7 @@ async def start_analysis(background_tasks: BackgroundTasks, include_device_detec
     analysis_id = str(uuid.uuid4())
     
     # 初始化分析状态
-    analysis_status[analysis_id] = {
-        "status": "running",
-        "progress": 0,
-        "current_step": "正在初始化分析...",
-        "include_device_detection": include_device_detection,
-        "created_at": "",  # TODO: 添加时间戳
-        "error": None
-    }
+    job_store.create(analysis_id, include_device_detection=include_device_detection)
     
     # 后台异步执行分析
     background_tasks.add_task(run_analysis, analysis_id, include_device_detection)
@@ -51,90 +56,195 @@ async def start_analysis(background_tasks: BackgroundTasks, include_device_detec
     }
 
 async def run_analysis(analysis_id: str, include_device_detection: bool):
-    """异步执行分析任务"""
+    """异步执行分析任务（期间的日志自动附加analysis_id）"""
+    with bind_analysis_id(analysis_id), job_store.track(analysis_id):
+        await _run_analysis(analysis_id, include_device_detection)
+
+async def _run_analysis(analysis_id: str, include_device_detection: bool):
     try:
-        # 初始化分析服务（确保使用绝对路径）
+        # 分析服务在工作进程中运行（确保使用绝对路径）
         upload_dir = os.path.abspath(str(settings.upload_dir))
         static_dir = os.path.abspath(str(settings.static_dir))
         
-        service = AnalyzerService(
-            upload_dir=upload_dir,
-            static_dir=static_dir
-        )
-        
         # 获取上传的文件路径
+        uploaded_files = job_store.get_uploads()
         teacher_path = uploaded_files["teacher"]["filepath"]
         student_path = uploaded_files["student"]["filepath"]
         
-        # 执行分析，传递进度回调
-        def progress_callback(step: str):
-            analysis_status[analysis_id].update({
-                "current_step": step,
-                "progress": min(analysis_status[analysis_id].get("progress", 0) + 10, 90)  # 渐进式进度
-            })
+        # 执行分析，传递进度回调：步骤描述 + 按实测吞吐量计算的百分比和ETA
+        progress_callback, event_callback = job_progress_callbacks(analysis_id)
         
-        # 调用新的分析服务
-        result = await service.analyze_videos(
+        # 提交到分析进程池，等待期间事件循环可继续处理上传和进度查询
+        result = await job_executor.submit(
+            analysis_id,
             teacher_video_path=teacher_path,
             student_video_path=student_path,
-            progress_callback=progress_callback
+            upload_dir=upload_dir,
+            static_dir=static_dir,
+            progress_callback=progress_callback,
+            event_callback=event_callback
         )
         
         # 保存结果
-        analysis_results[analysis_id] = result
-        analysis_status[analysis_id].update({
-            "status": "completed",
-            "progress": 100,
-            "current_step": "分析完成!"
-        })
+        job_store.set_result(analysis_id, result)
         
     except Exception as e:
-        print(f"分析任务执行失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("分析任务执行失败: %s", e)
         
-        analysis_status[analysis_id].update({
-            "status": "error",
-            "error": str(e),
-            "current_step": f"分析失败: {str(e)}"
-        })
+        job_store.update_status(
+            analysis_id,
+            status="error",
+            error=str(e),
+            current_step=f"分析失败: {str(e)}"
+        )
+    
+    finally:
+        progress_broker.close(analysis_id)
 
 @router.get("/progress/{analysis_id}")
 async def get_analysis_progress(analysis_id: str):
     """获取分析进度"""
-    if analysis_id not in analysis_status:
+    # 执行进程已退出的任务不会再有进度，标记为失败，前端轮询随之结束
+    job_store.fail_stale(settings.job_stale_seconds, analysis_id)
+    status = job_store.get_status(analysis_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="分析任务不存在")
+    
+    return status
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@router.get("/progress/{analysis_id}/stream")
+async def stream_analysis_progress(analysis_id: str, request: Request):
+    """以 Server-Sent Events 推送分析进度
+    
+    事件类型：
+    - status: 任务状态（连接时、空闲回查时状态有变化、任务结束时）
+    - step: 分析阶段描述
+    - progress: 分析器的逐帧/逐部件/逐截图进度 {stage, current, total, counters, progress, eta_seconds, ...}
+    任务完成或失败时发送最终 status 事件后关闭连接。
+    """
+    status = job_store.get_status(analysis_id)
+    if status is None:
         raise HTTPException(status_code=404, detail="分析任务不存在")
     
-    return analysis_status[analysis_id]
+    queue = progress_broker.subscribe(analysis_id)
+    
+    async def events():
+        last_status = status
+        try:
+            yield _format_sse("status", last_status)
+            while last_status["status"] == "running":
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.progress_stream_poll_seconds)
+                except asyncio.TimeoutError:
+                    # 任务可能由其他服务进程执行，其事件不会到达本进程：回查任务状态，同时作为心跳；
+                    # 执行进程已退出（心跳停止）的任务标记为失败，连接随之结束
+                    job_store.fail_stale(settings.job_stale_seconds, analysis_id)
+                    current = job_store.get_status(analysis_id)
+                    if current is None:
+                        break
+                    if current != last_status:
+                        last_status = current
+                        yield _format_sse("status", last_status)
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                
+                if event is None:
+                    # 任务结束，发送最终状态
+                    last_status = job_store.get_status(analysis_id) or last_status
+                    yield _format_sse("status", last_status)
+                    break
+                yield _format_sse(event["type"], event)
+        finally:
+            progress_broker.unsubscribe(analysis_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/results/{analysis_id}")
 async def get_analysis_results(analysis_id: str):
     """获取分析结果"""
-    if analysis_id not in analysis_results:
+    result = job_store.get_result(analysis_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="分析结果不存在")
     
-    return analysis_results[analysis_id]
+    return result
 
-@router.get("/screenshots/{filename}")
-async def get_screenshot(filename: str):
-    """获取分析截图"""
-    screenshot_path = Path(settings.static_dir) / "screenshots" / filename
+def _result_file(analysis_id: str, kind: str, filename: str) -> Optional[Path]:
+    """分析任务发布的结果文件 static_dir/<analysis_id>/<kind>/<filename>，任务或文件不存在时为None"""
+    if Path(filename).name != filename or filename in (".", ".."):
+        return None
+    if job_store.get_status(analysis_id) is None:
+        return None
+    path = Path(settings.static_dir) / analysis_id / kind / filename
+    return path if path.is_file() else None
+
+@router.get("/screenshots/{analysis_id}/{filename}")
+async def get_screenshot(analysis_id: str, filename: str, size: str = "original", v: Optional[str] = None):
+    """获取分析截图
+    
+    Args:
+        size: "original"（默认）或显示宽度（像素），返回不小于该宽度的最小缩小版本，没有时返回原图
+        v: 截图修订号（截图解释中的 revision），带修订号的请求允许浏览器长期缓存
+    """
+    screenshot_path = _result_file(analysis_id, "screenshots", filename)
     
-    if not screenshot_path.exists():
+    if screenshot_path is None:
         raise HTTPException(status_code=404, detail="截图文件不存在")
     
+    original_path = screenshot_path
+    if size != "original":
+        if not size.isdigit():
+            raise HTTPException(status_code=400, detail="size 必须为 original 或像素宽度")
+        screenshot_path = _screenshot_variant_path(screenshot_path, int(size))
+    
+    # 修订号与原图当前内容一致时URL内容不会再变，允许长期缓存；不一致（过期或伪造的链接）时每次重新验证
+    if v and v == _screenshot_revision(str(original_path)):
+        cache_control = f"public, max-age={settings.screenshot_cache_max_age}, immutable"
+    else:
+        cache_control = "no-cache"
+    
     return FileResponse(
         path=screenshot_path,
-        media_type="image/png",
-        filename=filename
+        media_type=SCREENSHOT_MEDIA_TYPES.get(screenshot_path.suffix.lower(), "application/octet-stream"),
+        filename=screenshot_path.name,
+        headers={"Cache-Control": cache_control}
     )
 
-@router.get("/images/{filename}")
-async def get_image(filename: str):
+def _screenshot_revision(path: str) -> str:
+    """截图修订号：原图内容哈希的前16位（同 ScreenshotWriter 写入时返回的修订号），按文件大小和修改时间缓存"""
+    stat = os.stat(path)
+    return _hash_screenshot(path, stat.st_size, stat.st_mtime_ns)
+
+@functools.lru_cache(maxsize=1024)
+def _hash_screenshot(path: str, size: int, mtime_ns: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def _screenshot_variant_path(screenshot_path: Path, width: int) -> Path:
+    """不小于width的最小已生成缩小版本（文件名同 ScreenshotWriter.derivative_filename），没有时为原图"""
+    for variant_width in sorted(settings.screenshot_derivative_widths):
+        if variant_width < width:
+            continue
+        variant_path = screenshot_path.with_name(f"{screenshot_path.stem}_w{variant_width}{screenshot_path.suffix}")
+        if variant_path.exists():
+            return variant_path
+    return screenshot_path
+
+@router.get("/images/{analysis_id}/{filename}")
+async def get_image(analysis_id: str, filename: str):
     """获取分析图片（如检测结果图）"""
-    image_path = Path(settings.static_dir) / "images" / filename
+    image_path = _result_file(analysis_id, "images", filename)
     
-    if not image_path.exists():
+    if image_path is None:
         raise HTTPException(status_code=404, detail="图片文件不存在")
     
     return FileResponse(
@@ -143,12 +253,12 @@ async def get_image(filename: str):
         filename=filename
     )
 
-@router.get("/reports/{filename}")
-async def get_report(filename: str):
+@router.get("/reports/{analysis_id}/{filename}")
+async def get_report(analysis_id: str, filename: str):
     """获取分析报告JSON文件"""
-    report_path = Path(settings.static_dir) / "reports" / filename
+    report_path = _result_file(analysis_id, "reports", filename)
     
-    if not report_path.exists():
+    if report_path is None:
         raise HTTPException(status_code=404, detail="报告文件不存在")
     
     # 返回JSON内容而不是文件下载
@@ -160,17 +270,18 @@ async def get_report(filename: str):
 @router.get("/list")
 async def list_analyses():
     """获取所有分析记录"""
+    analysis_ids = job_store.list_ids()
     return {
-        "analyses": list(analysis_status.keys()),
-        "count": len(analysis_status)
+        "analyses": analysis_ids,
+        "count": len(analysis_ids)
     }
 
 @router.delete("/clear")
 async def clear_analyses():
-    """清空所有分析记录"""
-    global analysis_results, analysis_status
-    analysis_results.clear()
-    analysis_status.clear()
+    """清空所有分析记录及其发布的结果文件"""
+    for analysis_id in job_store.list_ids():
+        shutil.rmtree(Path(settings.static_dir) / analysis_id, ignore_errors=True)
+    job_store.clear()
     
     return {
         "success": True,
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import shutil
+import uuid
+from typing import List
+
+from core.config import settings
+from core.logging_config import bind_analysis_id
+from services.batch_service import run_batch
+from services.job_store import job_store
+from services.upload_service import UploadTooLargeError, save_upload_stream
+from api.routers.upload import validate_video_file
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# 正在运行的批量任务（保持引用，客户端断开后任务仍会完成）
+running_batches = set()
+
+@router.post("")
+async def start_batch_analysis(
+    teacher: UploadFile = File(...),
+    students: List[UploadFile] = File(...)
+):
+    """批量分析：一个老师示范视频 + 多个学生视频
+
+    以NDJSON流逐行返回：batch_started、每名学生完成时的student_result、最后的batch_summary（班级统计）
+    """
+
+    # 验证文件
+    for file in [teacher, *students]:
+        if not validate_video_file(file):
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的文件格式: {file.filename}，请上传 mp4/avi/mov 格式的视频文件"
+            )
+
+    batch_id = uuid.uuid4().hex
+
+    # 每个批次使用独立的上传目录，不覆盖单次分析的 teacher.mp4/student.mp4
+    batch_dir = Path(settings.upload_dir).resolve() / "batches" / batch_id
+    students_dir = batch_dir / "students"
+    students_dir.mkdir(parents=True, exist_ok=True)
+
+    teacher_path = batch_dir / f"teacher{Path(teacher.filename).suffix.lower()}"
+    student_files = [
+        {"filename": file.filename, "filepath": str(students_dir / f"{index:03d}{Path(file.filename).suffix.lower()}")}
+        for index, file in enumerate(students)
+    ]
+
+    current = teacher.filename
+    try:
+        await save_upload_stream(teacher, str(teacher_path))
+        for file, student in zip(students, student_files):
+            current = file.filename
+            await save_upload_stream(file, student["filepath"])
+    except UploadTooLargeError as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=f"{current}: {str(e)}")
+    except Exception as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event):
+        await events.put(event)
+
+    async def run():
+        try:
+            with bind_analysis_id(batch_id):
+                await run_batch(
+                    batch_id,
+                    teacher_video_path=str(teacher_path),
+                    students=student_files,
+                    upload_dir=os.path.abspath(str(settings.upload_dir)),
+                    static_dir=os.path.abspath(str(settings.static_dir)),
+                    emit=emit
+                )
+        except Exception as e:
+            logger.exception("批量分析失败: %s", e)
+            job_store.update_status(batch_id, status="error", error=str(e), current_step=f"批量分析失败: {str(e)}")
+            await events.put({"type": "batch_error", "batch_id": batch_id, "error": str(e)})
+        finally:
+            # 批次上传的视频只在分析期间使用，结束后（无论成败）删除
+            shutil.rmtree(batch_dir, ignore_errors=True)
+            await events.put(None)
+
+    task = asyncio.create_task(run())
+    running_batches.add(task)
+    task.add_done_callback(running_batches.discard)
+
+    async def stream():
+        yield json.dumps({"type": "batch_started", "batch_id": batch_id, "total": len(student_files)},
+                         ensure_ascii=False) + "\n"
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/{batch_id}")
+async def get_batch(batch_id: str):
+    """获取批量分析进度或班级统计结果"""
+    job_store.fail_stale(settings.job_stale_seconds, batch_id)
+    status = job_store.get_status(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="批量分析任务不存在")
+
+    return {
+        **status,
+        "batch_id": batch_id,
+        "summary": job_store.get_result(batch_id)
+    }
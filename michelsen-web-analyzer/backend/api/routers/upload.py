@@ -1,21 +1,36 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Request
 from fastapi.responses import FileResponse
 from pathlib import Path
+from pydantic import BaseModel, Field
 import os
 import shutil
 from typing import Optional
 import uuid
 
 from core.config import settings
+from services.job_store import job_store
+from services.upload_service import (
+    UploadOffsetError,
+    UploadSessionNotFoundError,
+    UploadTooLargeError,
+    save_upload_stream,
+    upload_sessions
+)
+from services.video_streaming import build_video_response
 
 router = APIRouter()
 
-# 全局变量存储上传的文件信息
-uploaded_files = {
-    "teacher": None,
-    "student": None
+VIDEO_TYPE_LABELS = {
+    "teacher": "老师",
+    "student": "学生"
 }
 
+class UploadSessionRequest(BaseModel):
+    """创建分块上传会话的请求"""
+    video_type: str
+    filename: str
+    total_size: int = Field(gt=0)  # 空文件不能作为视频上传
+
 def validate_video_file(file: UploadFile) -> bool:
     """验证视频文件"""
     if not file.filename:
@@ -28,9 +43,12 @@ def validate_video_file(file: UploadFile) -> bool:
     
     return True
 
-@router.post("/teacher")
-async def upload_teacher_video(file: UploadFile = File(...)):
-    """上传老师示范视频"""
+def is_allowed_video_filename(filename: str) -> bool:
+    """检查文件名的扩展名是否为支持的视频格式"""
+    return bool(filename) and Path(filename).suffix.lower() in settings.allowed_video_extensions
+
+async def save_video_upload(video_type: str, file: UploadFile) -> dict:
+    """流式保存老师/学生视频，并记录上传信息（包括内容哈希）"""
     
     # 验证文件
     if not validate_video_file(file):
@@ -40,75 +58,103 @@ async def upload_teacher_video(file: UploadFile = File(...)):
         )
     
     try:
-        # 保存文件
         upload_dir = Path(settings.upload_dir)
         upload_dir.mkdir(exist_ok=True)
         
-        file_path = upload_dir / "teacher.mp4"
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # 更新全局状态
-        uploaded_files["teacher"] = {
-            "filename": file.filename,
-            "filepath": str(file_path),
-            "size": file_path.stat().st_size
-        }
-        
-        return {
-            "success": True,
-            "message": "老师视频上传成功",
-            "filename": file.filename,
-            "size": file_path.stat().st_size,
-            "preview_url": f"/api/videos/teacher.mp4"
-        }
+        file_path = upload_dir / f"{video_type}.mp4"
         
+        # 分块写入，同时计算哈希并检查大小限制
+        saved = await save_upload_stream(file, str(file_path))
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
+    
+    # 记录上传信息（所有工作进程共享）
+    job_store.set_upload(video_type, {
+        "filename": file.filename,
+        "filepath": str(file_path),
+        "size": saved["size"],
+        "sha256": saved["sha256"]
+    })
+    
+    return {
+        "success": True,
+        "message": f"{VIDEO_TYPE_LABELS[video_type]}视频上传成功",
+        "filename": file.filename,
+        "size": saved["size"],
+        "sha256": saved["sha256"],
+        "preview_url": f"/api/videos/{video_type}.mp4"
+    }
+
+@router.post("/teacher")
+async def upload_teacher_video(file: UploadFile = File(...)):
+    """上传老师示范视频"""
+    return await save_video_upload("teacher", file)
 
 @router.post("/student")
 async def upload_student_video(file: UploadFile = File(...)):
     """上传学生实验视频"""
-    
-    # 验证文件
-    if not validate_video_file(file):
+    return await save_video_upload("student", file)
+
+@router.post("/sessions")
+async def create_upload_session(request: UploadSessionRequest):
+    """创建可断点续传的分块上传会话（适用于较大的实验录像）"""
+    if request.video_type not in VIDEO_TYPE_LABELS:
+        raise HTTPException(status_code=400, detail="视频类型不存在")
+    if not is_allowed_video_filename(request.filename):
         raise HTTPException(
             status_code=400, 
             detail="不支持的文件格式，请上传 mp4/avi/mov 格式的视频文件"
         )
     
+    target_path = Path(settings.upload_dir) / f"{request.video_type}.mp4"
     try:
-        # 保存文件
-        upload_dir = Path(settings.upload_dir)
-        upload_dir.mkdir(exist_ok=True)
-        
-        file_path = upload_dir / "student.mp4"
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # 更新全局状态
-        uploaded_files["student"] = {
-            "filename": file.filename,
-            "filepath": str(file_path),
-            "size": file_path.stat().st_size
-        }
-        
-        return {
-            "success": True,
-            "message": "学生视频上传成功",
-            "filename": file.filename,
-            "size": file_path.stat().st_size,
-            "preview_url": f"/api/videos/student.mp4"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
+        return upload_sessions.create(
+            str(target_path),
+            request.total_size,
+            metadata={"video_type": request.video_type, "filename": request.filename}
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@router.get("/sessions/{upload_id}")
+async def get_upload_session(upload_id: str):
+    """查询分块上传进度，客户端从返回的offset处续传"""
+    try:
+        return upload_sessions.status(upload_id)
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.put("/sessions/{upload_id}")
+async def upload_session_chunk(upload_id: str, offset: int, request: Request):
+    """上传一个数据块（请求体为原始字节，offset为该块在文件中的起始位置）"""
+    try:
+        result = await upload_sessions.append(upload_id, offset, request.stream())
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.expected_offset})
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if result["complete"]:
+        video_type = result["metadata"]["video_type"]
+        job_store.set_upload(video_type, {
+            "filename": result["metadata"]["filename"],
+            "filepath": result["target_path"],
+            "size": result["size"],
+            "sha256": result["sha256"]
+        })
+        result["message"] = f"{VIDEO_TYPE_LABELS[video_type]}视频上传成功"
+        result["preview_url"] = f"/api/videos/{video_type}.mp4"
+    
+    return result
 
 @router.get("/status")
 async def get_upload_status():
     """获取上传状态"""
+    uploaded_files = job_store.get_uploads()
     return {
         "teacher_uploaded": uploaded_files["teacher"] is not None,
         "student_uploaded": uploaded_files["student"] is not None,
@@ -116,9 +162,9 @@ async def get_upload_status():
         "files": uploaded_files
     }
 
-@router.get("/videos/{video_type}")
-async def get_video(video_type: str):
-    """获取视频文件用于预览"""
+@router.api_route("/videos/{video_type}", methods=["GET", "HEAD"])
+async def get_video(video_type: str, request: Request):
+    """获取视频文件用于预览（支持Range分段读取和ETag/Last-Modified条件请求）"""
     if video_type not in ["teacher", "student"]:
         raise HTTPException(status_code=404, detail="视频类型不存在")
     
@@ -127,8 +173,10 @@ async def get_video(video_type: str):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="视频文件不存在")
     
-    return FileResponse(
-        path=file_path,
+    return build_video_response(
+        str(file_path),
+        request.headers,
+        method=request.method,
         media_type="video/mp4",
-        filename=f"{video_type}.mp4"
+        extra_headers={"Content-Disposition": f'inline; filename="{video_type}.mp4"'}
     )
\ No newline at end of file
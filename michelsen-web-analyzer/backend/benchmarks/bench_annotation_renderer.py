@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检测结果标注渲染性能对比脚本
+
+在学生视频的一帧上绘制不同数量的检测结果，对比三种方式的单帧耗时：
+1. 逐标签：每个检测调用一次 draw_chinese_text（每个标签两次整帧PIL转换，旧实现）
+2. 单次PIL：AnnotationRenderer(glyph_cache=False)，全部标签在一次PIL转换中绘制
+3. 字形缓存：AnnotationRenderer(glyph_cache=True)，预栅格化的标签位图直接alpha混合
+
+同时校验后两种方式与逐标签方式的像素差异（标签与边界框不重叠时应完全一致）。
+
+使用方法：
+python benchmarks/bench_annotation_renderer.py [视频路径] [时间点秒数] [重复次数]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(backend_dir, 'analyzer'))
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from annotation_renderer import AnnotationRenderer
+
+DEFAULT_VIDEO = os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'web', 'student.mp4')
+DETECTION_COUNTS = [1, 2, 4, 7, 14, 28]
+
+
+def per_label_render(analyzer, frame, detections):
+    """旧实现：边界框用OpenCV绘制，每个中文标签单独调用draw_chinese_text"""
+    result_frame = frame.copy()
+    for i, detection in enumerate(detections):
+        x1, y1, x2, y2 = detection['bbox']
+        color = analyzer.colors[i % len(analyzer.colors)]
+        cv2.rectangle(result_frame, (x1, y1), (x2, y2), color, 3)
+        result_frame = analyzer.draw_chinese_text(result_frame, detection['name'], (x1, max(30, y1 - 10)),
+                                                  font_size=30, text_color=color)
+        cv2.putText(result_frame, f"{detection['confidence']:.3f}", (x1, y2 + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return result_frame
+
+
+def make_detections(analyzer, count, width, height):
+    """在帧上按网格排布count个互不重叠的检测结果，名称循环使用7个部件名"""
+    names = [info['chinese'] for info in analyzer.component_mapping.values()]
+    columns = 7
+    cell_w, cell_h = width // columns, height // ((count + columns - 1) // columns + 1)
+    detections = []
+    for i in range(count):
+        x1 = (i % columns) * cell_w + 10
+        y1 = (i // columns) * cell_h + 60
+        detections.append({
+            'name': names[i % len(names)],
+            'bbox': (x1, y1, x1 + cell_w - 40, y1 + cell_h - 70),
+            'confidence': 0.5 + (i % 5) * 0.1
+        })
+    return detections
+
+
+def time_per_frame(render, repeats):
+    render()  # 预热（字体加载、字形栅格化）
+    start = time.perf_counter()
+    for _ in range(repeats):
+        render()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run_benchmark(video_path=DEFAULT_VIDEO, time_seconds=108, repeats=20):
+    analyzer = MichelsonInterferometerAnalyzer()
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = list(analyzer.iter_frames_at_timestamps(cap, [time_seconds], fps))
+    cap.release()
+    if not frames:
+        print(f"❌ 无法读取 {video_path} 在 {time_seconds}秒 的帧")
+        return
+    frame = frames[0][1]
+    height, width = frame.shape[:2]
+
+    single_pass = AnnotationRenderer(glyph_cache=False)
+    glyph_cached = AnnotationRenderer(glyph_cache=True)
+
+    print(f"目标帧: {video_path} @ {time_seconds}s ({width}×{height}), 重复 {repeats} 次取平均")
+    print(f"字体: {single_pass.fonts.font_path or 'PIL默认字体'}")
+    print()
+    print("| 检测数 | 逐标签 (ms) | 单次PIL (ms) | 字形缓存 (ms) | 字形缓存加速比 | 最大像素差 |")
+    print("|---:|---:|---:|---:|---:|---:|")
+    for count in DETECTION_COUNTS:
+        detections = make_detections(analyzer, count, width, height)
+        reference = per_label_render(analyzer, frame, detections)
+        max_diff = max(
+            int(np.abs(renderer.render(frame, detections, analyzer.colors).astype(np.int16) - reference).max())
+            for renderer in (single_pass, glyph_cached)
+        )
+
+        legacy_ms = time_per_frame(lambda: per_label_render(analyzer, frame, detections), repeats)
+        single_ms = time_per_frame(lambda: single_pass.render(frame, detections, analyzer.colors), repeats)
+        glyph_ms = time_per_frame(lambda: glyph_cached.render(frame, detections, analyzer.colors), repeats)
+        print(f"| {count} | {legacy_ms:.2f} | {single_ms:.2f} | {glyph_ms:.2f} | "
+              f"{legacy_ms / glyph_ms:.1f}x | {max_diff} |")
+
+
+if __name__ == "__main__":
+    video = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 108
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    run_benchmark(video, seconds, repeats)
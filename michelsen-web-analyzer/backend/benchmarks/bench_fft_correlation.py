@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FFT相关后端与cv2.matchTemplate对比脚本
+
+在学生视频的一帧上，用全部部件模板的全部尺度分别运行两种后端，
+校验三种归一化方法的结果误差不超过 FFT_SCORE_TOLERANCE，并对比耗时。
+
+使用方法：
+python benchmarks/bench_fft_correlation.py [视频路径] [时间点秒数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(backend_dir, 'analyzer'))
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from fft_correlation import FFTCorrelator, FFT_SCORE_TOLERANCE
+
+web_dir = os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'web')
+DEFAULT_VIDEO = os.path.join(web_dir, 'student.mp4')
+SCALES = [0.8, 0.9, 1.0, 1.1, 1.2]
+
+
+def run_benchmark(video_path=DEFAULT_VIDEO, time_seconds=108):
+    analyzer = MichelsonInterferometerAnalyzer()
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = list(analyzer.iter_frames_at_timestamps(cap, [time_seconds], fps))
+    cap.release()
+    if not frames:
+        print(f"❌ 无法读取 {video_path} 在 {time_seconds}秒 的帧")
+        return False
+    target = cv2.cvtColor(frames[0][1], cv2.COLOR_RGB2BGR)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        templates = [analyzer.template_store.get(os.path.join(web_dir, f'part{i}.png')) for i in range(1, 8)]
+    templates = [entry['template'] for entry in templates if entry is not None]
+
+    methods = analyzer.TEMPLATE_MATCH_METHODS
+    max_error = {method: 0.0 for method in methods}
+    opencv_time = 0.0
+
+    start = time.perf_counter()
+    correlator = FFTCorrelator(target)
+    fft_time = time.perf_counter() - start
+
+    correlations = 0
+    for template in templates:
+        for scale in SCALES:
+            size = (int(template.shape[1] * scale), int(template.shape[0] * scale))
+            if size[0] > target.shape[1] or size[1] > target.shape[0]:
+                continue
+            scaled = cv2.resize(template, size)
+            correlations += 1
+
+            start = time.perf_counter()
+            fft_results = correlator.match(scaled, methods)
+            fft_time += time.perf_counter() - start
+
+            for method in methods:
+                start = time.perf_counter()
+                reference = cv2.matchTemplate(target, scaled, method)
+                opencv_time += time.perf_counter() - start
+                max_error[method] = max(max_error[method], float(np.abs(reference - fft_results[method]).max()))
+
+    names = {cv2.TM_CCOEFF_NORMED: 'TM_CCOEFF_NORMED', cv2.TM_CCORR_NORMED: 'TM_CCORR_NORMED',
+             cv2.TM_SQDIFF_NORMED: 'TM_SQDIFF_NORMED'}
+    print(f"目标帧: {video_path} @ {time_seconds}s ({target.shape[1]}×{target.shape[0]}), 模板×尺度: {correlations}")
+    print(f"cv2.matchTemplate: {opencv_time:.2f}s")
+    print(f"FFT后端(含目标帧频谱): {fft_time:.2f}s, 加速 {opencv_time / fft_time:.1f}x")
+    ok = True
+    for method in methods:
+        passed = max_error[method] <= FFT_SCORE_TOLERANCE
+        ok = ok and passed
+        print(f"  {names[method]:<18} 最大误差 {max_error[method]:.2e} {'✅' if passed else '❌'}")
+    return ok
+
+
+if __name__ == "__main__":
+    video = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 108
+    run_benchmark(video, seconds)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帧采样性能对比脚本
+
+对比三种提取分析时间点帧的方式：
+1. 旧方式：每个时间戳调用 extract_frame_at_timestamp（每次新建VideoCapture + seek）
+2. 纯顺序：iter_frames_at_timestamps 禁用seek（只打开一次视频，全程grab跳帧，只retrieve目标帧）
+3. 默认：iter_frames_at_timestamps（短间隔grab跳帧，长间隔在同一个cap上seek）
+
+同时校验各方式得到的帧完全一致。
+
+使用方法：
+python benchmarks/bench_frame_sampler.py [视频路径] [间隔秒数] [重复次数]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(backend_dir, 'analyzer'))
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+DEFAULT_VIDEO = os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'web', 'student.mp4')
+
+
+def seek_per_timestamp(analyzer, video_path, timestamps):
+    """旧方式：每个时间戳单独打开视频并seek"""
+    frames = []
+    for t in timestamps:
+        frame = analyzer.extract_frame_at_timestamp(video_path, t)
+        if frame is not None:
+            frames.append((t, frame))
+    return frames
+
+
+def sequential_sampler(analyzer, video_path, timestamps, max_grab_gap=None):
+    """新方式：单次打开视频采样"""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = list(analyzer.iter_frames_at_timestamps(cap, timestamps, fps, max_grab_gap=max_grab_gap))
+    cap.release()
+    return frames
+
+
+def pure_sequential_sampler(analyzer, video_path, timestamps):
+    """纯顺序采样：从不seek"""
+    return sequential_sampler(analyzer, video_path, timestamps, max_grab_gap=sys.maxsize)
+
+
+def run_benchmark(video_path=DEFAULT_VIDEO, interval=10, repeat=3):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"❌ 无法打开视频文件: {video_path}")
+        return False
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    duration = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) / fps
+    cap.release()
+
+    timestamps = list(range(0, int(duration), interval))
+    analyzer = MichelsonInterferometerAnalyzer()
+
+    print(f"视频: {video_path}")
+    print(f"时长: {duration:.1f}s, 采样间隔: {interval}s, 时间点数: {len(timestamps)}, 重复: {repeat} 次")
+    print("=" * 60)
+
+    results = {}
+    samplers = [
+        ('逐时间戳seek', seek_per_timestamp),
+        ('纯顺序grab', pure_sequential_sampler),
+        ('默认(grab+seek)', sequential_sampler),
+    ]
+    for name, func in samplers:
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            frames = func(analyzer, video_path, timestamps)
+            elapsed.append(time.perf_counter() - start)
+        results[name] = frames
+        best = min(elapsed)
+        print(f"{name:<20} 最佳 {best*1000:8.1f} ms, 平均 {sum(elapsed)/len(elapsed)*1000:8.1f} ms, "
+              f"每帧 {best/max(len(frames), 1)*1000:6.1f} ms, 帧数 {len(frames)}")
+
+    reference = results['逐时间戳seek']
+    identical = all(
+        [t for t, _ in frames] == [t for t, _ in reference]
+        and all(np.array_equal(a, b) for (_, a), (_, b) in zip(reference, frames))
+        for frames in results.values()
+    )
+    print("=" * 60)
+    print(f"帧内容一致: {'✅' if identical else '❌'}")
+    return identical
+
+
+if __name__ == "__main__":
+    video = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    times = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    run_benchmark(video, step, times)
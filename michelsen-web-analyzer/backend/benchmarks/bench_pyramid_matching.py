@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金字塔模板匹配与穷举模板匹配对比脚本
+
+在学生视频的采样帧上，对每个部件模板分别运行：
+1. 穷举模式：全分辨率 5 个尺度 × 3 种方法
+2. 金字塔模式：降采样帧粗搜索 + 全分辨率小区域精修（多个容差）
+
+统计耗时，并以穷举结果为基准统计位置一致率（IoU >= 0.9）和得分差，
+结果输出为Markdown报告。
+
+使用方法：
+python benchmarks/bench_pyramid_matching.py [视频路径] [采样间隔秒数] [报告输出路径]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import cv2
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(backend_dir, 'analyzer'))
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+web_dir = os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'web')
+DEFAULT_VIDEO = os.path.join(web_dir, 'student.mp4')
+DEFAULT_REPORT = os.path.join(backend_dir, 'benchmarks', 'reports', 'pyramid_matching.md')
+
+TOLERANCES = [0.0, 0.02, 0.05, 0.1]
+IOU_THRESHOLD = 0.9
+
+
+def box_iou(a, b):
+    """两个匹配结果边界框的IoU"""
+    ax, ay = a['location']
+    aw, ah = a['size']
+    bx, by = b['location']
+    bw, bh = b['size']
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def load_frames(video_path, interval):
+    """按固定间隔采样视频帧（BGR）"""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    duration = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) / fps
+    analyzer = MichelsonInterferometerAnalyzer()
+    timestamps = list(range(0, int(duration), interval))
+    frames = [(t, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+              for t, frame in analyzer.iter_frames_at_timestamps(cap, timestamps, fps)]
+    cap.release()
+    return frames
+
+
+def run_mode(analyzer, frames, templates):
+    """对所有帧和模板运行一次多尺度匹配，返回 (总耗时, 结果列表)"""
+    results = []
+    elapsed = 0.0
+    for t, frame in frames:
+        target_pyramid = analyzer.build_target_pyramid(frame) if analyzer.match_mode == 'pyramid' else None
+        for part_file, entry in templates:
+            start = time.perf_counter()
+            match = analyzer.multi_scale_template_matching(
+                frame, entry['template'],
+                template_pyramid=entry['pyramid'],
+                target_pyramid=target_pyramid
+            )
+            elapsed += time.perf_counter() - start
+            results.append((t, part_file, match))
+    return elapsed, results
+
+
+def run_benchmark(video_path=DEFAULT_VIDEO, interval=10, report_path=DEFAULT_REPORT):
+    quiet = io.StringIO()
+    frames = load_frames(video_path, interval)
+
+    exhaustive = MichelsonInterferometerAnalyzer(match_mode='exhaustive')
+    with contextlib.redirect_stdout(quiet):
+        templates = [(f'part{i}.png', exhaustive.template_store.get(os.path.join(web_dir, f'part{i}.png')))
+                     for i in range(1, 8)]
+    templates = [(name, entry) for name, entry in templates if entry is not None]
+
+    print(f"视频: {video_path}, 采样帧: {len(frames)}, 部件模板: {len(templates)}")
+
+    with contextlib.redirect_stdout(quiet):
+        base_time, base_results = run_mode(exhaustive, frames, templates)
+    print(f"穷举模式: {base_time:.2f}s")
+
+    rows = []
+    for tolerance in TOLERANCES:
+        analyzer = MichelsonInterferometerAnalyzer(match_mode='pyramid', pyramid_tolerance=tolerance)
+        analyzer.template_store = exhaustive.template_store
+        with contextlib.redirect_stdout(quiet):
+            pyr_time, pyr_results = run_mode(analyzer, frames, templates)
+
+        agree = 0
+        same_method_scale = 0
+        max_score_diff = 0.0
+        for (_, _, base), (_, _, pyr) in zip(base_results, pyr_results):
+            if base is None or pyr is None:
+                agree += base is None and pyr is None
+                continue
+            agree += box_iou(base, pyr) >= IOU_THRESHOLD
+            same_method_scale += base['method'] == pyr['method'] and base['scale'] == pyr['scale']
+            max_score_diff = max(max_score_diff, abs(base['score'] - pyr['score']))
+
+        total = len(base_results)
+        rows.append((tolerance, pyr_time, base_time / pyr_time, agree / total, same_method_scale / total, max_score_diff))
+        print(f"金字塔模式 (容差 {tolerance}): {pyr_time:.2f}s, 加速 {base_time / pyr_time:.1f}x, "
+              f"位置一致率 {agree / total:.1%}, 最大得分差 {max_score_diff:.4f}")
+
+    lines = [
+        "# 金字塔模板匹配 vs 穷举模板匹配",
+        "",
+        f"- 视频: `{os.path.relpath(video_path, os.path.dirname(os.path.dirname(backend_dir)))}`，"
+        f"每 {interval} 秒采样一帧，共 {len(frames)} 帧（{frames[0][1].shape[1]}×{frames[0][1].shape[0]}）",
+        f"- 部件模板: {len(templates)} 个，每个模板 5 个尺度 × 3 种方法，共 {len(base_results)} 次多尺度匹配",
+        f"- 金字塔层数: {exhaustive.pyramid_levels}（粗搜索分辨率为原图的 1/{2 ** exhaustive.pyramid_levels}）",
+        f"- 位置一致：与穷举结果的边界框 IoU >= {IOU_THRESHOLD}",
+        f"- 仅统计 `multi_scale_template_matching` 的耗时",
+        "",
+        f"穷举模式总耗时: **{base_time:.2f}s**",
+        "",
+        "| 容差 | 耗时 (s) | 加速比 | 位置一致率 | 尺度与方法一致率 | 最大得分差 |",
+        "|---:|---:|---:|---:|---:|---:|",
+    ]
+    for tolerance, pyr_time, speedup, agree_rate, same_rate, max_diff in rows:
+        lines.append(f"| {tolerance} | {pyr_time:.2f} | {speedup:.1f}x | {agree_rate:.1%} | {same_rate:.1%} | {max_diff:.4f} |")
+    lines.append("")
+
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    print(f"报告已保存到: {report_path}")
+
+
+if __name__ == "__main__":
+    video = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    report = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_REPORT
+    run_benchmark(video, step, report)
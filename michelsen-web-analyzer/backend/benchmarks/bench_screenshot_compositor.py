@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析截图合成性能对比脚本
+
+在学生视频的一帧上绘制检测结果后，对比两种方式生成一张问题截图（含PNG编码写盘）的耗时：
+1. matplotlib：15×10英寸图像 + tight_layout + 150dpi savefig（旧实现）
+2. 合成器：ScreenshotCompositor 直接在帧上绘制标题栏、时间戳和检测说明后 cv2.imwrite
+
+同时记录在全新进程中导入 matplotlib.pyplot 的耗时（旧实现在分析器模块加载时导入）。
+需要安装 matplotlib 才能运行旧实现对比。
+
+使用方法：
+python benchmarks/bench_screenshot_compositor.py [视频路径] [时间点秒数] [重复次数]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(backend_dir, 'analyzer'))
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+DEFAULT_VIDEO = os.path.join(os.path.dirname(os.path.dirname(backend_dir)), 'web', 'student.mp4')
+
+
+def matplotlib_screenshot(plt, annotated_frame, detections, path):
+    """旧实现：matplotlib 绘制问题截图"""
+    fig, ax = plt.subplots(1, 1, figsize=(15, 10))
+    ax.imshow(annotated_frame)
+    ax.set_title("问题截图 1: 步骤顺序错误\n学生操作与老师示范不一致", fontsize=14, pad=20)
+    ax.axis('off')
+    ax.text(0.02, 0.98, "时间: 108s", transform=ax.transAxes, fontsize=12, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.8))
+    ax.text(0.02, 0.02, f"检测到设备: {', '.join([d['name'] for d in detections])}",
+            transform=ax.transAxes, fontsize=10, verticalalignment='bottom',
+            bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def compositor_screenshot(analyzer, annotated_frame, detections, path):
+    """新实现：直接合成后用OpenCV写PNG"""
+    composed = analyzer.screenshot_compositor.compose(
+        annotated_frame, "问题截图 1: 步骤顺序错误\n学生操作与老师示范不一致", badge="时间: 108s",
+        badge_color='yellow', caption=f"检测到设备: {', '.join([d['name'] for d in detections])}")
+    cv2.imwrite(path, cv2.cvtColor(composed, cv2.COLOR_RGB2BGR))
+
+
+def time_per_call(render, repeats):
+    render()  # 预热（字体加载）
+    start = time.perf_counter()
+    for _ in range(repeats):
+        render()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def pyplot_import_ms():
+    """在全新进程中测量 import matplotlib.pyplot 的耗时"""
+    code = "import time; s = time.perf_counter(); import matplotlib.pyplot; print((time.perf_counter() - s) * 1000)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    return float(output.stdout.strip()) if output.returncode == 0 else None
+
+
+def run_benchmark(video_path=DEFAULT_VIDEO, time_seconds=108, repeats=10):
+    analyzer = MichelsonInterferometerAnalyzer()
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = list(analyzer.iter_frames_at_timestamps(cap, [time_seconds], fps))
+    cap.release()
+    if not frames:
+        print(f"❌ 无法读取 {video_path} 在 {time_seconds}秒 的帧")
+        return
+    frame = frames[0][1]
+    height, width = frame.shape[:2]
+
+    names = [info['chinese'] for info in analyzer.component_mapping.values()]
+    detections = [{'name': name, 'bbox': (40 + i * 170, 120, 180 + i * 170, 300), 'confidence': 0.8}
+                  for i, name in enumerate(names)]
+    annotated_frame = analyzer.draw_detections_on_frame(frame, detections)
+
+    print(f"目标帧: {video_path} @ {time_seconds}s ({width}×{height}), 重复 {repeats} 次取平均")
+    print()
+    print("| 实现 | 单张耗时 (ms) | 输出尺寸 | 文件大小 (KB) |")
+    print("|---|---:|---:|---:|")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        results = []
+        try:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'WenQuanYi Micro Hei', 'WenQuanYi Zen Hei',
+                                               'Noto Sans CJK SC', 'SimHei', 'DejaVu Sans']
+            legacy_path = os.path.join(output_dir, 'matplotlib.png')
+            results.append(('matplotlib', legacy_path, time_per_call(
+                lambda: matplotlib_screenshot(plt, annotated_frame, detections, legacy_path), repeats)))
+        except ImportError:
+            print("（未安装matplotlib，跳过旧实现对比）")
+
+        composed_path = os.path.join(output_dir, 'compositor.png')
+        results.append(('合成器', composed_path, time_per_call(
+            lambda: compositor_screenshot(analyzer, annotated_frame, detections, composed_path), repeats)))
+
+        for name, path, elapsed_ms in results:
+            image = cv2.imread(path)
+            print(f"| {name} | {elapsed_ms:.1f} | {image.shape[1]}×{image.shape[0]} | "
+                  f"{os.path.getsize(path) / 1024:.0f} |")
+        if len(results) == 2:
+            print(f"\n加速比: {results[0][2] / results[1][2]:.1f}x")
+
+    import_ms = pyplot_import_ms()
+    if import_ms is not None:
+        print(f"import matplotlib.pyplot（全新进程）: {import_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    video = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 108
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    run_benchmark(video, seconds, repeats)
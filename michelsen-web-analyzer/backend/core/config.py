@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # 应用配置
@@ -17,16 +17,50 @@ class Settings(BaseSettings):
     # 文件上传配置
     upload_dir: str = "uploads"
     max_file_size: int = 50 * 1024 * 1024  # 50MB
+    upload_chunk_size: int = 4 * 1024 * 1024  # 流式上传每次读写的块大小
+    upload_session_ttl_seconds: int = 24 * 3600  # 未完成的分块上传会话保留时间
     allowed_video_extensions: List[str] = [".mp4", ".avi", ".mov"]
     
     # 静态文件配置
     static_dir: str = "static"
     screenshots_dir: str = "static/screenshots"
     videos_dir: str = "static/videos"
+    video_stream_chunk_size: int = 256 * 1024  # 视频分段传输时每次读取的块大小
     
     # AI 分析配置
     analysis_timeout: int = 300  # 5分钟
     default_frame_interval: int = 30  # 30秒
+    detection_workers: int = 0  # 单帧部件并行检测线程数，0 表示CPU核心数 ÷ analysis_workers（至少1）
+    analysis_workers: int = 2  # 并行执行分析任务的进程数，0 表示使用全部CPU核心
+    progress_stream_queue_size: int = 256  # 每个进度订阅者缓冲的事件数，慢客户端丢弃最旧的事件
+    progress_stream_poll_seconds: float = 1.0  # 进度流空闲时回查任务状态（兼作心跳）的间隔
+    
+    # 步骤截图配置
+    screenshot_format: str = "png"  # png、jpeg 或 webp
+    screenshot_quality: int = 90  # JPEG/WebP 质量（1-100）
+    screenshot_png_compression: int = 3  # PNG 压缩级别（0-9），越大文件越小、编码越慢
+    screenshot_derivative_widths: List[int] = [320, 800]  # 同时生成的缩小版本宽度（像素），前端按 ?size= 选用，空列表表示只写原图
+    screenshot_workers: int = 2  # 后台编码写盘截图的线程数
+    screenshot_cache_max_age: int = 365 * 24 * 3600  # 带修订号(?v=)的截图请求允许浏览器缓存的时间
+    
+    # 任务存储配置
+    job_store_path: str = "data/jobs.sqlite3"
+    job_ttl_seconds: int = 7 * 24 * 3600  # 任务保留7天，0 表示不清理
+    job_heartbeat_seconds: float = 30  # 执行任务的进程刷新任务 updated_at 的间隔
+    job_stale_seconds: int = 120  # 运行中的任务超过该时间没有更新时视为执行进程已退出，标记为失败
+    
+    # 分析结果缓存配置
+    result_cache_enabled: bool = True
+    result_cache_dir: str = "data/result_cache"
+    result_cache_max_bytes: int = 2 * 1024 * 1024 * 1024  # 2GB
+    teacher_cache_enabled: bool = True
+    teacher_cache_dir: str = "data/teacher_cache"
+    teacher_cache_max_bytes: int = 512 * 1024 * 1024  # 512MB
+    
+    # 日志配置
+    log_level: str = "WARNING"  # 根日志级别，生产环境默认只输出警告和错误
+    log_levels: Dict[str, str] = {}  # 按模块覆盖日志级别，如 {"analyzer": "DEBUG"}
+    log_format: str = "text"  # text 或 json（每行一条结构化记录）
     
     # 外部 API 配置
     anthropic_api_key: Optional[str] = None
@@ -0,0 +1,103 @@
+"""
+日志配置
+- 按模块设置日志级别（如 {"analyzer": "DEBUG", "services.job_store": "INFO"}），默认只输出WARNING及以上
+- 通过contextvars自动为每条日志附加当前分析任务的analysis_id
+- 支持纯文本和JSON（每行一条记录）两种格式
+"""
+
+import functools
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from core.config import settings
+
+# 当前分析任务ID，未绑定时为 '-'
+analysis_id_var: ContextVar[str] = ContextVar('analysis_id', default='-')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(analysis_id)s] %(name)s: %(message)s'
+
+# LogRecord的标准属性，其余属性视为通过 extra= 传入的结构化字段
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'analysis_id'}
+
+
+@contextmanager
+def bind_analysis_id(analysis_id: str) -> Iterator[None]:
+    """在上下文内的日志（包括由此派生的异步任务和复制了context的线程）中附加analysis_id"""
+    token = analysis_id_var.set(analysis_id)
+    try:
+        yield
+    finally:
+        analysis_id_var.reset(token)
+
+
+class AnalysisIdFilter(logging.Filter):
+    """为日志记录添加analysis_id字段"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.analysis_id = analysis_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，extra= 传入的字段原样保留"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'analysis_id': getattr(record, 'analysis_id', '-'),
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: Optional[str] = None, module_levels: Optional[Dict[str, str]] = None,
+                      log_format: Optional[str] = None) -> None:
+    """配置根日志记录器（可重复调用，后一次配置覆盖前一次）
+
+    Args:
+        level: 根日志级别，默认 settings.log_level
+        module_levels: 各模块（logger名前缀）的日志级别，默认 settings.log_levels
+        log_format: 'text' 或 'json'，默认 settings.log_format
+    """
+    level = level or settings.log_level
+    module_levels = settings.log_levels if module_levels is None else module_levels
+    log_format = log_format or settings.log_format
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.addFilter(AnalysisIdFilter())
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if getattr(existing, '_analysis_logging', False):
+            root.removeHandler(existing)
+    handler._analysis_logging = True
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+
+def configure_worker_logging(analysis_id: str, level: str, module_levels: Dict[str, str], log_format: str) -> None:
+    """在子进程中配置日志，并把整个进程绑定到analysis_id"""
+    configure_logging(level, module_levels, log_format)
+    analysis_id_var.set(analysis_id)
+
+
+def worker_logging_initializer(analysis_id: str) -> Callable[[], None]:
+    """子进程的日志初始化函数（可pickle），携带analysis_id和主进程的日志配置"""
+    return functools.partial(configure_worker_logging, analysis_id, settings.log_level,
+                             dict(settings.log_levels), settings.log_format)
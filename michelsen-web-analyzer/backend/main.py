@@ -1,15 +1,23 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from pathlib import Path
 import uvicorn
 import os
 import shutil
 from typing import List, Optional
 
-from api.routers import analysis, upload
+from api.routers import analysis, batch, upload
 from core.config import settings
+from core.logging_config import configure_logging
+from services.job_executor import job_executor
+from services.job_store import job_store
+from services.metrics import metrics_registry
+from services.video_streaming import RangeStaticFiles
+
+# 日志：默认只输出警告和错误，可通过 LOG_LEVEL / LOG_LEVELS / LOG_FORMAT 调整
+configure_logging()
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -33,20 +41,25 @@ app.add_middleware(
 
 # 创建必要的目录
 os.makedirs("uploads", exist_ok=True)
-os.makedirs("static/screenshots", exist_ok=True)
 os.makedirs("static/videos", exist_ok=True)
 
 # 静态文件服务
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", RangeStaticFiles(directory="static"), name="static")
 
 # 注册路由
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
 
-# 前端静态文件服务 - 放在最后，避免与API路由冲突
-frontend_dist_path = Path(__file__).parent.parent / "frontend" / "dist"
-if frontend_dist_path.exists():
-    app.mount("/", StaticFiles(directory=str(frontend_dist_path), html=True), name="frontend")
+@app.on_event("startup")
+async def fail_orphaned_jobs():
+    """上次运行中被中断（服务重启或崩溃）的任务不会再有进度，标记为失败"""
+    job_store.fail_stale(settings.job_stale_seconds)
+
+@app.on_event("shutdown")
+async def shutdown_job_executor():
+    """关闭分析任务进程池"""
+    job_executor.shutdown()
 
 @app.get("/api")
 async def root():
@@ -60,6 +73,16 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus指标：分析任务数和各阶段耗时直方图"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+# 前端静态文件服务 - 放在所有路由之后：挂载在 / 上会拦截之后注册的路由（/api、/health、/metrics）
+frontend_dist_path = Path(__file__).parent.parent / "frontend" / "dist"
+if frontend_dist_path.exists():
+    app.mount("/", StaticFiles(directory=str(frontend_dist_path), html=True), name="frontend")
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -5,9 +5,12 @@ AI分析服务类
 
 import os
 import json
+import logging
 import shutil
 import asyncio  
 import sys
+import time
+import uuid
 from typing import Dict, Any, Optional, Callable
 
 # 添加analyzer路径到sys.path
@@ -16,20 +19,46 @@ if analyzer_path not in sys.path:
     sys.path.insert(0, analyzer_path)
 
 from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from analysis_context import AnalysisContext
+from instrumentation import SpanRecorder
+from screenshot_writer import SCREENSHOT_EXTENSIONS
+from core.config import settings
+from core.logging_config import worker_logging_initializer
+from services.result_cache import ResultCache, file_sha256, result_cache
+from services.teacher_cache import TeacherAnalysisCache, teacher_cache
+
+logger = logging.getLogger(__name__)
 
 class AnalyzerService:
     """实验分析服务"""
     
+    # 分析参数（同时参与结果缓存键的计算）
+    STEP_INTERVAL = 30
+    DETECTION_TIME = 108.0
+    DETECTION_MIN_CONFIDENCE = 0.25
+    
     def __init__(self, upload_dir: str, static_dir: str):
         self.upload_dir = upload_dir
         self.static_dir = static_dir
-        self.analyzer = MichelsonInterferometerAnalyzer()
+    
+    def _create_context(self, teacher_video_path: str, student_video_path: str, analysis_id: str) -> AnalysisContext:
+        """创建单次分析的路径上下文：每个分析任务使用独立的输出目录"""
+        output_dir = os.path.join(self.upload_dir, 'analysis_jobs', analysis_id)
+        os.makedirs(output_dir, exist_ok=True)
+        return AnalysisContext(
+            teacher_video=teacher_video_path,
+            student_video=student_video_path,
+            template_dir=self.upload_dir,
+            output_dir=output_dir
+        )
     
     async def analyze_videos(
         self, 
         teacher_video_path: str, 
         student_video_path: str,
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        analysis_id: Optional[str] = None,
+        progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         分析老师和学生视频
@@ -38,170 +67,283 @@ class AnalyzerService:
             teacher_video_path: 老师视频文件路径
             student_video_path: 学生视频文件路径
             progress_callback: 进度回调函数
+            analysis_id: 分析任务ID，用于区分输出目录和结果发布目录 static_dir/<analysis_id>/（未提供时自动生成）
+            progress_hook: 细粒度进度回调（逐帧、逐部件、逐截图），直接传给分析器
             
         Returns:
-            分析结果字典
+            分析结果字典，'timings' 为本次运行各阶段的耗时直方图（SpanRecorder快照）
         """
+        analysis_id = analysis_id or uuid.uuid4().hex
+        context = self._create_context(teacher_video_path, student_video_path, analysis_id)
+        timings = SpanRecorder()
+        started_ns = time.perf_counter_ns()
+        analyzer = None
         
         if progress_callback:
             progress_callback("开始AI分析...")
         
         try:
-            # 调用完整的分析逻辑
-            result = await self._run_full_analyzer(
-                teacher_video_path, 
-                student_video_path, 
-                progress_callback
+            # 检查必需文件是否存在
+            if not os.path.exists(context.teacher_video):
+                raise FileNotFoundError(f"老师视频文件不存在: {context.teacher_video}")
+            if not os.path.exists(context.student_video):
+                raise FileNotFoundError(f"学生视频文件不存在: {context.student_video}")
+            
+            # 先复制part文件到上传目录（模板哈希参与缓存键）
+            await self._copy_part_files()
+            
+            # 每个分析任务使用独立的分析器实例（模板仍由磁盘缓存共享）
+            analyzer = MichelsonInterferometerAnalyzer(
+                detection_workers=self._detection_workers(),
+                context=context,
+                progress_hook=progress_hook,
+                screenshot_options=self._screenshot_options(),
+                screenshot_workers=settings.screenshot_workers,
+                worker_initializer=worker_logging_initializer(analysis_id)
             )
             
+            # 相同视频、参数和模板的分析结果直接从缓存返回
+            cache_key = self._result_cache_key(analyzer, context) if settings.result_cache_enabled else None
+            with timings.span('result_cache_lookup'):
+                result = result_cache.get(cache_key, context.output_dir) if cache_key else None
+            
+            if result is not None:
+                logger.info("命中分析结果缓存: %s", cache_key)
+                if progress_callback:
+                    progress_callback("命中分析缓存，直接返回结果...")
+            else:
+                # 调用完整的分析逻辑
+                result = await self._run_full_analyzer(context, analyzer, progress_callback)
+                if cache_key:
+                    with timings.span('result_cache_store'):
+                        result_cache.put(cache_key, result, context.output_dir)
+            
             # 移动生成的截图和文件到静态目录
-            await self._move_results_to_static()
+            with timings.span('move_results_to_static'):
+                await self._move_results_to_static(context.output_dir, analysis_id)
             
             if progress_callback:
                 progress_callback("分析完成")
                 
-            return result
+            return self._attach_timings(result, timings, analyzer, started_ns)
             
         except Exception as e:
-            print(f"分析过程中出现错误: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("分析过程中出现错误: %s", e)
             
             if progress_callback:
                 progress_callback(f"分析失败: {str(e)}")
             
             # 返回错误结果
-            return self._get_error_result(str(e))
+            return self._attach_timings(self._get_error_result(str(e)), timings, analyzer, started_ns)
+        
+        finally:
+            # 清理本次任务的输出目录
+            shutil.rmtree(context.output_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _detection_workers() -> int:
+        """单帧部件并行检测线程数
+        
+        配置为0时按CPU核心数除以并行分析任务数分配，
+        避免每个分析进程都占满全部核心导致超额订阅。
+        """
+        if settings.detection_workers > 0:
+            return settings.detection_workers
+        cpu_count = os.cpu_count() or 1
+        analysis_workers = settings.analysis_workers or cpu_count
+        return max(1, cpu_count // analysis_workers)
+    
+    @staticmethod
+    def _screenshot_options() -> Dict[str, Any]:
+        """步骤截图的编码参数（来自配置）"""
+        return {
+            'image_format': settings.screenshot_format,
+            'quality': settings.screenshot_quality,
+            'png_compression': settings.screenshot_png_compression,
+            'derivative_widths': settings.screenshot_derivative_widths
+        }
+    
+    @staticmethod
+    def _attach_timings(result: Dict[str, Any], timings: SpanRecorder,
+                        analyzer: Optional[MichelsonInterferometerAnalyzer], started_ns: int) -> Dict[str, Any]:
+        """把服务层和分析器的耗时直方图附加到结果中（缓存中保存的结果不含耗时）"""
+        timings.observe('analysis_total', time.perf_counter_ns() - started_ns)
+        if analyzer is not None:
+            timings.merge(analyzer.timings.snapshot())
+        result['timings'] = timings.snapshot()
+        return result
+    
+    def _result_cache_key(self, analyzer: MichelsonInterferometerAnalyzer, context: AnalysisContext) -> str:
+        """结果缓存键：视频内容、影响结果的分析参数和部件模板内容"""
+        video_hashes = {
+            'teacher': file_sha256(context.teacher_video),
+            'student': file_sha256(context.student_video)
+        }
+        # 并行度和路径不影响分析结果，不参与缓存键
+        analyzer_config = {k: v for k, v in analyzer.config.items()
+                           if k not in ('detection_workers', 'context', 'screenshot_workers')}
+        params = {
+            'interval': self.STEP_INTERVAL,
+            'detection_time': self.DETECTION_TIME,
+            'min_confidence': self.DETECTION_MIN_CONFIDENCE,
+            'teacher_steps': analyzer.teacher_steps,
+            'analyzer': analyzer_config
+        }
+        template_hashes = {
+            part_file: analyzer.template_store.content_hash(context.template_path(part_file))
+            for part_file in analyzer.component_mapping
+        }
+        return ResultCache.compute_key(video_hashes, params, template_hashes)
     
     async def _run_full_analyzer(
         self, 
-        teacher_path: str, 
-        student_path: str,
+        context: AnalysisContext,
+        analyzer: MichelsonInterferometerAnalyzer,
         progress_callback: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
-        """运行完整的分析逻辑（基于原始experiment_analyzer_prototype.py）"""
+        """运行完整的分析逻辑（基于原始experiment_analyzer_prototype.py）
         
-        # 设置工作目录为上传目录
-        original_cwd = os.getcwd()
-        os.chdir(self.upload_dir)
+        所有输入和输出路径都来自context，不修改进程工作目录，可在同一进程内并发运行。
+        """
         
-        try:
-            # 检查必需文件是否存在
-            if not os.path.exists('teacher.mp4'):
-                raise FileNotFoundError("teacher.mp4 文件不存在")
-            if not os.path.exists('student.mp4'):
-                raise FileNotFoundError("student.mp4 文件不存在")
-            
+        screenshots_dir = context.output_path('step_analysis_output')
+        
+        # 1. 分析老师视频步骤：同一老师视频的分析结果和截图只计算一次
+        teacher_key = None
+        cached_teacher = None
+        if settings.teacher_cache_enabled:
+            teacher_key = TeacherAnalysisCache.compute_key(
+                file_sha256(context.teacher_video), self.STEP_INTERVAL, analyzer.teacher_steps,
+                analyzer.screenshot_writer.options()
+            )
+            cached_teacher = teacher_cache.get(teacher_key, context.teacher_video, screenshots_dir)
+        
+        # 检查模板目录是否有part文件，如果有则在最后执行设备检测
+        upload_part_files = [context.template_path(f'part{i}.png') for i in range(1, 7)]
+        has_part_files = any(os.path.exists(part_file) for part_file in upload_part_files)
+        
+        # 规划本次分析的工作量，供服务端按实测吞吐量计算完成百分比和预计剩余时间
+        teacher_frames = 0 if cached_teacher is not None else analyzer.count_step_frames(
+            context.teacher_video, 'teacher', interval=self.STEP_INTERVAL)
+        student_frames = analyzer.count_step_frames(context.student_video, 'student', interval=self.STEP_INTERVAL)
+        analyzer.plan_progress(
+            frames=teacher_frames + student_frames,
+            components=len(analyzer.component_mapping) if has_part_files else 0,
+            screenshots=teacher_frames + student_frames
+        )
+        
+        if cached_teacher is not None:
+            logger.info("命中老师视频分析缓存: %s", teacher_key)
             if progress_callback:
-                progress_callback("分析老师示范视频...")
-            
-            # 1. 分析老师视频步骤
-            teacher_analysis = self.analyzer.analyze_video_steps('teacher.mp4', 'teacher', interval=30)
-            
+                progress_callback("复用老师示范视频分析结果...")
+            teacher_analysis = cached_teacher['analysis']
+            teacher_explanations = cached_teacher['explanations']
+        else:
             if progress_callback:
-                progress_callback("分析学生实验视频...")
-            
-            # 2. 分析学生视频步骤
-            student_analysis = self.analyzer.analyze_video_steps('student.mp4', 'student', interval=30)
-            
+                progress_callback("分析老师示范视频...")
+            # 只保留元数据，截图时按需重新解码帧
+            teacher_analysis = analyzer.analyze_video_steps(context.teacher_video, 'teacher', interval=self.STEP_INTERVAL, keep_frames=False)
+            teacher_explanations = None
+        
+        if progress_callback:
+            progress_callback("分析学生实验视频...")
+        
+        # 2. 分析学生视频步骤
+        student_analysis = analyzer.analyze_video_steps(context.student_video, 'student', interval=self.STEP_INTERVAL, keep_frames=False)
+        
+        if progress_callback:
+            progress_callback("保存步骤截图和解释...")
+        
+        # 3. 保存截图和解释
+        screenshot_explanations = analyzer.save_simple_analysis_screenshots(
+            teacher_analysis, 
+            student_analysis, 
+            screenshots_dir,
+            teacher_explanations=teacher_explanations
+        )
+        
+        if teacher_key and cached_teacher is None:
+            teacher_cache.put(teacher_key, teacher_analysis, screenshot_explanations, screenshots_dir)
+        
+        if progress_callback:
+            progress_callback("生成完整分析报告...")
+        
+        # 4. 生成完整的分析报告
+        analysis_report = analyzer.generate_simple_analysis_report(
+            teacher_analysis, 
+            student_analysis, 
+            screenshot_explanations,
+            'experiment_steps_analysis.json'
+        )
+        
+        # 5. 有part文件时执行设备检测
+        logger.debug("检查设备检测文件: %s", has_part_files)
+        
+        if has_part_files:
             if progress_callback:
-                progress_callback("保存步骤截图和解释...")
-            
-            # 3. 保存截图和解释
-            screenshot_explanations = self.analyzer.save_simple_analysis_screenshots(
-                teacher_analysis, 
-                student_analysis, 
-                'step_analysis_output'
-            )
+                progress_callback("执行设备检测...")
             
-            if progress_callback:
-                progress_callback("生成完整分析报告...")
+            logger.info("开始执行%s秒设备检测...", self.DETECTION_TIME)
             
-            # 4. 生成完整的分析报告
-            analysis_report = self.analyzer.generate_simple_analysis_report(
-                teacher_analysis, 
-                student_analysis, 
-                screenshot_explanations,
-                'experiment_steps_analysis.json'
-            )
+            # 6. 执行单帧设备检测（基于108秒）
+            from experiment_analyzer_prototype import extract_frame_at_time
             
-            # 5. 先复制part文件到上传目录
-            await self._copy_part_files()
+            # 提取108秒的帧
+            identify_target_path = context.output_path('Identify_target.png')
+            with analyzer.timings.span('decode_frame'):
+                target_frame = extract_frame_at_time(context.student_video, time_seconds=self.DETECTION_TIME, output_path=identify_target_path)
+            logger.debug("目标帧已保存: %s", identify_target_path)
             
-            # 检查上传目录是否有part文件，如果有则执行设备检测
-            upload_part_files = [os.path.join(self.upload_dir, f'part{i}.png') for i in range(1, 7)]
-            has_part_files = any(os.path.exists(part_file) for part_file in upload_part_files)
+            # 转换为RGB格式用于分析
+            import cv2
+            target_frame_rgb = cv2.cvtColor(target_frame, cv2.COLOR_BGR2RGB)
             
-            print(f"检查设备检测文件: {has_part_files}")
+            # 执行设备检测
+            equipment_detections = analyzer.detect_equipment_in_frame(target_frame_rgb, min_confidence=self.DETECTION_MIN_CONFIDENCE)
+            logger.info("设备检测完成，检测到 %d 个设备", len(equipment_detections) if equipment_detections else 0)
             
-            if has_part_files:
-                if progress_callback:
-                    progress_callback("执行设备检测...")
-                
-                print("开始执行108秒设备检测...")
-                
-                # 6. 执行单帧设备检测（基于108秒）
-                from experiment_analyzer_prototype import extract_frame_at_time
+            if equipment_detections:
+                # 在原图上绘制检测结果
+                annotated_frame = analyzer.draw_detections_on_frame(target_frame_rgb, equipment_detections)
                 
-                # 提取108秒的帧
-                identify_target_path = os.path.join(self.upload_dir, 'Identify_target.png')
-                target_frame = extract_frame_at_time('student.mp4', time_seconds=108.0, output_path=identify_target_path)
-                print(f"✅ 目标帧已保存: {identify_target_path}")
+                # 保存标注后的图片到任务输出目录
+                annotated_bgr = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
+                detection_result_path = context.output_path('detection_result.png')
+                cv2.imwrite(detection_result_path, annotated_bgr)
+                logger.debug("设备检测结果图片已保存: %s", detection_result_path)
                 
-                # 转换为RGB格式用于分析
-                import cv2
-                target_frame_rgb = cv2.cvtColor(target_frame, cv2.COLOR_BGR2RGB)
+                # 生成设备检测报告
+                detection_report = {
+                    'analysis_time': analysis_report.get('analysis_time'),
+                    'source_video': os.path.basename(context.student_video),
+                    'target_image': 'Identify_target.png',
+                    'total_components_to_detect': 7,
+                    'components_detected': len(equipment_detections),
+                    'detection_rate': len(equipment_detections) / 7,
+                    'detections': [
+                        {
+                            'name': det['name'],
+                            'confidence': det['confidence'],
+                            'bbox': det['bbox'],
+                            'method': det['method']
+                        }
+                        for det in equipment_detections
+                    ]
+                }
                 
-                # 执行设备检测
-                equipment_detections = self.analyzer.detect_equipment_in_frame(target_frame_rgb, min_confidence=0.25)
-                print(f"设备检测完成，检测到 {len(equipment_detections) if equipment_detections else 0} 个设备")
+                detection_report_path = context.output_path('detection_report.json')
+                with open(detection_report_path, 'w', encoding='utf-8') as f:
+                    json.dump(detection_report, f, ensure_ascii=False, indent=2)
+                logger.debug("设备检测报告已保存: %s", detection_report_path)
                 
-                if equipment_detections:
-                    # 在原图上绘制检测结果
-                    annotated_frame = self.analyzer.draw_detections_on_frame(target_frame_rgb, equipment_detections)
-                    
-                    # 保存标注后的图片到上传目录
-                    annotated_bgr = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
-                    detection_result_path = os.path.join(self.upload_dir, 'detection_result.png')
-                    cv2.imwrite(detection_result_path, annotated_bgr)
-                    print(f"✅ 设备检测结果图片已保存: {detection_result_path}")
-                    
-                    # 生成设备检测报告
-                    detection_report = {
-                        'analysis_time': analysis_report.get('analysis_time'),
-                        'source_video': 'student.mp4',  
-                        'target_image': 'Identify_target.png',
-                        'total_components_to_detect': 7,
-                        'components_detected': len(equipment_detections),
-                        'detection_rate': len(equipment_detections) / 7,
-                        'detections': [
-                            {
-                                'name': det['name'],
-                                'confidence': det['confidence'],
-                                'bbox': det['bbox'],
-                                'method': det['method']
-                            }
-                            for det in equipment_detections
-                        ]
-                    }
-                    
-                    detection_report_path = os.path.join(self.upload_dir, 'detection_report.json')
-                    with open(detection_report_path, 'w', encoding='utf-8') as f:
-                        json.dump(detection_report, f, ensure_ascii=False, indent=2)
-                    print(f"✅ 设备检测报告已保存: {detection_report_path}")
-                    
-                    # 将设备检测结果添加到主报告中
-                    analysis_report['equipment_detection'] = detection_report
-                else:
-                    print("❌ 未检测到任何设备，跳过检测结果保存")
+                # 将设备检测结果添加到主报告中
+                analysis_report['equipment_detection'] = detection_report
             else:
-                print("❌ 未找到part文件，跳过设备检测")
-            
-            return analysis_report
-            
-        finally:
-            # 恢复原始工作目录
-            os.chdir(original_cwd)
+                logger.warning("未检测到任何设备，跳过检测结果保存")
+        else:
+            logger.warning("未找到part文件，跳过设备检测")
+        
+        return analysis_report
     
     async def _copy_part_files(self):
         """复制part文件到上传目录"""
@@ -213,87 +355,67 @@ class AnalyzerService:
         project_root = os.path.dirname(os.path.dirname(backend_dir))  # 从backend向上到项目根目录
         web_dir = os.path.join(project_root, 'web')
         
-        print(f"从 {web_dir} 复制part文件到 {self.upload_dir}")
-        print(f"上传目录绝对路径: {os.path.abspath(self.upload_dir)}")
+        logger.debug("从 %s 复制part文件到 %s", web_dir, os.path.abspath(self.upload_dir))
         
         for i in range(1, 8):  # part1.png to part7.png
             part_file = f'part{i}.png'
             upload_part_path = os.path.join(self.upload_dir, part_file)
             web_part_path = os.path.join(web_dir, part_file)
             
-            print(f"检查文件: {web_part_path} -> {upload_part_path}")
-            
             # 如果上传目录没有这个文件，但web目录有，则复制过来
             if not os.path.exists(upload_part_path) and os.path.exists(web_part_path):
                 try:
-                    shutil.copy2(web_part_path, upload_part_path)
-                    print(f"✅ 复制了 {part_file} 到上传目录")
+                    # 先复制到临时文件再原子替换，避免并发任务读到不完整的图片
+                    tmp_path = f"{upload_part_path}.{uuid.uuid4().hex}.tmp"
+                    shutil.copy2(web_part_path, tmp_path)
+                    os.replace(tmp_path, upload_part_path)
+                    logger.info("复制了 %s 到上传目录", part_file)
                 except Exception as e:
-                    print(f"❌ 复制文件失败 {part_file}: {e}")
+                    logger.error("复制文件失败 %s: %s", part_file, e)
             elif os.path.exists(upload_part_path):
-                print(f"📁 {part_file} 已存在于上传目录")
+                logger.debug("%s 已存在于上传目录", part_file)
             else:
-                print(f"❌ 源文件不存在: {web_part_path}")
+                logger.warning("源文件不存在: %s", web_part_path)
+    
+    def result_dir(self, analysis_id: str) -> str:
+        """分析任务结果的发布目录，其下为 screenshots/、reports/、images/ 子目录"""
+        return os.path.join(self.static_dir, analysis_id)
     
-    async def _move_results_to_static(self):
-        """移动生成的结果文件到静态文件目录"""
-        # 创建静态文件子目录
-        static_screenshots_dir = os.path.join(self.static_dir, 'screenshots')
-        static_reports_dir = os.path.join(self.static_dir, 'reports')
-        static_images_dir = os.path.join(self.static_dir, 'images')
+    async def _move_results_to_static(self, output_dir: str, analysis_id: str):
+        """移动任务输出目录中生成的结果文件到该任务独立的静态目录
+        
+        每个任务只写自己的 static_dir/<analysis_id>/，并发执行的任务不会互相覆盖报告和截图
+        """
+        result_dir = self.result_dir(analysis_id)
+        static_screenshots_dir = os.path.join(result_dir, 'screenshots')
+        static_reports_dir = os.path.join(result_dir, 'reports')
+        static_images_dir = os.path.join(result_dir, 'images')
         
         os.makedirs(static_screenshots_dir, exist_ok=True)
         os.makedirs(static_reports_dir, exist_ok=True)  
         os.makedirs(static_images_dir, exist_ok=True)
         
-        # 1. 移动步骤分析截图
-        screenshots_dir = os.path.join(self.upload_dir, 'step_analysis_output')
+        moves = []
+        
+        # 1. 步骤分析截图
+        screenshots_dir = os.path.join(output_dir, 'step_analysis_output')
         if os.path.exists(screenshots_dir):
             for filename in os.listdir(screenshots_dir):
-                if filename.endswith('.png'):
-                    src = os.path.join(screenshots_dir, filename)
-                    dst = os.path.join(static_screenshots_dir, filename)
-                    
-                    if os.path.exists(dst):
-                        os.remove(dst)
-                    shutil.move(src, dst)
-        
-        # 2. 移动JSON报告文件
-        report_files = [
-            'experiment_steps_analysis.json',
-            'detection_report.json',
-            'screenshot_explanations.json'
-        ]
+                if filename.endswith(SCREENSHOT_EXTENSIONS):
+                    moves.append((os.path.join(screenshots_dir, filename), static_screenshots_dir))
         
-        for report_file in report_files:
-            src_path = os.path.join(self.upload_dir, report_file)
-            if os.path.exists(src_path):
-                dst_path = os.path.join(static_reports_dir, report_file)
-                if os.path.exists(dst_path):
-                    os.remove(dst_path)
-                shutil.move(src_path, dst_path)
+        # 2. JSON报告文件（screenshot_explanations.json 在step_analysis_output目录中）
+        for report_file in ['experiment_steps_analysis.json', 'detection_report.json', 'screenshot_explanations.json']:
+            moves.append((os.path.join(output_dir, report_file), static_reports_dir))
+        moves.append((os.path.join(screenshots_dir, 'screenshot_explanations.json'), static_reports_dir))
         
-        # 3. 移动检测相关图片
-        image_files = [
-            'Identify_target.png',
-            'detection_result.png'
-        ]
+        # 3. 检测相关图片
+        for image_file in ['Identify_target.png', 'detection_result.png']:
+            moves.append((os.path.join(output_dir, image_file), static_images_dir))
         
-        for image_file in image_files:
-            src_path = os.path.join(self.upload_dir, image_file)
+        for src_path, dst_dir in moves:
             if os.path.exists(src_path):
-                dst_path = os.path.join(static_images_dir, image_file)
-                if os.path.exists(dst_path):
-                    os.remove(dst_path)
-                shutil.move(src_path, dst_path)
-        
-        # 4. 移动screenshot_explanations.json（可能在step_analysis_output目录中）
-        screenshots_explanations_path = os.path.join(self.upload_dir, 'step_analysis_output', 'screenshot_explanations.json')
-        if os.path.exists(screenshots_explanations_path):
-            dst_path = os.path.join(static_reports_dir, 'screenshot_explanations.json')
-            if os.path.exists(dst_path):
-                os.remove(dst_path)
-            shutil.move(screenshots_explanations_path, dst_path)
+                shutil.move(src_path, os.path.join(dst_dir, os.path.basename(src_path)))
     
     def _get_error_result(self, error_message: str) -> Dict[str, Any]:
         """获取错误结果"""
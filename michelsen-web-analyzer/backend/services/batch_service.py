@@ -0,0 +1,180 @@
+"""
+批量分析服务
+一个老师示范视频对比整个班级的学生视频：任务分发到分析进程池，
+逐个返回学生结果，并汇总班级统计
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.logging_config import bind_analysis_id
+from services.job_executor import job_executor
+from services.job_store import job_store
+from services.progress_broker import progress_broker
+from services.progress_tracker import job_progress_callbacks
+
+
+def summarize_student_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """从单个学生的分析报告中提取用于班级统计的摘要"""
+    if result.get('success') is False:
+        return {'success': False, 'error': result.get('error')}
+
+    teacher_steps = result.get('teacher_analysis', {}).get('steps', [])
+    student_steps = result.get('student_analysis', {}).get('steps', [])
+    teacher_step_ids = {step['step_id'] for step in teacher_steps}
+    student_step_ids = {step['step_id'] for step in student_steps}
+    confidences = [step.get('confidence', 0.0) for step in student_steps]
+
+    summary = {
+        'success': True,
+        'steps_identified': len(student_steps),
+        'step_ids': sorted(student_step_ids),
+        'step_coverage': (len(teacher_step_ids & student_step_ids) / len(teacher_step_ids)
+                          if teacher_step_ids else 0.0),
+        'average_confidence': sum(confidences) / len(confidences) if confidences else 0.0,
+        'detection_rate': None
+    }
+    detection = result.get('equipment_detection')
+    if detection:
+        summary['detection_rate'] = detection.get('detection_rate')
+    return summary
+
+
+def _describe(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        'mean': sum(values) / len(values),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+def aggregate_class_statistics(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """汇总班级统计：成功率、步骤覆盖率、置信度、设备检测率及各步骤完成人数"""
+    succeeded = [summary for summary in summaries if summary.get('success')]
+
+    step_counts: Dict[int, int] = {}
+    for summary in succeeded:
+        for step_id in summary['step_ids']:
+            step_counts[step_id] = step_counts.get(step_id, 0) + 1
+
+    detection_rates = [s['detection_rate'] for s in succeeded if s.get('detection_rate') is not None]
+    return {
+        'total_students': len(summaries),
+        'succeeded': len(succeeded),
+        'failed': len(summaries) - len(succeeded),
+        'step_coverage': _describe([s['step_coverage'] for s in succeeded]),
+        'average_confidence': _describe([s['average_confidence'] for s in succeeded]),
+        'detection_rate': _describe(detection_rates),
+        'students_per_step': {str(step_id): count for step_id, count in sorted(step_counts.items())}
+    }
+
+
+async def run_batch(
+    batch_id: str,
+    teacher_video_path: str,
+    students: List[Dict[str, str]],
+    upload_dir: str,
+    static_dir: str,
+    emit: Callable[[Dict[str, Any]], Awaitable[None]]
+) -> Dict[str, Any]:
+    """执行批量分析，每个学生完成时通过emit推送结果，最后推送并返回班级统计
+
+    Args:
+        batch_id: 批次ID，每个学生的分析ID为 <batch_id>-<序号>
+        teacher_video_path: 老师示范视频路径
+        students: 学生视频列表，每项包含 filename 和 filepath
+        upload_dir: 部件模板所在的上传目录
+        static_dir: 静态文件目录，每个学生的截图和报告发布在其下的 <分析ID>/ 子目录
+        emit: 事件推送回调
+    """
+    started_at = time.time()
+    job_store.create(batch_id, current_step="批量分析进行中...")
+
+    for index, student in enumerate(students):
+        job_store.create(f"{batch_id}-{index}")
+
+    # 批次和所有学生的任务在批次结束前都由本进程负责，保持心跳
+    with job_store.track(batch_id, *(f"{batch_id}-{index}" for index in range(len(students)))):
+        return await _analyze_batch(batch_id, teacher_video_path, students, upload_dir, static_dir, emit, started_at)
+
+
+async def _analyze_batch(
+    batch_id: str,
+    teacher_video_path: str,
+    students: List[Dict[str, str]],
+    upload_dir: str,
+    static_dir: str,
+    emit: Callable[[Dict[str, Any]], Awaitable[None]],
+    started_at: float
+) -> Dict[str, Any]:
+    async def analyze_student(index: int, student: Dict[str, str]) -> Dict[str, Any]:
+        analysis_id = f"{batch_id}-{index}"
+        progress_callback, event_callback = job_progress_callbacks(analysis_id)
+        try:
+            with bind_analysis_id(analysis_id):
+                result = await job_executor.submit(
+                    analysis_id,
+                    teacher_video_path=teacher_video_path,
+                    student_video_path=student['filepath'],
+                    upload_dir=upload_dir,
+                    static_dir=static_dir,
+                    progress_callback=progress_callback,
+                    event_callback=event_callback
+                )
+            job_store.set_result(analysis_id, result)
+            summary = summarize_student_result(result)
+        except Exception as e:
+            job_store.update_status(analysis_id, status="error", error=str(e), current_step=f"分析失败: {e}")
+            summary = {'success': False, 'error': str(e)}
+        finally:
+            progress_broker.close(analysis_id)
+
+        return {
+            'type': 'student_result',
+            'batch_id': batch_id,
+            'index': index,
+            'filename': student['filename'],
+            'analysis_id': analysis_id,
+            'result_url': f"/api/analysis/results/{analysis_id}",
+            'static_url': f"/static/{analysis_id}",
+            'summary': summary
+        }
+
+    summaries: List[Optional[Dict[str, Any]]] = [None] * len(students)
+
+    async def report(event: Dict[str, Any]):
+        summaries[event['index']] = event['summary']
+        job_store.advance_progress(
+            batch_id,
+            f"已完成 {sum(s is not None for s in summaries)}/{len(students)} 名学生",
+            step=100 // max(len(students), 1),
+            limit=99
+        )
+        await emit(event)
+
+    if students:
+        # 先单独分析第一名学生，预热老师视频分析缓存和模板缓存，其余学生再并行分发
+        await report(await analyze_student(0, students[0]))
+        tasks = [asyncio.ensure_future(analyze_student(index, student))
+                 for index, student in enumerate(students) if index > 0]
+        for finished in asyncio.as_completed(tasks):
+            await report(await finished)
+
+    statistics = aggregate_class_statistics(summaries)
+    batch_summary = {
+        'type': 'batch_summary',
+        'batch_id': batch_id,
+        'elapsed_seconds': round(time.time() - started_at, 2),
+        'statistics': statistics,
+        'students': [
+            {'index': index, 'filename': student['filename'], 'analysis_id': f"{batch_id}-{index}",
+             'summary': summaries[index]}
+            for index, student in enumerate(students)
+        ]
+    }
+    job_store.set_result(batch_id, batch_summary, current_step="批量分析完成!")
+    await emit(batch_summary)
+    return batch_summary
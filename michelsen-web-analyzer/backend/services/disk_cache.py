@@ -0,0 +1,88 @@
+"""
+磁盘目录缓存
+分析结果缓存和老师视频分析缓存的公共部分：每个缓存项是 cache_dir/<key>/ 目录，
+先写入临时目录再原子发布，按最近使用时间淘汰以限制总磁盘占用
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Iterable, Tuple
+
+META_FILENAME = 'meta.json'
+
+
+def directory_size(path: str) -> int:
+    """目录下所有文件的总字节数"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            try:
+                total += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                pass
+    return total
+
+
+class DirectoryCache:
+    """按最近使用时间淘汰的目录缓存
+
+    每个缓存项的 meta.json 记录缓存项大小；目录的修改时间即最近使用时间。
+    子类负责缓存项的内容：在 _tmp_dir() 中写好后调用 _publish() 发布，命中时调用 _touch() 更新使用时间。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _tmp_dir(self, key: str) -> str:
+        """缓存项的临时目录（以.开头，不计入缓存项）"""
+        return os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+
+    def _publish(self, tmp_dir: str, key: str) -> None:
+        """记录大小后把临时目录原子发布为缓存项：其他进程要么看不到该项，要么看到完整的缓存项"""
+        with open(os.path.join(tmp_dir, META_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump({'size': directory_size(tmp_dir), 'created_at': time.time()}, f)
+        os.rename(tmp_dir, self._entry_dir(key))
+
+    @staticmethod
+    def _touch(entry_dir: str) -> None:
+        """更新最近使用时间"""
+        os.utime(entry_dir)
+
+    def _entries(self) -> Iterable[Tuple[float, int, str]]:
+        """列出缓存项 (最近使用时间, 大小, 目录)"""
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if name.startswith('.') or not os.path.isdir(entry_dir):
+                continue
+            try:
+                with open(os.path.join(entry_dir, META_FILENAME), 'r', encoding='utf-8') as f:
+                    size = int(json.load(f)['size'])
+                yield os.path.getmtime(entry_dir), size, entry_dir
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def evict(self) -> int:
+        """按最近使用时间从旧到新删除缓存项，直到总大小不超过max_bytes，返回删除数量"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry_dir in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """清空所有缓存"""
+        for name in os.listdir(self.cache_dir):
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
@@ -0,0 +1,169 @@
+"""
+分析任务执行器
+在独立的进程池中运行CPU密集的视频分析，避免阻塞FastAPI事件循环
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+from services.metrics import metrics_registry
+
+
+def _run_analysis_job(
+    analysis_id: str,
+    teacher_video_path: str,
+    student_video_path: str,
+    upload_dir: str,
+    static_dir: str,
+    progress_queue
+) -> Dict[str, Any]:
+    """在工作进程中执行一次完整分析，进度消息通过progress_queue发回主进程"""
+    from core.logging_config import bind_analysis_id, configure_logging
+    from services.analyzer_service import AnalyzerService
+
+    # spawn启动的工作进程不继承主进程的日志配置
+    configure_logging()
+
+    def progress_callback(step: str):
+        progress_queue.put(('progress', analysis_id, step))
+
+    def progress_hook(event: Dict[str, Any]):
+        progress_queue.put(('event', analysis_id, event))
+
+    try:
+        service = AnalyzerService(upload_dir=upload_dir, static_dir=static_dir)
+        with bind_analysis_id(analysis_id):
+            return asyncio.run(service.analyze_videos(
+                teacher_video_path=teacher_video_path,
+                student_video_path=student_video_path,
+                progress_callback=progress_callback,
+                analysis_id=analysis_id,
+                progress_hook=progress_hook
+            ))
+    finally:
+        # 结束标记：主进程据此确认该任务的进度消息已全部转发
+        progress_queue.put(('done', analysis_id, None))
+
+
+class AnalysisJobExecutor:
+    """分析任务进程池
+
+    - 任务通过 run_in_executor 提交到 ProcessPoolExecutor，事件循环只等待结果
+    - 工作进程的进度消息写入 Manager 队列，由转发线程回调到事件循环中的 progress_callback
+      （步骤描述）和 event_callback（分析器的逐帧/逐部件进度事件）
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress_queue = None
+        self._relay_thread: Optional[threading.Thread] = None
+        self._listeners: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """首次提交任务时启动进程池、Manager队列和进度转发线程"""
+        with self._lock:
+            if self._pool is None:
+                # spawn避免在已有线程的服务进程中fork
+                mp_context = multiprocessing.get_context('spawn')
+                if self._manager is None:
+                    self._manager = mp_context.Manager()
+                    self._progress_queue = self._manager.Queue()
+                    self._relay_thread = threading.Thread(target=self._relay_progress, daemon=True)
+                    self._relay_thread.start()
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context)
+
+    def _relay_progress(self):
+        """转发线程：读取工作进程的进度消息，在对应任务的事件循环中调用回调"""
+        while True:
+            try:
+                message = self._progress_queue.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+
+            kind, analysis_id, payload = message
+            listener = self._listeners.get(analysis_id)
+            if listener is None:
+                continue
+            loop = listener['loop']
+            if kind == 'progress' and listener['callback']:
+                loop.call_soon_threadsafe(listener['callback'], payload)
+            elif kind == 'event' and listener['event_callback']:
+                loop.call_soon_threadsafe(listener['event_callback'], payload)
+            elif kind == 'done':
+                loop.call_soon_threadsafe(listener['done'].set)
+
+    async def submit(
+        self,
+        analysis_id: str,
+        teacher_video_path: str,
+        student_video_path: str,
+        upload_dir: str,
+        static_dir: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        event_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """提交分析任务并等待结果（不阻塞事件循环）"""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+        self._listeners[analysis_id] = {
+            'loop': loop,
+            'callback': progress_callback,
+            'event_callback': event_callback,
+            'done': done
+        }
+
+        try:
+            try:
+                result = await loop.run_in_executor(
+                    self._pool,
+                    _run_analysis_job,
+                    analysis_id,
+                    teacher_video_path,
+                    student_video_path,
+                    upload_dir,
+                    static_dir,
+                    self._progress_queue
+                )
+            except BrokenProcessPool:
+                # 工作进程异常退出，丢弃进程池，下次提交时重建
+                with self._lock:
+                    self._pool = None
+                raise
+
+            # 等待该任务剩余的进度消息转发完毕，保证调用方设置的最终状态不会被覆盖
+            try:
+                await asyncio.wait_for(done.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            metrics_registry.observe_result(result)
+            return result
+        finally:
+            self._listeners.pop(analysis_id, None)
+
+    def shutdown(self):
+        """关闭进程池和进度转发线程"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._manager is not None:
+                self._progress_queue.put(None)
+                self._relay_thread.join(timeout=5)
+                self._manager.shutdown()
+                self._manager = None
+                self._progress_queue = None
+
+
+# 全局任务执行器
+job_executor = AnalysisJobExecutor(max_workers=settings.analysis_workers)
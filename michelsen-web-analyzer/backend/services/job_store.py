@@ -0,0 +1,305 @@
+"""
+分析任务持久化存储
+基于SQLite（WAL模式）保存任务状态、进度、分析结果和上传文件信息，
+服务重启后数据不丢失，多个uvicorn工作进程可共享同一个数据库。
+
+执行任务的进程定期刷新运行中任务的updated_at（心跳）；进程崩溃或重启后心跳停止，
+超过 job_stale_seconds 没有更新的运行中任务被标记为失败，前端不会一直等待
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    analysis_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    current_step TEXT,
+    eta_seconds REAL,
+    progress_details TEXT,
+    include_device_detection INTEGER NOT NULL DEFAULT 1,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at);
+CREATE TABLE IF NOT EXISTS uploads (
+    video_type TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# 旧版本数据库中缺少的列（启动时自动补齐）
+MIGRATED_COLUMNS = {
+    'eta_seconds': 'REAL',
+    'progress_details': 'TEXT'
+}
+
+# 可通过update_status更新的任务字段
+STATUS_FIELDS = ('status', 'progress', 'current_step', 'error')
+
+# 执行进程已退出的运行中任务的错误信息
+STALE_JOB_ERROR = "任务已中断：执行该任务的服务进程已退出（服务重启或崩溃），请重新开始分析"
+
+
+def _json_default(value):
+    """结果中的numpy标量等对象转换为Python原生类型"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class JobStore:
+    """分析任务仓库"""
+
+    def __init__(self, db_path: str, ttl_seconds: int = 7 * 24 * 3600, static_dir: Optional[str] = None,
+                 heartbeat_seconds: float = 30):
+        """
+        Args:
+            db_path: SQLite数据库文件路径
+            ttl_seconds: 任务在最后一次更新后保留的秒数，超时的任务在创建新任务时被清理；0表示不清理
+            static_dir: 任务结果发布目录的根目录（static_dir/<analysis_id>/），清理过期任务时一并删除
+            heartbeat_seconds: 刷新本进程执行中任务updated_at的间隔
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.static_dir = static_dir
+        self.heartbeat_seconds = heartbeat_seconds
+        # 本进程执行中的任务（任务ID -> 嵌套track的次数），由心跳线程定期刷新
+        self._tracked: Dict[str, int] = {}
+        self._tracked_lock = threading.Lock()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, column_type in MIGRATED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+
+    @contextmanager
+    def _connect(self):
+        """每次操作使用独立连接，可在多线程、多进程间安全使用"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---- 任务状态 ----
+
+    def create(self, analysis_id: str, include_device_detection: bool = True,
+               current_step: str = "正在初始化分析...") -> Dict[str, Any]:
+        """创建任务（顺便清理过期任务）"""
+        self.evict_expired()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (analysis_id, status, progress, current_step, include_device_detection, "
+                "created_at, updated_at) VALUES (?, 'running', 0, ?, ?, ?, ?)",
+                (analysis_id, current_step, int(include_device_detection), now, now)
+            )
+        return self.get_status(analysis_id)
+
+    def update_status(self, analysis_id: str, **fields) -> None:
+        """更新任务状态字段（status/progress/current_step/error）"""
+        unknown = set(fields) - set(STATUS_FIELDS)
+        if unknown:
+            raise ValueError(f"不支持的任务字段: {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE analysis_id = ?",
+                (*fields.values(), time.time(), analysis_id)
+            )
+
+    def advance_progress(self, analysis_id: str, current_step: str, step: int = 10, limit: int = 90) -> None:
+        """更新当前步骤并原子地递增进度（不超过limit）"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET current_step = ?, progress = MIN(progress + ?, ?), updated_at = ? "
+                "WHERE analysis_id = ? AND status = 'running'",
+                (current_step, step, limit, time.time(), analysis_id)
+            )
+
+    def update_progress(self, analysis_id: str, progress: int, eta_seconds: Optional[float],
+                        details: Dict[str, Any]) -> None:
+        """更新完成百分比、预计剩余时间和结构化进度（只作用于运行中的任务）"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, eta_seconds = ?, progress_details = ?, updated_at = ? "
+                "WHERE analysis_id = ? AND status = 'running'",
+                (progress, eta_seconds, json.dumps(details, ensure_ascii=False), time.time(), analysis_id)
+            )
+
+    def set_result(self, analysis_id: str, result: Dict[str, Any], current_step: str = "分析完成!") -> None:
+        """保存分析结果并将任务标记为完成"""
+        payload = json.dumps(result, ensure_ascii=False, default=_json_default)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET result = ?, status = 'completed', progress = 100, eta_seconds = 0, "
+                "current_step = ?, updated_at = ? WHERE analysis_id = ?",
+                (payload, current_step, time.time(), analysis_id)
+            )
+
+    # ---- 执行进程心跳 ----
+
+    @contextmanager
+    def track(self, *analysis_ids: str) -> Iterator[None]:
+        """标记任务由当前进程执行：期间定期刷新其updated_at，其他进程据此判断任务仍在运行"""
+        with self._tracked_lock:
+            for analysis_id in analysis_ids:
+                self._tracked[analysis_id] = self._tracked.get(analysis_id, 0) + 1
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat',
+                                                          daemon=True)
+                self._heartbeat_thread.start()
+        try:
+            yield
+        finally:
+            with self._tracked_lock:
+                for analysis_id in analysis_ids:
+                    self._tracked[analysis_id] -= 1
+                    if not self._tracked[analysis_id]:
+                        del self._tracked[analysis_id]
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            with self._tracked_lock:
+                analysis_ids = list(self._tracked)
+            if not analysis_ids:
+                continue
+            try:
+                self.touch(analysis_ids)
+            except sqlite3.Error as e:
+                logger.warning("刷新任务心跳失败: %s", e)
+
+    def touch(self, analysis_ids: List[str]) -> None:
+        """刷新运行中任务的updated_at"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE analysis_id = ? AND status = 'running'",
+                [(now, analysis_id) for analysis_id in analysis_ids]
+            )
+
+    def fail_stale(self, max_idle_seconds: float, analysis_id: Optional[str] = None) -> int:
+        """把超过max_idle_seconds没有更新（执行进程已退出）的运行中任务标记为失败，返回标记数量
+
+        Args:
+            analysis_id: 只检查该任务，默认检查全部任务
+        """
+        query = ("UPDATE jobs SET status = 'error', error = ?, current_step = ?, eta_seconds = NULL, updated_at = ? "
+                 "WHERE status = 'running' AND updated_at < ?")
+        now = time.time()
+        params = [STALE_JOB_ERROR, STALE_JOB_ERROR, now, now - max_idle_seconds]
+        if analysis_id is not None:
+            query += " AND analysis_id = ?"
+            params.append(analysis_id)
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+        if cursor.rowcount:
+            logger.warning("%d 个运行中的任务已无执行进程，标记为失败", cursor.rowcount)
+        return cursor.rowcount
+
+    def get_status(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态，不存在时返回None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, progress, current_step, eta_seconds, progress_details, "
+                "include_device_detection, error, created_at FROM jobs WHERE analysis_id = ?",
+                (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "status": row["status"],
+            "progress": row["progress"],
+            "current_step": row["current_step"],
+            "eta_seconds": row["eta_seconds"],
+            "progress_details": json.loads(row["progress_details"]) if row["progress_details"] else None,
+            "include_device_detection": bool(row["include_device_detection"]),
+            "created_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row["created_at"])),
+            "error": row["error"]
+        }
+
+    def get_result(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """获取分析结果，任务不存在或尚未完成时返回None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE analysis_id = ?", (analysis_id,)).fetchone()
+        if row is None or row["result"] is None:
+            return None
+        return json.loads(row["result"])
+
+    def list_ids(self) -> List[str]:
+        """按创建时间列出所有任务ID"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT analysis_id FROM jobs ORDER BY created_at").fetchall()
+        return [row["analysis_id"] for row in rows]
+
+    def clear(self) -> None:
+        """清空所有任务"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs")
+
+    def evict_expired(self) -> int:
+        """删除超过TTL未更新的任务及其发布的结果文件，返回删除数量"""
+        if not self.ttl_seconds:
+            return 0
+        deadline = time.time() - self.ttl_seconds
+        with self._connect() as conn:
+            expired = [row["analysis_id"] for row in
+                       conn.execute("SELECT analysis_id FROM jobs WHERE updated_at < ?", (deadline,))]
+            if self.static_dir:
+                for analysis_id in expired:
+                    shutil.rmtree(os.path.join(self.static_dir, analysis_id), ignore_errors=True)
+            conn.executemany("DELETE FROM jobs WHERE analysis_id = ?", [(analysis_id,) for analysis_id in expired])
+        return len(expired)
+
+    # ---- 上传文件信息 ----
+
+    def set_upload(self, video_type: str, info: Dict[str, Any]) -> None:
+        """记录已上传的视频文件信息"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO uploads (video_type, info, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(video_type) DO UPDATE SET info = excluded.info, updated_at = excluded.updated_at",
+                (video_type, json.dumps(info, ensure_ascii=False), time.time())
+            )
+
+    def get_uploads(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """获取老师和学生视频的上传信息，未上传的为None"""
+        uploads: Dict[str, Optional[Dict[str, Any]]] = {"teacher": None, "student": None}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT video_type, info FROM uploads"):
+                uploads[row["video_type"]] = json.loads(row["info"])
+        return uploads
+
+
+# 全局任务仓库
+job_store = JobStore(settings.job_store_path, ttl_seconds=settings.job_ttl_seconds, static_dir=settings.static_dir,
+                     heartbeat_seconds=settings.job_heartbeat_seconds)
@@ -0,0 +1,71 @@
+"""
+运行指标
+汇总各分析任务结果中附带的耗时直方图，以Prometheus文本格式导出（/metrics）。
+指标保存在当前服务进程内存中，多个uvicorn工作进程各自导出自己处理过的任务
+"""
+
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+# 添加analyzer路径到sys.path（与analyzer_service一致，保证只加载一份instrumentation模块）
+analyzer_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'analyzer')
+if analyzer_path not in sys.path:
+    sys.path.insert(0, analyzer_path)
+
+from instrumentation import SpanRecorder
+
+METRIC_PREFIX = 'michelson_analysis'
+
+
+def _format_seconds(value: float) -> str:
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """分析任务指标：各阶段耗时直方图 + 按结果状态统计的任务数"""
+
+    def __init__(self):
+        self.spans = SpanRecorder()
+        self._jobs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe_result(self, result: Optional[Dict[str, Any]]) -> None:
+        """记录一次分析任务的结果（合并其 'timings' 直方图）"""
+        if not isinstance(result, dict):
+            return
+        self.spans.merge(result.get('timings'))
+        status = 'error' if result.get('success') is False else 'success'
+        with self._lock:
+            self._jobs[status] = self._jobs.get(status, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus文本格式（0.0.4）"""
+        lines: List[str] = []
+
+        jobs_metric = f'{METRIC_PREFIX}_jobs_total'
+        lines.append(f'# HELP {jobs_metric} Completed analysis jobs by outcome.')
+        lines.append(f'# TYPE {jobs_metric} counter')
+        with self._lock:
+            jobs = dict(self._jobs)
+        for status in ('success', 'error'):
+            lines.append(f'{jobs_metric}{{status="{status}"}} {jobs.get(status, 0)}')
+
+        span_metric = f'{METRIC_PREFIX}_span_duration_seconds'
+        lines.append(f'# HELP {span_metric} Time spent in instrumented analysis stages.')
+        lines.append(f'# TYPE {span_metric} histogram')
+        bounds = [_format_seconds(bound) for bound in self.spans.buckets] + ['+Inf']
+        for name, span in sorted(self.spans.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, span['buckets']):
+                cumulative += count
+                lines.append(f'{span_metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{span_metric}_sum{{span="{name}"}} {_format_seconds(span["sum_ns"] / 1e9)}')
+            lines.append(f'{span_metric}_count{{span="{name}"}} {span["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# 全局指标
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,64 @@
+"""
+分析进度推送
+把工作进程转发回来的进度事件分发给订阅者（SSE 连接），
+客户端不再需要轮询 /progress 接口
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from core.config import settings
+
+
+class ProgressBroker:
+    """按分析ID分发进度事件（只在事件循环线程中使用）
+
+    - 每个订阅者一个有界队列，客户端消费过慢时丢弃最旧的事件，不拖慢分析任务
+    - 保留每个任务的最新事件，新订阅者连上后立即收到当前进度
+    - 任务结束时 close() 向订阅者发送 None 结束标记
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+
+    def subscribe(self, analysis_id: str) -> asyncio.Queue:
+        """订阅任务的进度事件；已有进度时先放入最新事件"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        latest = self._latest.get(analysis_id)
+        if latest is not None:
+            queue.put_nowait(latest)
+        self._subscribers.setdefault(analysis_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, analysis_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(analysis_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(analysis_id, None)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item: Optional[Dict[str, Any]]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+    def publish(self, analysis_id: str, event: Dict[str, Any]) -> None:
+        """发布一条进度事件"""
+        event = {'analysis_id': analysis_id, **event}
+        self._latest[analysis_id] = event
+        for queue in self._subscribers.get(analysis_id, ()):
+            self._offer(queue, event)
+
+    def close(self, analysis_id: str) -> None:
+        """任务结束：通知订阅者并清理该任务的状态"""
+        self._latest.pop(analysis_id, None)
+        for queue in self._subscribers.get(analysis_id, ()):
+            self._offer(queue, None)
+
+
+# 全局进度推送
+progress_broker = ProgressBroker(queue_size=settings.progress_stream_queue_size)
@@ -0,0 +1,125 @@
+"""
+分析进度统计
+根据分析器上报的结构化进度（计划帧数、已解码帧数、已匹配部件数、已写入截图数）
+和实测的处理耗时，计算完成百分比和预计剩余时间，写入任务状态并推送给订阅者
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services.job_store import job_store
+from services.progress_broker import progress_broker
+
+# 工作量类型：(计划数量字段, 已完成数量字段)
+PROGRESS_UNITS = {
+    'frames': ('frames_planned', 'frames_decoded'),
+    'components': ('components_planned', 'components_matched'),
+    'screenshots': ('screenshots_planned', 'screenshots_written')
+}
+
+# 进度事件阶段 -> 工作量类型
+STAGE_UNITS = {
+    'video_frames': 'frames',
+    'key_frames': 'frames',
+    'components': 'components',
+    'screenshots': 'screenshots'
+}
+
+
+class ProgressTracker:
+    """由进度事件估算完成百分比和ETA
+
+    相邻两个事件的时间差计入后一个事件所属工作量类型的耗时，得到每帧、每个部件、每张截图的实测耗时；
+    尚未开始的类型按每帧耗时估算。剩余工作量乘以对应耗时即为ETA，
+    完成百分比为已用处理时间占（已用处理时间 + ETA）的比例；新类型的工作开始后耗时估算会修正，
+    百分比只增不减，ETA如实反映修正后的估算。
+    """
+
+    def __init__(self):
+        self.details: Optional[Dict[str, int]] = None
+        self._last_time: Optional[float] = None
+        self._elapsed = {unit: 0.0 for unit in PROGRESS_UNITS}
+        self._done = {unit: 0 for unit in PROGRESS_UNITS}
+        self._percent = 0
+
+    def _seconds_per_unit(self, unit: str) -> Optional[float]:
+        if self._done[unit]:
+            return self._elapsed[unit] / self._done[unit]
+        if self._done['frames']:
+            return self._elapsed['frames'] / self._done['frames']
+        return None
+
+    def update(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """处理一条进度事件，返回 {'progress', 'eta_seconds', 'frames_per_second'}；事件不含结构化进度时返回None"""
+        details = event.get('counters')
+        if details is None:
+            return None
+        self.details = details
+
+        event_time = event.get('time', time.time())
+        unit = STAGE_UNITS.get(event.get('stage'))
+        if unit is not None and self._last_time is not None:
+            self._elapsed[unit] += max(event_time - self._last_time, 0.0)
+            self._done[unit] += 1
+        self._last_time = event_time
+
+        eta = 0.0
+        for unit, (planned_field, done_field) in PROGRESS_UNITS.items():
+            remaining = max(details.get(planned_field, 0) - details.get(done_field, 0), 0)
+            if not remaining:
+                continue
+            seconds = self._seconds_per_unit(unit)
+            if seconds is None:
+                eta = None
+                break
+            eta += remaining * seconds
+
+        if eta is None:
+            # 尚无实测耗时：按完成数量估算
+            planned = sum(details.get(fields[0], 0) for fields in PROGRESS_UNITS.values())
+            done = sum(min(details.get(fields[1], 0), details.get(fields[0], 0)) for fields in PROGRESS_UNITS.values())
+            fraction = done / planned if planned else 0.0
+        else:
+            spent = sum(self._elapsed.values())
+            fraction = spent / (spent + eta) if spent + eta > 0 else 1.0
+
+        # 100% 留给任务真正完成（结果已保存）时设置
+        self._percent = max(self._percent, min(int(fraction * 100), 99))
+        frame_seconds = self._seconds_per_unit('frames') if self._done['frames'] else None
+        return {
+            'progress': self._percent,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'frames_per_second': round(1 / frame_seconds, 3) if frame_seconds else None
+        }
+
+
+def job_progress_callbacks(analysis_id: str, min_interval: float = 1.0
+                           ) -> Tuple[Callable[[str], None], Callable[[Dict[str, Any]], None]]:
+    """创建分析任务的进度回调 (progress_callback, event_callback)
+
+    - progress_callback: 更新当前步骤描述
+    - event_callback: 处理分析器进度事件，更新百分比和ETA；
+      写入任务状态时按百分比变化或min_interval秒节流，推送给订阅者时不节流
+    """
+    tracker = ProgressTracker()
+    last_saved = {'progress': None, 'time': 0.0}
+
+    def progress_callback(step: str):
+        job_store.update_status(analysis_id, current_step=step)
+        progress_broker.publish(analysis_id, {'type': 'step', 'current_step': step})
+
+    def event_callback(event: Dict[str, Any]):
+        estimate = tracker.update(event)
+        if estimate is not None:
+            now = time.time()
+            if estimate['progress'] != last_saved['progress'] or now - last_saved['time'] >= min_interval:
+                job_store.update_progress(
+                    analysis_id,
+                    estimate['progress'],
+                    estimate['eta_seconds'],
+                    {**tracker.details, 'frames_per_second': estimate['frames_per_second']}
+                )
+                last_saved.update(progress=estimate['progress'], time=now)
+        progress_broker.publish(analysis_id, {'type': 'progress', **event, **(estimate or {})})
+
+    return progress_callback, event_callback
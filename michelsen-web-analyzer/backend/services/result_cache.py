@@ -0,0 +1,131 @@
+"""
+分析结果缓存
+以视频内容哈希、分析参数和部件模板哈希为键保存分析报告及其输出文件，
+相同输入再次提交时直接返回，不再重新解码和检测
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import settings
+from services.disk_cache import DirectoryCache
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，分析流程或缓存布局变化时递增使旧缓存失效
+RESULT_CACHE_VERSION = 1
+
+RESULT_FILENAME = 'result.json'
+FILES_DIRNAME = 'files'
+
+# 文件内容哈希的内存缓存：(绝对路径, 大小, 修改时间) -> sha256
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+# 上传时已计算的哈希保存在同目录的 <文件名>.sha256 旁路文件中，供其他进程复用
+HASH_SIDECAR_SUFFIX = '.sha256'
+
+
+def write_hash_sidecar(path: str, content_hash: str) -> None:
+    """记录文件的内容哈希（连同文件大小和修改时间，文件变化后自动失效）"""
+    stat = os.stat(path)
+    with open(path + HASH_SIDECAR_SUFFIX, 'w', encoding='utf-8') as f:
+        f.write(f"{stat.st_size} {stat.st_mtime_ns} {content_hash}\n")
+
+
+def _read_hash_sidecar(path: str, stat: os.stat_result) -> Optional[str]:
+    try:
+        with open(path + HASH_SIDECAR_SUFFIX, 'r', encoding='utf-8') as f:
+            size, mtime_ns, content_hash = f.read().split()
+    except (OSError, ValueError):
+        return None
+    if int(size) != stat.st_size or int(mtime_ns) != stat.st_mtime_ns:
+        return None
+    return content_hash
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件内容的SHA-256（文件未变化时复用上次结果或上传时记录的哈希）"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(memo_key)
+    if cached is None:
+        cached = _read_hash_sidecar(path, stat)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    content_hash = digest.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = content_hash
+    return content_hash
+
+
+class ResultCache(DirectoryCache):
+    """内容寻址的分析结果缓存（按最近使用时间淘汰，限制总磁盘占用）
+
+    每个缓存项是 cache_dir/<key>/ 目录：
+    - result.json: 分析报告
+    - files/: 分析输出目录的完整副本（截图、报告、检测图片）
+    - meta.json: 缓存项大小；目录的修改时间即最近使用时间
+    """
+
+    @staticmethod
+    def compute_key(video_hashes: Dict[str, str], params: Dict[str, Any],
+                    template_hashes: Dict[str, Optional[str]]) -> str:
+        """根据视频哈希、分析参数和模板哈希计算缓存键"""
+        payload = json.dumps({
+            'version': RESULT_CACHE_VERSION,
+            'videos': video_hashes,
+            'params': params,
+            'templates': template_hashes
+        }, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, output_dir: str) -> Optional[Dict[str, Any]]:
+        """查找缓存；命中时把缓存的输出文件复制到output_dir并返回分析报告"""
+        entry_dir = self._entry_dir(key)
+        result_path = os.path.join(entry_dir, RESULT_FILENAME)
+        try:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            shutil.copytree(os.path.join(entry_dir, FILES_DIRNAME), output_dir, dirs_exist_ok=True)
+            self._touch(entry_dir)
+        except (OSError, ValueError):
+            # 未命中，或缓存项正在被淘汰
+            return None
+        return result
+
+    def put(self, key: str, result: Dict[str, Any], output_dir: str) -> None:
+        """保存分析报告和output_dir中的输出文件，然后按容量淘汰旧缓存"""
+        entry_dir = self._entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+
+        tmp_dir = self._tmp_dir(key)
+        try:
+            shutil.copytree(output_dir, os.path.join(tmp_dir, FILES_DIRNAME))
+            with open(os.path.join(tmp_dir, RESULT_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, default=str)
+            self._publish(tmp_dir, key)
+        except OSError as e:
+            logger.warning("写入分析结果缓存失败: %s", e)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+
+# 全局结果缓存
+result_cache = ResultCache(settings.result_cache_dir, settings.result_cache_max_bytes)
@@ -0,0 +1,110 @@
+"""
+老师示范视频分析缓存
+同一个老师视频通常要与大量学生视频对比，老师视频的步骤分析、截图和截图解释
+只计算一次并持久化，之后的任务直接复用，无需再解码老师视频；
+与分析结果缓存一样按最近使用时间淘汰，限制总磁盘占用
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from services.disk_cache import DirectoryCache
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，老师视频分析流程或缓存布局变化时递增使旧缓存失效
+TEACHER_CACHE_VERSION = 1
+
+POINTS_FILENAME = 'points.json'
+EXPLANATIONS_FILENAME = 'explanations.json'
+SCREENSHOTS_DIRNAME = 'screenshots'
+
+# 分析点中需要持久化的元数据字段（帧图像不保存，需要时按video_path重新解码）
+POINT_FIELDS = ('timestamp', 'time_str', 'frame_number', 'current_step', 'video_type')
+
+
+class TeacherAnalysisCache(DirectoryCache):
+    """老师视频分析缓存（按最近使用时间淘汰，限制总磁盘占用）
+
+    每个缓存项是 cache_dir/<key>/ 目录：
+    - points.json: 老师视频分析点（不含帧图像）
+    - explanations.json: 老师示范截图的解释
+    - screenshots/: 老师示范截图（及各宽度的缩小版本）
+    - meta.json: 缓存项大小；目录的修改时间即最近使用时间
+    """
+
+    @staticmethod
+    def compute_key(video_hash: str, interval: int, teacher_steps: List[Dict],
+                    screenshot_options: Optional[Dict[str, Any]] = None) -> str:
+        """根据老师视频内容哈希、采样间隔、标准步骤定义和截图编码参数计算缓存键"""
+        payload = json.dumps({
+            'version': TEACHER_CACHE_VERSION,
+            'video': video_hash,
+            'interval': interval,
+            'teacher_steps': teacher_steps,
+            'screenshots': screenshot_options or {}
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, video_path: str, screenshots_dir: str) -> Optional[Dict[str, Any]]:
+        """查找缓存；命中时把老师示范截图复制到screenshots_dir，
+        返回 {'analysis': 分析点列表, 'explanations': 截图解释}"""
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, POINTS_FILENAME), 'r', encoding='utf-8') as f:
+                points = json.load(f)
+            with open(os.path.join(entry_dir, EXPLANATIONS_FILENAME), 'r', encoding='utf-8') as f:
+                explanations = json.load(f)
+            shutil.copytree(os.path.join(entry_dir, SCREENSHOTS_DIRNAME), screenshots_dir, dirs_exist_ok=True)
+            self._touch(entry_dir)
+        except (OSError, ValueError):
+            # 未命中，或缓存项正在被淘汰
+            return None
+
+        video_path = os.path.abspath(video_path)
+        for point in points:
+            point['frame'] = None
+            point['video_path'] = video_path
+        return {'analysis': points, 'explanations': explanations}
+
+    def put(self, key: str, teacher_analysis: List[Dict], screenshot_explanations: Dict[str, Dict],
+            screenshots_dir: str) -> None:
+        """保存老师视频分析点，以及screenshots_dir中属于老师示范的截图和解释，然后按容量淘汰旧缓存"""
+        entry_dir = self._entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+
+        teacher_explanations = {
+            name: explanation for name, explanation in screenshot_explanations.items()
+            if explanation.get('type') == '老师示范'
+        }
+        points = [{field: point.get(field) for field in POINT_FIELDS} for point in teacher_analysis]
+
+        tmp_dir = self._tmp_dir(key)
+        try:
+            tmp_screenshots = os.path.join(tmp_dir, SCREENSHOTS_DIRNAME)
+            os.makedirs(tmp_screenshots)
+            for name, explanation in teacher_explanations.items():
+                # 截图及其各宽度的缩小版本
+                for filename in [name, *explanation.get('variants', {}).values()]:
+                    shutil.copy2(os.path.join(screenshots_dir, filename), os.path.join(tmp_screenshots, filename))
+            with open(os.path.join(tmp_dir, POINTS_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(points, f, ensure_ascii=False)
+            with open(os.path.join(tmp_dir, EXPLANATIONS_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(teacher_explanations, f, ensure_ascii=False)
+            self._publish(tmp_dir, key)
+        except OSError as e:
+            logger.warning("写入老师视频分析缓存失败: %s", e)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+
+# 全局老师视频分析缓存
+teacher_cache = TeacherAnalysisCache(settings.teacher_cache_dir, settings.teacher_cache_max_bytes)
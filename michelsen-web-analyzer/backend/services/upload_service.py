@@ -0,0 +1,312 @@
+"""
+视频上传服务
+流式写入上传文件：按大块读写、边写边计算SHA-256、逐块检查大小限制，
+并支持可断点续传的分块上传会话
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from core.config import settings
+from services.result_cache import write_hash_sidecar
+
+try:
+    import fcntl
+except ImportError:  # Windows：只有进程内的会话锁
+    fcntl = None
+
+
+class UploadTooLargeError(Exception):
+    """上传内容超过大小限制"""
+
+
+class UploadOffsetError(Exception):
+    """分块上传的偏移量与已接收的数据不一致"""
+
+    def __init__(self, expected_offset: int):
+        super().__init__(f"偏移量不匹配，服务器已接收 {expected_offset} 字节")
+        self.expected_offset = expected_offset
+
+
+class UploadSessionNotFoundError(Exception):
+    """分块上传会话不存在或已过期"""
+
+
+async def _write_stream(chunks: AsyncIterator[bytes], target, digest, size: int, max_size: int,
+                        buffer_size: Optional[int] = None) -> int:
+    """把数据块写入已打开的文件，更新哈希并检查大小，返回写入后的总大小
+
+    请求体通常以几十KB的小块到达，先在内存中攒到 buffer_size（默认 settings.upload_chunk_size）
+    再交给线程池写盘，避免每个小块一次线程切换。哈希随写盘更新，与文件内容保持一致；
+    连接中断等异常时已接收的数据仍会写入，客户端可从新的偏移量续传。
+    """
+    buffer_size = buffer_size or settings.upload_chunk_size
+    pending = bytearray()
+
+    async def flush():
+        data = bytes(pending)
+        pending.clear()
+        digest.update(data)
+        # 磁盘写入放到线程池，不阻塞事件循环
+        await asyncio.to_thread(target.write, data)
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_size:
+                pending.clear()
+                raise UploadTooLargeError(f"文件大小超过限制 {max_size // (1024 * 1024)}MB")
+            pending += chunk
+            if len(pending) >= buffer_size:
+                await flush()
+    finally:
+        if pending:
+            await flush()
+    return size
+
+
+async def _iter_upload_file(file, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def save_upload_stream(
+    file,
+    target_path: str,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """流式保存UploadFile到target_path
+
+    先写入临时文件，完成后原子替换目标文件；超过大小限制时抛出UploadTooLargeError且不留下任何文件。
+
+    Returns:
+        {'size': 字节数, 'sha256': 内容哈希}
+    """
+    max_size = max_size or settings.max_file_size
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    # 客户端声明了大小时提前拒绝，无需读取内容
+    declared_size = getattr(file, 'size', None)
+    if declared_size is not None and declared_size > max_size:
+        raise UploadTooLargeError(f"文件大小超过限制 {max_size // (1024 * 1024)}MB")
+
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+    tmp_path = f"{target_path}.{uuid.uuid4().hex}.uploading"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, 'wb') as target:
+            size = await _write_stream(_iter_upload_file(file, chunk_size), target, digest, 0, max_size)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    content_hash = digest.hexdigest()
+    write_hash_sidecar(target_path, content_hash)
+    return {'size': size, 'sha256': content_hash}
+
+
+class UploadSessionStore:
+    """可断点续传的分块上传会话
+
+    每个会话在 sessions_dir 下有两个文件：
+    - <upload_id>.json: 会话信息（目标文件、总大小等）
+    - <upload_id>.part: 已接收的数据
+    已接收字节数即 .part 文件大小，因此服务重启或换一个工作进程后仍可继续上传。
+
+    同一会话的追加写入是互斥的：进程内用asyncio锁排队；多个工作进程之间
+    用 <upload_id>.lock 文件上的 flock 互斥，另一进程正在写入时返回偏移量冲突，客户端查询状态后重试。
+    没有 fcntl 的平台（Windows）只有进程内互斥，多工作进程部署时需保证同一会话的请求路由到同一进程。
+    """
+
+    def __init__(self, sessions_dir: str, ttl_seconds: int = 24 * 3600):
+        self.sessions_dir = sessions_dir
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(sessions_dir, exist_ok=True)
+        # 进行中的哈希状态（hashlib对象无法持久化，缺失时从 .part 文件重新计算）
+        self._digests: Dict[str, Any] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{upload_id}.json")
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{upload_id}.part")
+
+    def _lock_path(self, upload_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{upload_id}.lock")
+
+    def _session_lock(self, upload_id: str) -> asyncio.Lock:
+        """进程内的会话锁（只在当前进程的事件循环中有效）"""
+        with self._lock:
+            return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    @contextmanager
+    def _process_lock(self, upload_id: str) -> Iterator[bool]:
+        """跨进程的会话锁（非阻塞），得到 False 表示另一进程正在写入该会话"""
+        if fcntl is None:
+            yield True
+            return
+        with open(self._lock_path(upload_id), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            # 关闭文件时释放锁（进程异常退出时由系统释放）
+            yield True
+
+    def create(self, target_path: str, total_size: int, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """创建上传会话（顺便清理过期会话）"""
+        if total_size <= 0:
+            raise ValueError(f"文件大小无效: {total_size}")
+        if total_size > settings.max_file_size:
+            raise UploadTooLargeError(f"文件大小超过限制 {settings.max_file_size // (1024 * 1024)}MB")
+        self.evict_expired()
+
+        upload_id = uuid.uuid4().hex
+        session = {
+            'upload_id': upload_id,
+            'target_path': os.path.abspath(target_path),
+            'total_size': total_size,
+            'metadata': metadata or {},
+            'created_at': time.time()
+        }
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(session, f, ensure_ascii=False)
+        open(self._part_path(upload_id), 'wb').close()
+        self._digests[upload_id] = (0, hashlib.sha256())
+        return self.status(upload_id)
+
+    def _load(self, upload_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadSessionNotFoundError(f"上传会话不存在: {upload_id}")
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """获取会话状态（客户端据此从offset处续传）"""
+        session = self._load(upload_id)
+        offset = os.path.getsize(self._part_path(upload_id))
+        return {
+            'upload_id': upload_id,
+            'offset': offset,
+            'total_size': session['total_size'],
+            'chunk_size': settings.upload_chunk_size,
+            'complete': False
+        }
+
+    def _digest_at(self, upload_id: str, offset: int):
+        """获取覆盖前offset字节的哈希状态"""
+        cached = self._digests.get(upload_id)
+        if cached is not None and cached[0] == offset:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(self._part_path(upload_id), 'rb') as f:
+            for chunk in iter(lambda: f.read(settings.upload_chunk_size), b''):
+                digest.update(chunk)
+        return digest
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """从offset处追加一段数据；数据收齐后把文件移动到目标路径
+
+        Returns:
+            会话状态；上传完成时 complete 为True，并包含 size、sha256、target_path 和 metadata
+        """
+        async with self._session_lock(upload_id):
+            session = self._load(upload_id)
+            with self._process_lock(upload_id) as locked:
+                try:
+                    received = os.path.getsize(self._part_path(upload_id))
+                except FileNotFoundError:
+                    # 另一进程刚完成该会话
+                    self.discard(upload_id)
+                    raise UploadSessionNotFoundError(f"上传会话不存在: {upload_id}")
+                if not locked or offset != received:
+                    raise UploadOffsetError(received)
+                return await self._append_locked(upload_id, session, received, chunks)
+
+    async def _append_locked(self, upload_id: str, session: Dict[str, Any], received: int,
+                             chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """持有会话锁时追加数据并在收齐后完成上传"""
+        part_path = self._part_path(upload_id)
+        digest = self._digest_at(upload_id, received)
+        # 写入失败时缓存的哈希状态可能与文件不一致，下次从 .part 文件重新计算
+        self._digests.pop(upload_id, None)
+        with open(part_path, 'ab') as target:
+            try:
+                size = await _write_stream(chunks, target, digest, received, session['total_size'])
+            except UploadTooLargeError:
+                # 超出声明大小的部分不保留，客户端可从原偏移量重试
+                target.truncate(received)
+                raise
+        self._digests[upload_id] = (size, digest)
+
+        if size < session['total_size']:
+            return self.status(upload_id)
+
+        # 数据收齐：原子移动到目标路径并记录哈希
+        content_hash = digest.hexdigest()
+        os.makedirs(os.path.dirname(session['target_path']), exist_ok=True)
+        os.replace(part_path, session['target_path'])
+        write_hash_sidecar(session['target_path'], content_hash)
+        self.discard(upload_id)
+        return {
+            'upload_id': upload_id,
+            'offset': size,
+            'total_size': session['total_size'],
+            'complete': True,
+            'size': size,
+            'sha256': content_hash,
+            'target_path': session['target_path'],
+            'metadata': session['metadata']
+        }
+
+    def discard(self, upload_id: str) -> None:
+        """删除会话及其未完成的数据"""
+        for path in (self._meta_path(upload_id), self._part_path(upload_id), self._lock_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        self._digests.pop(upload_id, None)
+        with self._lock:
+            self._locks.pop(upload_id, None)
+
+    def evict_expired(self) -> int:
+        """删除超过TTL的未完成会话，返回删除数量"""
+        removed = 0
+        deadline = time.time() - self.ttl_seconds
+        for name in os.listdir(self.sessions_dir):
+            if not name.endswith('.json'):
+                continue
+            upload_id = name[:-len('.json')]
+            try:
+                part_mtime = os.path.getmtime(self._part_path(upload_id))
+            except OSError:
+                part_mtime = 0
+            if max(os.path.getmtime(self._meta_path(upload_id)), part_mtime) < deadline:
+                self.discard(upload_id)
+                removed += 1
+        return removed
+
+
+# 全局上传会话仓库
+upload_sessions = UploadSessionStore(
+    os.path.join(settings.upload_dir, 'sessions'),
+    ttl_seconds=settings.upload_session_ttl_seconds
+)
@@ -0,0 +1,181 @@
+"""
+视频流式传输
+支持 Range/206 部分内容、ETag/Last-Modified 条件请求，按可配置的块大小读取，
+前端拖动视频进度条时只读取需要的字节
+"""
+
+import asyncio
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Mapping, Optional, Tuple
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response, StreamingResponse
+
+from core.config import settings
+from services.result_cache import HASH_SIDECAR_SUFFIX
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.webm', '.mkv'}
+
+# Range中的字节位置只允许ASCII数字
+_DIGITS = re.compile(r'[0-9]+')
+
+
+def _file_etag(path: str, stat: os.stat_result) -> str:
+    """ETag：上传时记录了内容哈希则使用强ETag，否则由大小和修改时间生成"""
+    try:
+        with open(path + HASH_SIDECAR_SUFFIX, 'r', encoding='utf-8') as f:
+            size, mtime_ns, content_hash = f.read().split()
+        if int(size) == stat.st_size and int(mtime_ns) == stat.st_mtime_ns:
+            return f'"{content_hash}"'
+    except (OSError, ValueError):
+        pass
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    """If-None-Match / If-Range 的ETag比较（弱比较）"""
+    if header_value.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header_value.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def _not_modified_since(header_value: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(header_value).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_range(header_value: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """解析单个字节范围，返回闭区间 (start, end)
+
+    Returns:
+        None 表示忽略Range返回完整内容（多段范围或语法无效，如非数字、结束位置小于起始位置）
+
+    Raises:
+        ValueError: 范围无法满足（起始位置超出文件大小或后缀长度为0，应返回416）
+    """
+    unit, _, ranges = header_value.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+    start_text, sep, end_text = ranges.strip().partition('-')
+    start_text, end_text = start_text.strip(), end_text.strip()
+    if not sep or not (start_text or end_text):
+        return None
+    if any(text and not _DIGITS.fullmatch(text) for text in (start_text, end_text)):
+        return None
+
+    if not start_text:
+        # 后缀范围：最后N个字节
+        suffix = int(end_text)
+        if suffix == 0:
+            raise ValueError("空的后缀范围")
+        return max(file_size - suffix, 0), file_size - 1
+
+    start = int(start_text)
+    end = int(end_text) if end_text else None
+    if end is not None and end < start:
+        # 语法无效的范围（RFC 9110 14.1.1），忽略Range
+        return None
+    if start >= file_size:
+        raise ValueError("范围超出文件大小")
+    return start, file_size - 1 if end is None else min(end, file_size - 1)
+
+
+async def iter_file_range(path: str, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+    """按块读取文件的 [start, end] 字节（读取放到线程池，不阻塞事件循环）"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def build_video_response(
+    path: str,
+    request_headers: Mapping[str, str],
+    method: str = 'GET',
+    media_type: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    stat: Optional[os.stat_result] = None,
+    extra_headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """构造支持Range和条件请求的视频响应"""
+    stat = stat or os.stat(path)
+    chunk_size = chunk_size or settings.video_stream_chunk_size
+    media_type = media_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    file_size = stat.st_size
+    etag = _file_etag(path, stat)
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+        'Cache-Control': 'no-cache',
+        **(extra_headers or {})
+    }
+
+    # 条件请求：未变化时返回304
+    if_none_match = request_headers.get('if-none-match')
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request_headers.get('if-modified-since')
+        if if_modified_since and _not_modified_since(if_modified_since, stat.st_mtime):
+            return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request_headers.get('range')
+    if range_header:
+        # If-Range不匹配（文件已变化）时忽略Range，返回完整的新文件
+        if_range = request_headers.get('if-range')
+        if if_range is None or (
+            _etag_matches(if_range, etag) if if_range.strip().startswith(('"', 'W/'))
+            else _not_modified_since(if_range, stat.st_mtime)
+        ):
+            try:
+                byte_range = parse_range(range_header, file_size)
+            except ValueError:
+                return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{file_size}'})
+
+    if byte_range is None:
+        status_code = 200
+        start, end = 0, file_size - 1
+    else:
+        status_code = 206
+        start, end = byte_range
+        headers['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+    headers['Content-Length'] = str(max(end - start + 1, 0))
+
+    if method == 'HEAD' or file_size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        iter_file_range(path, start, end, chunk_size),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
+
+class RangeStaticFiles(StaticFiles):
+    """静态文件服务：视频文件使用支持Range的流式响应，其他文件保持默认行为"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        if os.path.splitext(str(full_path))[1].lower() in VIDEO_EXTENSIONS and status_code == 200:
+            return build_video_response(
+                str(full_path),
+                Headers(scope=scope),
+                method=scope.get('method', 'GET'),
+                stat=stat_result
+            )
+        return super().file_response(full_path, stat_result, scope, status_code)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+
+与服务层一致：后端根目录和 analyzer 目录都加入 sys.path，
+分析器模块按 `from fft_correlation import ...` 的方式导入。
+"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (backend_dir, os.path.join(backend_dir, 'analyzer')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+# 直接引用全局任务仓库的模块（测试时替换为临时数据库）
+JOB_STORE_MODULES = (
+    'services.batch_service',
+    'services.progress_tracker',
+    'api.routers.analysis',
+    'api.routers.batch',
+    'api.routers.upload',
+)
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    """临时数据库中的任务仓库，替换各模块引用的全局 job_store"""
+    from services.job_store import JobStore
+
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), static_dir=str(tmp_path / 'static'))
+    for module_name in JOB_STORE_MODULES:
+        monkeypatch.setattr(importlib.import_module(module_name), 'job_store', store)
+    return store
+
+
+@pytest.fixture
+def write_video(tmp_path):
+    """把帧序列（BGR）写成MJPG视频（每帧都是关键帧，seek结果确定），返回视频路径"""
+    import cv2
+
+    def write(frames, fps=5.0, name='video.avi'):
+        path = str(tmp_path / name)
+        height, width = frames[0].shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+        return path
+
+    return write
+
+
+# 合成场景中7个部件的位置 (x1, y1, x2, y2)，依次对应 part1.png ~ part7.png
+PART_BOXES = [
+    (10, 10, 80, 45), (110, 10, 180, 50), (210, 15, 290, 55), (15, 90, 85, 130),
+    (120, 100, 200, 140), (220, 95, 300, 135), (60, 170, 150, 220),
+]
+
+
+@pytest.fixture
+def scene():
+    """合成实验台画面（BGR）：灰度噪声纹理，不含红色
+
+    低频分量（放大的粗噪声）供金字塔粗搜索定位，高频分量（模糊的细噪声）供特征点检测和精确匹配。
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    coarse = cv2.resize(rng.integers(0, 256, (30, 40), dtype=np.uint8), (320, 240), interpolation=cv2.INTER_CUBIC)
+    fine = cv2.GaussianBlur(rng.integers(0, 256, (240, 320), dtype=np.uint8), (5, 5), 0)
+    return cv2.cvtColor(cv2.addWeighted(coarse, 0.3, fine, 0.7, 0), cv2.COLOR_GRAY2BGR)
+
+
+@pytest.fixture
+def part_dir(tmp_path, scene):
+    """部件标注图片目录：partN.png 为合成画面上用红框标出第N个部件"""
+    import cv2
+
+    directory = tmp_path / 'parts'
+    directory.mkdir()
+    for index, (x1, y1, x2, y2) in enumerate(PART_BOXES, start=1):
+        labeled = scene.copy()
+        cv2.rectangle(labeled, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        cv2.imwrite(str(directory / f'part{index}.png'), labeled)
+    return directory
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""检测结果标注：一次绘制整帧标注与逐个检测调用 draw_chinese_text 的结果一致"""
+
+import cv2
+import numpy as np
+import pytest
+
+from annotation_renderer import AnnotationRenderer
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from font_registry import FontRegistry
+
+# 互不重叠的检测结果（标签不压在其他边界框上，绘制顺序不影响结果）
+DETECTIONS = [
+    {'name': '氦氖激光器', 'bbox': (20, 60, 150, 140), 'confidence': 0.912},
+    {'name': '动镜', 'bbox': (300, 200, 450, 300), 'confidence': 0.5},
+    {'name': '二合一观察屏', 'bbox': (40, 250, 200, 330), 'confidence': 0.287},
+]
+
+
+@pytest.fixture
+def analyzer():
+    return MichelsonInterferometerAnalyzer()
+
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(1).integers(0, 256, (400, 600, 3), dtype=np.uint8)
+
+
+def _draw_one_by_one(analyzer, frame, detections):
+    """原实现：每个检测依次画框、整帧转换为PIL绘制中文名称、画置信度"""
+    result = frame.copy()
+    for i, detection in enumerate(detections):
+        x1, y1, x2, y2 = detection['bbox']
+        color = analyzer.colors[i % len(analyzer.colors)]
+        cv2.rectangle(result, (x1, y1), (x2, y2), color, 3)
+        result = analyzer.draw_chinese_text(result, detection['name'], (x1, max(30, y1 - 10)),
+                                            font_size=30, text_color=color)
+        cv2.putText(result, f"{detection['confidence']:.3f}", (x1, y2 + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return result
+
+
+@pytest.mark.parametrize('glyph_cache', [True, False])
+def test_matches_per_detection_drawing(analyzer, frame, glyph_cache):
+    original = frame.copy()
+    rendered = AnnotationRenderer(glyph_cache=glyph_cache).render(frame, DETECTIONS, analyzer.colors)
+    assert np.array_equal(rendered, _draw_one_by_one(analyzer, frame, DETECTIONS))
+    # 不修改输入帧
+    assert np.array_equal(frame, original)
+
+
+def test_draw_detections_on_frame(analyzer, frame):
+    assert np.array_equal(analyzer.draw_detections_on_frame(frame, DETECTIONS),
+                          _draw_one_by_one(analyzer, frame, DETECTIONS))
+    assert np.array_equal(analyzer.draw_detections_on_frame(frame, []), frame)
+
+
+def test_glyphs_are_cached(analyzer, frame):
+    renderer = AnnotationRenderer(glyph_cache_size=2)
+    renderer.render(frame, DETECTIONS, analyzer.colors)
+    assert list(renderer._glyphs) == [('动镜', 30), ('二合一观察屏', 30)]
+    glyph = renderer.glyph('动镜', 30)
+    assert renderer.glyph('动镜', 30) is glyph
+
+
+def test_grayscale_frame_and_label_near_top(analyzer):
+    gray = np.full((120, 200), 128, dtype=np.uint8)
+    detections = [{'name': '定镜', 'bbox': (10, 5, 100, 60), 'confidence': 0.4}]
+    rendered = AnnotationRenderer().render(gray, detections, analyzer.colors)
+    expected = _draw_one_by_one(analyzer, cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB), detections)
+    assert rendered.shape == (120, 200, 3)
+    assert np.array_equal(rendered, expected)
+
+
+def test_without_font_file(analyzer, frame, tmp_path):
+    """没有字体文件时退回PIL默认字体，仍然绘制全部标注"""
+    renderer = AnnotationRenderer(fonts=FontRegistry([str(tmp_path / 'missing.ttc')]))
+    rendered = renderer.render(frame, DETECTIONS, analyzer.colors)
+    x1, _, x2, y2 = DETECTIONS[0]['bbox']
+    assert np.array_equal(rendered[y2, x1:x2], np.tile(analyzer.colors[0], (x2 - x1, 1)))
+    assert not np.array_equal(rendered, renderer.render(frame, DETECTIONS[1:], analyzer.colors))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""批量分析接口：NDJSON事件流、先预热后并行的分发顺序、batch_error"""
+
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routers import batch
+from core.config import settings
+from services import batch_service
+
+# 各学生分析耗时（秒）：第2名学生最快完成
+ANALYSIS_SECONDS = {'000.mp4': 0, '001.mp4': 0.2, '002.mp4': 0.05, '003.mp4': 0.1}
+
+
+class StubExecutor:
+    """替代分析进程池：按学生视频返回固定结果，记录开始和结束顺序"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def submit(self, analysis_id, student_video_path, **kwargs):
+        name = os.path.basename(student_video_path)
+        self.calls.append(('start', name))
+        await asyncio.sleep(ANALYSIS_SECONDS[name])
+        self.calls.append(('end', name))
+        if name == '003.mp4':
+            raise RuntimeError("无法打开视频")
+        return {
+            'teacher_analysis': {'steps': [{'step_id': 1}, {'step_id': 2}]},
+            'student_analysis': {'steps': [{'step_id': 1, 'confidence': 0.8}]},
+            'equipment_detection': {'detection_rate': 0.5}
+        }
+
+
+@pytest.fixture
+def client(job_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'upload_dir', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(settings, 'static_dir', str(tmp_path / 'static'))
+    app = FastAPI()
+    app.include_router(batch.router, prefix='/api/batch')
+    return TestClient(app)
+
+
+def _post_batch(client, students=4):
+    files = [('teacher', ('teacher.mp4', b'teacher', 'video/mp4'))]
+    files += [('students', (f's{index}.mp4', b'student', 'video/mp4')) for index in range(students)]
+    response = client.post('/api/batch', files=files)
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_stream(client, job_store, tmp_path, monkeypatch):
+    executor = StubExecutor()
+    monkeypatch.setattr(batch_service, 'job_executor', executor)
+
+    events = _post_batch(client)
+    assert [event['type'] for event in events] == ['batch_started'] + ['student_result'] * 4 + ['batch_summary']
+    batch_id = events[0]['batch_id']
+    assert events[0]['total'] == 4
+
+    # 第一名学生单独预热，完成后其余学生才开始；其余学生按完成先后推送
+    assert executor.calls[:2] == [('start', '000.mp4'), ('end', '000.mp4')]
+    assert [event['index'] for event in events[1:5]] == [0, 2, 3, 1]
+
+    failed = events[3]
+    assert failed['summary'] == {'success': False, 'error': "无法打开视频"}
+    assert job_store.get_status(failed['analysis_id'])['status'] == 'error'
+    assert events[1]['static_url'] == f"/static/{batch_id}-0"
+
+    summary = events[-1]
+    assert summary['statistics']['total_students'] == 4
+    assert summary['statistics']['succeeded'] == 3
+    assert summary['statistics']['step_coverage']['mean'] == pytest.approx(0.5)
+    assert job_store.get_status(batch_id)['status'] == 'completed'
+    assert job_store.get_result(batch_id)['statistics'] == summary['statistics']
+
+    # 批次上传的视频在分析结束后删除
+    assert os.listdir(tmp_path / 'uploads' / 'batches') == []
+
+
+def test_batch_error(client, job_store, tmp_path, monkeypatch):
+    async def failing_run_batch(batch_id, **kwargs):
+        job_store.create(batch_id)
+        raise RuntimeError("进程池已关闭")
+
+    monkeypatch.setattr(batch, 'run_batch', failing_run_batch)
+
+    events = _post_batch(client, students=2)
+    assert [event['type'] for event in events] == ['batch_started', 'batch_error']
+    assert events[1]['error'] == "进程池已关闭"
+    status = job_store.get_status(events[0]['batch_id'])
+    assert status['status'] == 'error'
+    assert os.listdir(tmp_path / 'uploads' / 'batches') == []
+
+
+def test_rejects_unsupported_files(client):
+    response = client.post('/api/batch', files=[
+        ('teacher', ('teacher.mp4', b'teacher', 'video/mp4')),
+        ('students', ('notes.txt', b'text', 'text/plain'))
+    ])
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""特征描述子库：整帧一次匹配的结果与逐模板的 feature_based_matching 一致"""
+
+import cv2
+import numpy as np
+import pytest
+
+from analysis_context import AnalysisContext
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+
+@pytest.fixture
+def analyzer(part_dir):
+    return MichelsonInterferometerAnalyzer(context=AnalysisContext(template_dir=str(part_dir)))
+
+
+def _shifted(scene, dx, dy):
+    """平移后的画面（模拟镜头移动）"""
+    matrix = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(scene, matrix, (scene.shape[1], scene.shape[0]), borderMode=cv2.BORDER_REFLECT)
+
+
+@pytest.mark.parametrize('shift', [(0, 0), (7, -5)])
+def test_matches_per_template_matching(analyzer, scene, shift):
+    target = _shifted(scene, *shift)
+    part_paths = analyzer.component_part_paths()
+    matches = analyzer.get_descriptor_bank(part_paths).match_frame(target)
+
+    assert len(matches) == len(part_paths)
+    for part_path in part_paths:
+        template = analyzer.template_store.get(part_path)['template']
+        expected = analyzer.feature_based_matching(target, template)
+        assert matches[part_path] == expected, part_path
+        assert expected is not None
+
+
+def test_bank_is_reused_until_templates_change(analyzer, part_dir):
+    part_paths = analyzer.component_part_paths()
+    bank = analyzer.get_descriptor_bank(part_paths)
+    assert analyzer.get_descriptor_bank(part_paths) is bank
+
+    cv2.imwrite(str(part_dir / 'part1.png'), cv2.imread(str(part_dir / 'part2.png')))
+    analyzer.template_store.clear()
+    assert analyzer.get_descriptor_bank(part_paths) is not bank
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""整帧设备检测：多线程并行检测部件与串行检测的结果一致"""
+
+import cv2
+import pytest
+
+from analysis_context import AnalysisContext
+from core.logging_config import analysis_id_var, bind_analysis_id
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+
+def _analyzer(part_dir, events=None, **kwargs):
+    def hook(event):
+        # 记录进度事件及其所在线程的日志上下文
+        if events is not None:
+            events.append((event, analysis_id_var.get()))
+
+    return MichelsonInterferometerAnalyzer(context=AnalysisContext(template_dir=str(part_dir)),
+                                           progress_hook=hook, **kwargs)
+
+
+@pytest.fixture
+def frame(scene):
+    """分析器接收的RGB帧"""
+    return cv2.cvtColor(scene, cv2.COLOR_BGR2RGB)
+
+
+@pytest.mark.parametrize('options', [{}, {'match_mode': 'pyramid', 'match_backend': 'fft'}])
+def test_parallel_matches_serial(part_dir, frame, options):
+    serial = _analyzer(part_dir, detection_workers=1, **options).detect_equipment_in_frame(frame)
+    parallel = _analyzer(part_dir, detection_workers=4, **options).detect_equipment_in_frame(frame)
+
+    # 按component_mapping的顺序返回，与串行结果完全相同
+    assert parallel == serial
+    assert [detection['name'] for detection in serial] == \
+        ['氦氖激光器', '分束器和补偿板', '动镜', '定镜', '精密测微头', '扩束器', '二合一观察屏']
+
+
+def test_parallel_progress_and_log_context(part_dir, frame):
+    events = []
+    analyzer = _analyzer(part_dir, events, detection_workers=4)
+    with bind_analysis_id('job-1'):
+        analyzer.detect_equipment_in_frame(frame)
+
+    # 每个部件一个进度事件，计数不重复不遗漏；工作线程保留调用方的analysis_id
+    assert sorted(event['current'] for event, _ in events) == list(range(1, 8))
+    assert {event['total'] for event, _ in events} == {7}
+    assert {analysis_id for _, analysis_id in events} == {'job-1'}
+    assert analyzer.progress['components_matched'] == 7
+
+
+def test_missing_part_files_are_skipped(part_dir, frame):
+    (part_dir / 'part7.png').unlink()
+    detections = _analyzer(part_dir, detection_workers=4).detect_equipment_in_frame(frame)
+    assert len(detections) == 6
+    assert '二合一观察屏' not in {detection['name'] for detection in detections}
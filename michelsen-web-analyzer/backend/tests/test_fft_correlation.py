@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FFT归一化互相关与 cv2.matchTemplate 的一致性"""
+
+import cv2
+import numpy as np
+import pytest
+
+from fft_correlation import FFT_SCORE_TOLERANCE, FFTCorrelator
+
+METHODS = (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED)
+
+
+@pytest.fixture
+def target():
+    """随机噪声图像，中间有一块纯色区域（窗口方差为0）"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    image[10:30, 10:30] = 77
+    return image
+
+
+def _flat_template(channels=3):
+    shape = (12, 12, channels) if channels > 1 else (12, 12)
+    return np.full(shape, 77, dtype=np.uint8)
+
+
+def _assert_matches_opencv(target, template):
+    results = FFTCorrelator(target).match(template, METHODS)
+    for method in METHODS:
+        expected = cv2.matchTemplate(target, template, method)
+        assert results[method].shape == expected.shape
+        assert np.abs(results[method] - expected).max() < FFT_SCORE_TOLERANCE, method
+
+
+def test_textured_template(target):
+    _assert_matches_opencv(target, target[35:50, 40:60].copy())
+
+
+@pytest.mark.parametrize('channels', [1, 3])
+def test_flat_template(target, channels):
+    image = target if channels == 3 else cv2.cvtColor(target, cv2.COLOR_RGB2GRAY)
+    template = _flat_template(channels)
+    _assert_matches_opencv(image, template)
+    # OpenCV 对纯色模板的 TM_CCOEFF_NORMED 返回全1
+    result = FFTCorrelator(image).match(template, [cv2.TM_CCOEFF_NORMED])[cv2.TM_CCOEFF_NORMED]
+    assert np.all(result == 1.0)
+
+
+def test_near_flat_template(target):
+    template = _flat_template()
+    template[4:7, 4:7] = 90
+    _assert_matches_opencv(target, template)
+
+
+def test_unsupported_method(target):
+    with pytest.raises(ValueError):
+        FFTCorrelator(target).match(_flat_template(), [cv2.TM_CCORR])
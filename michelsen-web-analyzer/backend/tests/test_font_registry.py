@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""标注字体仓库：按线程、按字号缓存字体，绘制结果与每次重新加载字体相同"""
+
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from font_registry import FontRegistry, font_registry
+
+
+@pytest.fixture
+def registry():
+    if font_registry.font_path is None:
+        pytest.skip("没有可用的字体文件")
+    return FontRegistry([font_registry.font_path], max_fonts=2)
+
+
+def test_fonts_are_cached_per_size(registry):
+    font = registry.get(24)
+    assert registry.get(24) is font
+    assert registry.get(16) is not font
+
+    # 超出max_fonts时淘汰最久未使用的字号
+    registry.get(24)
+    registry.get(32)
+    assert registry.get(24) is font
+    assert registry.get(16) is not None
+    assert len(registry._thread_fonts()) == 2
+
+
+def test_fonts_are_not_shared_between_threads(registry):
+    fonts = []
+    thread = threading.Thread(target=lambda: fonts.append(registry.get(24)))
+    thread.start()
+    thread.join()
+    assert fonts[0] is not registry.get(24)
+
+
+def test_clear(registry):
+    font = registry.get(24)
+    registry.clear()
+    assert registry.get(24) is not font
+
+
+def test_falls_back_to_default_font(tmp_path):
+    registry = FontRegistry([str(tmp_path / 'missing.ttc')])
+    assert registry.font_path is None
+    assert registry.get(24) is not None
+
+
+def test_draw_matches_freshly_loaded_font():
+    if font_registry.font_path is None:
+        pytest.skip("没有可用的字体文件")
+    frame = np.full((60, 200, 3), 255, dtype=np.uint8)
+    drawn = MichelsonInterferometerAnalyzer().draw_chinese_text(frame, "动镜 0.87", (5, 10), 20, (255, 0, 0))
+
+    expected = Image.fromarray(frame)
+    ImageDraw.Draw(expected).text((5, 10), "动镜 0.87", font=ImageFont.truetype(font_registry.font_path, 20),
+                                  fill=(255, 0, 0))
+    assert np.array_equal(drawn, np.array(expected))
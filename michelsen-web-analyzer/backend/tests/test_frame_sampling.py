@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""顺序采样关键帧：grab跳帧/seek两条路径与逐时间戳seek（extract_frame_at_timestamp）结果一致"""
+
+import cv2
+import numpy as np
+import pytest
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+FPS = 5.0
+FRAME_COUNT = 60
+
+
+@pytest.fixture
+def video(write_video):
+    """每帧亮度不同的12秒视频，帧内容可区分"""
+    frames = [np.full((48, 64, 3), index * 4, dtype=np.uint8) for index in range(FRAME_COUNT)]
+    return write_video(frames, fps=FPS)
+
+
+@pytest.fixture
+def analyzer():
+    return MichelsonInterferometerAnalyzer()
+
+
+def _sample(analyzer, video, timestamps, max_grab_gap):
+    cap = cv2.VideoCapture(video)
+    try:
+        return list(analyzer.iter_frames_at_timestamps(cap, timestamps, FPS, max_grab_gap=max_grab_gap))
+    finally:
+        cap.release()
+
+
+# max_grab_gap: 0为每个目标帧都seek，很大时只grab跳帧，None为默认的混合策略
+@pytest.mark.parametrize('max_grab_gap', [0, 10 ** 6, None])
+def test_matches_per_timestamp_seek(analyzer, video, max_grab_gap):
+    timestamps = [8, 0, 1, 3, 3, 11]
+    samples = _sample(analyzer, video, timestamps, max_grab_gap)
+
+    # 按时间戳升序输出，同一帧的重复时间戳都会返回
+    assert [t for t, _ in samples] == sorted(timestamps)
+    for t, frame in samples:
+        expected = analyzer.extract_frame_at_timestamp(video, t)
+        assert np.array_equal(frame, expected), t
+
+
+def test_timestamps_beyond_end_are_skipped(analyzer, video):
+    samples = _sample(analyzer, video, [2, 30, 11], None)
+    assert [t for t, _ in samples] == [2, 11]
+
+
+def test_key_frames(analyzer, video):
+    key_frames = analyzer.extract_key_frames(video, interval=2)
+    assert [frame['timestamp'] for frame in key_frames] == [0, 2, 4, 6, 8, 10]
+    assert analyzer.count_key_frames(video, interval=2) == len(key_frames)
+    for frame in key_frames:
+        assert frame['frame_number'] == int(frame['timestamp'] * FPS)
+        assert np.array_equal(frame['frame'], analyzer.extract_frame_at_timestamp(video, frame['timestamp']))
+
+
+def test_analyze_video_steps_decodes_step_frames(analyzer, video):
+    points = analyzer.analyze_video_steps(video, 'student', interval=3)
+    # 学生视频每3秒一个时间点，另加结尾前5秒；单次顺序解码按时间升序返回
+    assert [point['timestamp'] for point in points] == [0, 3, 6, 7, 9]
+    for point in points:
+        assert np.array_equal(point['frame'], analyzer.extract_frame_at_timestamp(video, point['timestamp']))
+    assert analyzer.count_step_frames(video, 'student', interval=3) == len(points)
+
+
+def test_key_frames_are_streamed(analyzer, video):
+    frames = analyzer.iter_key_frames(video, interval=2)
+    assert next(frames)['timestamp'] == 0
+    frames.close()
+
+
+def test_point_frames_are_decoded_on_demand(analyzer, video):
+    """keep_frames=False 时分析点不保留图像，截图前按时间戳重新解码出同样的帧"""
+    kept = analyzer.analyze_video_steps(video, 'student', interval=3)
+    points = analyzer.analyze_video_steps(video, 'student', interval=3, keep_frames=False)
+    assert all(point['frame'] is None for point in points)
+
+    inline = {'timestamp': 100, 'frame': kept[0]['frame']}
+    lost = {'timestamp': 1, 'frame': None}
+    decoded = list(analyzer.iter_point_frames(points[::-1] + [inline, lost]))
+
+    # 已有帧和无法解码的分析点在前，需重新解码的按时间戳升序在后
+    assert decoded[0][0] is inline and decoded[0][1] is inline['frame']
+    assert decoded[1] == (lost, None)
+    assert [point['timestamp'] for point, _ in decoded[2:]] == [point['timestamp'] for point in kept]
+    for (point, frame), expected in zip(decoded[2:], kept):
+        assert np.array_equal(frame, expected['frame'])
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""任务存储：旧版本数据库迁移、过期清理和中断任务的回收"""
+
+import sqlite3
+import time
+
+from services.job_store import STALE_JOB_ERROR, JobStore
+
+# 增加ETA和结构化进度之前的jobs表
+LEGACY_SCHEMA = """
+CREATE TABLE jobs (
+    analysis_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    current_step TEXT,
+    include_device_detection INTEGER NOT NULL DEFAULT 1,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _legacy_database(path):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(LEGACY_SCHEMA)
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs (analysis_id, status, progress, current_step, created_at, updated_at) "
+            "VALUES ('old-job', 'running', 40, '检测设备...', ?, ?)",
+            (now, now)
+        )
+    conn.close()
+
+
+def test_migrates_legacy_database(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    _legacy_database(db_path)
+
+    store = JobStore(db_path)
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    conn.close()
+    assert {'eta_seconds', 'progress_details'} <= columns
+
+    # 迁移前的任务保持可读，新列为空
+    status = store.get_status('old-job')
+    assert status['progress'] == 40
+    assert status['current_step'] == '检测设备...'
+    assert status['eta_seconds'] is None
+    assert status['progress_details'] is None
+
+    store.update_progress('old-job', 55, 12.5, {'frames_planned': 8, 'frames_decoded': 4})
+    status = store.get_status('old-job')
+    assert (status['progress'], status['eta_seconds']) == (55, 12.5)
+    assert status['progress_details'] == {'frames_planned': 8, 'frames_decoded': 4}
+
+    # 再次打开已迁移的数据库不重复添加列
+    JobStore(db_path)
+
+
+def test_progress_only_updates_running_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    store.create('job')
+    store.set_result('job', {'ok': True})
+    store.update_progress('job', 10, 99.0, {})
+    status = store.get_status('job')
+    assert (status['status'], status['progress'], status['eta_seconds']) == ('completed', 100, 0)
+
+
+def test_evict_expired_removes_published_files(tmp_path):
+    static_dir = tmp_path / 'static'
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), ttl_seconds=60, static_dir=str(static_dir))
+    for analysis_id in ('expired', 'fresh'):
+        store.create(analysis_id)
+        (static_dir / analysis_id / 'screenshots').mkdir(parents=True)
+        (static_dir / analysis_id / 'screenshots' / 'student.png').write_bytes(b'png')
+
+    conn = sqlite3.connect(store.db_path)
+    with conn:
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE analysis_id = 'expired'", (time.time() - 3600,))
+    conn.close()
+
+    assert store.evict_expired() == 1
+    assert store.list_ids() == ['fresh']
+    assert not (static_dir / 'expired').exists()
+    assert (static_dir / 'fresh' / 'screenshots' / 'student.png').exists()
+
+
+def _set_updated_at(store, analysis_id, updated_at):
+    conn = sqlite3.connect(store.db_path)
+    with conn:
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE analysis_id = ?", (updated_at, analysis_id))
+    conn.close()
+
+
+def _updated_at(store, analysis_id):
+    conn = sqlite3.connect(store.db_path)
+    (updated_at,) = conn.execute("SELECT updated_at FROM jobs WHERE analysis_id = ?", (analysis_id,)).fetchone()
+    conn.close()
+    return updated_at
+
+
+def test_fail_stale_marks_orphaned_running_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    for analysis_id in ('orphaned', 'other-orphaned', 'active', 'finished'):
+        store.create(analysis_id)
+    store.set_result('finished', {'ok': True})
+    for analysis_id in ('orphaned', 'other-orphaned', 'finished'):
+        _set_updated_at(store, analysis_id, time.time() - 600)
+
+    # 只检查指定任务
+    assert store.fail_stale(120, 'orphaned') == 1
+    assert store.get_status('other-orphaned')['status'] == 'running'
+
+    assert store.fail_stale(120) == 1
+    for analysis_id in ('orphaned', 'other-orphaned'):
+        status = store.get_status(analysis_id)
+        assert (status['status'], status['error']) == ('error', STALE_JOB_ERROR)
+    assert store.get_status('active')['status'] == 'running'
+    assert store.get_status('finished')['status'] == 'completed'
+
+
+def test_tracked_jobs_keep_heartbeat(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), heartbeat_seconds=0.05)
+    store.create('job')
+    _set_updated_at(store, 'job', time.time() - 600)
+
+    with store.track('job'):
+        deadline = time.time() + 5
+        while _updated_at(store, 'job') < time.time() - 60 and time.time() < deadline:
+            time.sleep(0.05)
+        assert store.fail_stale(120) == 0
+    assert store.get_status('job')['status'] == 'running'
+
+    # 执行结束后不再刷新（退出前已取到任务列表的那一轮心跳可能还会刷新一次）
+    deadline = time.time() + 5
+    while True:
+        _set_updated_at(store, 'job', time.time() - 600)
+        time.sleep(0.1)
+        if store.fail_stale(120) == 1 or time.time() > deadline:
+            break
+    assert store.get_status('job')['status'] == 'error'
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""日志配置：analysis_id上下文、JSON格式、按模块的日志级别和子进程初始化"""
+
+import contextvars
+import io
+import json
+import logging
+import pickle
+import threading
+
+import pytest
+
+from core.logging_config import (
+    AnalysisIdFilter,
+    JsonFormatter,
+    analysis_id_var,
+    bind_analysis_id,
+    configure_logging,
+    worker_logging_initializer,
+)
+
+
+@pytest.fixture
+def json_logger():
+    """输出到内存的JSON日志记录器，返回 (logger, 读取已输出记录的函数)"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.addFilter(AnalysisIdFilter())
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger('tests.logging_config')
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    yield logger, lambda: [json.loads(line) for line in stream.getvalue().splitlines()]
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def root_logging():
+    """还原根日志记录器和被修改的模块级别"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    module_level = logging.getLogger('analyzer').level
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    logging.getLogger('analyzer').setLevel(module_level)
+
+
+def test_json_records_carry_analysis_id(json_logger):
+    logger, records = json_logger
+    logger.info("未绑定")
+    with bind_analysis_id('job-1'):
+        logger.warning("第 %d 帧解码失败", 3, extra={'frame': 3})
+
+        # 复制了context的线程中保持analysis_id
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(logger.info, "线程中"))
+        thread.start()
+        thread.join()
+
+    first, second, third = records()
+    assert first['analysis_id'] == '-'
+    assert (second['analysis_id'], second['level'], second['message']) == ('job-1', 'WARNING', "第 3 帧解码失败")
+    assert second['frame'] == 3
+    assert third['analysis_id'] == 'job-1'
+    assert analysis_id_var.get() == '-'
+
+
+def test_configure_logging_replaces_its_handler(root_logging):
+    configure_logging('warning', {'analyzer': 'debug'}, 'json')
+    configure_logging('error', {'analyzer': 'info'}, 'text')
+
+    handlers = [handler for handler in root_logging.handlers if getattr(handler, '_analysis_logging', False)]
+    assert len(handlers) == 1
+    assert not isinstance(handlers[0].formatter, JsonFormatter)
+    assert root_logging.level == logging.ERROR
+    assert logging.getLogger('analyzer.experiment_analyzer_prototype').getEffectiveLevel() == logging.INFO
+
+
+def test_worker_initializer_binds_process(root_logging):
+    initializer = pickle.loads(pickle.dumps(worker_logging_initializer('job-2')))
+    context = contextvars.copy_context()
+    context.run(initializer)
+    assert context[analysis_id_var] == 'job-2'
+    assert analysis_id_var.get() == '-'
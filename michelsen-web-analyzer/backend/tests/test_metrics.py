@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""耗时直方图：跨进程快照合并、Prometheus导出和 /metrics 接口"""
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from instrumentation import SpanRecorder, timed
+from services.metrics import METRIC_PREFIX, MetricsRegistry
+
+MS = 1_000_000
+
+
+class Stage:
+    def __init__(self):
+        self.timings = SpanRecorder()
+
+    @timed('stage')
+    def run(self, value):
+        return value * 2
+
+
+def test_merged_snapshots_match_single_recorder():
+    """流水线各子进程的快照合并后，与在一个记录器中观察全部耗时相同"""
+    durations = [0, 3 * MS, 40 * MS, 700 * MS, 90_000 * MS]
+    single = SpanRecorder()
+    parts = [SpanRecorder(), SpanRecorder()]
+    for index, duration in enumerate(durations):
+        single.observe('detect', duration)
+        parts[index % 2].observe('detect', duration)
+
+    merged = SpanRecorder()
+    for part in parts:
+        merged.merge(part.snapshot())
+    merged.merge(None)
+    assert merged.snapshot() == single.snapshot()
+
+    span = single.snapshot()['detect']
+    assert (span['count'], span['sum_ns'], span['min_ns'], span['max_ns']) == (5, sum(durations), 0, 90_000 * MS)
+    # 各桶不累计；90秒超出最大上界，计入 +Inf 桶
+    assert sum(span['buckets']) == 5 and span['buckets'][-1] == 1
+
+
+def test_timed_decorator():
+    stage = Stage()
+    assert stage.run(21) == 42
+    assert stage.timings.summary()['stage']['count'] == 1
+
+
+def _metric_lines(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    recorder = SpanRecorder()
+    recorder.observe('decode_frame', 2 * MS)
+    recorder.observe('decode_frame', 30 * MS)
+    registry.observe_result({'success': True, 'timings': recorder.snapshot()})
+    registry.observe_result({'success': False, 'error': '无法打开视频'})
+    registry.observe_result(None)
+
+    text = registry.render()
+    assert f'# TYPE {METRIC_PREFIX}_span_duration_seconds histogram' in text
+    metrics = _metric_lines(text)
+    assert metrics[f'{METRIC_PREFIX}_jobs_total{{status="success"}}'] == '1'
+    assert metrics[f'{METRIC_PREFIX}_jobs_total{{status="error"}}'] == '1'
+
+    # 桶计数为累计值
+    bucket = f'{METRIC_PREFIX}_span_duration_seconds_bucket{{span="decode_frame",le="%s"}}'
+    assert metrics[bucket % '0.001'] == '0'
+    assert metrics[bucket % '0.005'] == '1'
+    assert metrics[bucket % '0.025'] == '1'
+    assert metrics[bucket % '0.05'] == '2'
+    assert metrics[bucket % '+Inf'] == '2'
+    assert metrics[f'{METRIC_PREFIX}_span_duration_seconds_count{{span="decode_frame"}}'] == '2'
+    assert float(metrics[f'{METRIC_PREFIX}_span_duration_seconds_sum{{span="decode_frame"}}']) == 0.032
+
+
+def test_metrics_endpoint(tmp_path, monkeypatch):
+    pytest.importorskip('uvicorn')
+    # main在导入时于当前目录下创建 uploads/ 和 static/
+    monkeypatch.chdir(tmp_path)
+    main = importlib.import_module('main')
+    registry = MetricsRegistry()
+    registry.observe_result({'success': True, 'timings': {}})
+    monkeypatch.setattr(main, 'metrics_registry', registry)
+
+    response = TestClient(main.app).get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert response.text == registry.render()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分析进度SSE接口：结束状态、空闲心跳、中断任务和未知任务"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routers import analysis
+from core.config import settings
+from services.job_store import STALE_JOB_ERROR
+
+
+@pytest.fixture
+def client(job_store, monkeypatch):
+    monkeypatch.setattr(settings, 'progress_stream_poll_seconds', 0.05)
+    app = FastAPI()
+    app.include_router(analysis.router, prefix='/api/analysis')
+    return TestClient(app)
+
+
+def _parse_events(lines):
+    """把SSE行解析为 [(event, data)]，注释行记为 (':', 注释内容)"""
+    events, event = [], None
+    for line in lines:
+        if line.startswith(':'):
+            events.append((':', line[1:].strip()))
+        elif line.startswith('event: '):
+            event = line[len('event: '):]
+        elif line.startswith('data: '):
+            events.append((event, json.loads(line[len('data: '):])))
+    return events
+
+
+def test_finished_job_sends_final_status(client, job_store):
+    job_store.create('job')
+    job_store.set_result('job', {'ok': True})
+
+    response = client.get('/api/analysis/progress/job/stream')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = _parse_events(response.text.splitlines())
+    assert len(events) == 1
+    event, data = events[0]
+    assert (event, data['status'], data['progress']) == ('status', 'completed', 100)
+
+
+def test_idle_stream_sends_keepalive_until_job_finishes(client, job_store):
+    job_store.create('job')
+    # 任务由“其他进程”完成，事件不会到达本进程：空闲期间发送心跳，回查到状态变化后推送最终状态并结束
+    finisher = threading.Timer(0.3, job_store.set_result, args=('job', {'ok': True}))
+    finisher.start()
+    try:
+        events = _parse_events(client.get('/api/analysis/progress/job/stream').text.splitlines())
+    finally:
+        finisher.cancel()
+
+    assert events[0][0] == 'status' and events[0][1]['status'] == 'running'
+    assert (':', 'keepalive') in events
+    assert events[-1][0] == 'status' and events[-1][1]['status'] == 'completed'
+
+
+def test_orphaned_job_ends_stream_with_error(client, job_store):
+    job_store.create('job')
+    conn = sqlite3.connect(job_store.db_path)
+    with conn:
+        conn.execute("UPDATE jobs SET updated_at = ?", (time.time() - settings.job_stale_seconds - 60,))
+    conn.close()
+
+    events = _parse_events(client.get('/api/analysis/progress/job/stream').text.splitlines())
+    assert events[0][1]['status'] == 'running'
+    assert events[-1][0] == 'status'
+    assert (events[-1][1]['status'], events[-1][1]['error']) == ('error', STALE_JOB_ERROR)
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get('/api/analysis/progress/missing/stream').status_code == 404
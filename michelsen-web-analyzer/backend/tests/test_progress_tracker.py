@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""进度统计：完成百分比与预计剩余时间"""
+
+import pytest
+
+from services.progress_tracker import ProgressTracker
+
+
+def _event(stage, time, **counters):
+    details = {
+        'frames_planned': 0, 'frames_decoded': 0,
+        'components_planned': 0, 'components_matched': 0,
+        'screenshots_planned': 0, 'screenshots_written': 0
+    }
+    details.update(counters)
+    return {'stage': stage, 'time': time, 'counters': details}
+
+
+def test_events_without_counters_are_ignored():
+    assert ProgressTracker().update({'stage': 'key_frames', 'time': 0}) is None
+
+
+def test_first_event_estimates_by_count():
+    estimate = ProgressTracker().update(_event('plan', 0, frames_planned=10))
+    assert estimate == {'progress': 0, 'eta_seconds': None, 'frames_per_second': None}
+
+
+def test_eta_from_measured_frame_time():
+    tracker = ProgressTracker()
+    tracker.update(_event('plan', 100, frames_planned=10))
+    # 每帧2秒
+    for done in range(1, 5):
+        estimate = tracker.update(_event('key_frames', 100 + 2 * done, frames_planned=10, frames_decoded=done))
+    assert estimate['eta_seconds'] == pytest.approx(12.0)
+    assert estimate['frames_per_second'] == pytest.approx(0.5)
+    assert estimate['progress'] == 40
+
+
+def test_unstarted_units_use_frame_time():
+    tracker = ProgressTracker()
+    tracker.update(_event('plan', 0, frames_planned=4, screenshots_planned=4))
+    for done in range(1, 5):
+        estimate = tracker.update(_event('key_frames', done, frames_planned=4, frames_decoded=done,
+                                         screenshots_planned=4))
+    # 帧已完成，截图尚未开始：按每帧1秒估算
+    assert estimate['eta_seconds'] == pytest.approx(4.0)
+    assert estimate['progress'] == 50
+
+
+def test_progress_never_decreases_and_stays_below_100():
+    tracker = ProgressTracker()
+    tracker.update(_event('plan', 0, frames_planned=2, screenshots_planned=2))
+    first = tracker.update(_event('key_frames', 1, frames_planned=2, frames_decoded=1, screenshots_planned=2))
+    second = tracker.update(_event('key_frames', 2, frames_planned=2, frames_decoded=2, screenshots_planned=2))
+    # 截图比帧慢得多：ETA上调，百分比保持不降
+    third = tracker.update(_event('screenshots', 12, frames_planned=2, frames_decoded=2,
+                                  screenshots_planned=2, screenshots_written=1))
+    assert third['eta_seconds'] == pytest.approx(10.0)
+    assert first['progress'] <= second['progress'] <= third['progress']
+    last = tracker.update(_event('screenshots', 22, frames_planned=2, frames_decoded=2,
+                                 screenshots_planned=2, screenshots_written=2))
+    assert last['eta_seconds'] == 0
+    assert last['progress'] == 99
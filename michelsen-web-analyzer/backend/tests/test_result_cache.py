@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分析结果缓存：按最近使用时间淘汰"""
+
+import os
+
+import pytest
+
+from services.result_cache import ResultCache
+
+OUTPUT_BYTES = 4000
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    path = tmp_path / 'output'
+    (path / 'screenshots').mkdir(parents=True)
+    (path / 'screenshots' / 'student.png').write_bytes(b'\0' * OUTPUT_BYTES)
+    return str(path)
+
+
+def _put(cache, key, output_dir, age):
+    cache.put(key, {'key': key}, output_dir)
+    # 用修改时间区分使用先后（age越大越久未使用）
+    entry_dir = os.path.join(cache.cache_dir, key)
+    timestamp = os.path.getmtime(entry_dir) - age
+    os.utime(entry_dir, (timestamp, timestamp))
+
+
+def test_hit_copies_output_files(tmp_path, output_dir):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=OUTPUT_BYTES * 10)
+    _put(cache, 'a', output_dir, age=0)
+
+    restored = tmp_path / 'restored'
+    assert cache.get('a', str(restored)) == {'key': 'a'}
+    assert (restored / 'screenshots' / 'student.png').stat().st_size == OUTPUT_BYTES
+    assert cache.get('missing', str(restored)) is None
+
+
+def test_evicts_least_recently_used(tmp_path, output_dir):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=OUTPUT_BYTES * 10)
+    _put(cache, 'old', output_dir, age=300)
+    _put(cache, 'used', output_dir, age=200)
+
+    # 命中刷新最近使用时间
+    assert cache.get('used', str(tmp_path / 'restored')) is not None
+
+    cache.max_bytes = OUTPUT_BYTES * 2.5
+    _put(cache, 'new', output_dir, age=0)
+    assert sorted(os.listdir(cache.cache_dir)) == ['new', 'used']
+
+
+def test_evict_until_under_limit(tmp_path, output_dir):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=OUTPUT_BYTES * 10)
+    for age, key in enumerate(['c', 'b', 'a']):
+        _put(cache, key, output_dir, age=age * 100)
+
+    cache.max_bytes = OUTPUT_BYTES * 1.5
+    assert cache.evict() == 2
+    assert os.listdir(cache.cache_dir) == ['c']
+    cache.max_bytes = 0
+    assert cache.evict() == 1
+    assert os.listdir(cache.cache_dir) == []
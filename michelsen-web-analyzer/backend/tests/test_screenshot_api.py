@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""截图接口：按显示宽度选用缩小版本，带修订号的请求允许长期缓存"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routers import analysis
+from core.config import settings
+from screenshot_writer import ScreenshotWriter
+
+
+@pytest.fixture
+def client(job_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'static_dir', str(tmp_path / 'static'))
+    monkeypatch.setattr(settings, 'screenshot_derivative_widths', [320, 800])
+    app = FastAPI()
+    app.include_router(analysis.router, prefix='/api/analysis')
+    return TestClient(app)
+
+
+@pytest.fixture
+def revision(job_store, tmp_path):
+    """任务 job 发布的 1000 像素宽截图及其 320/800 缩小版本，返回修订号"""
+    job_store.create('job')
+    screenshots = tmp_path / 'static' / 'job' / 'screenshots'
+    screenshots.mkdir(parents=True)
+    frame = np.random.default_rng(3).integers(0, 256, (500, 1000, 3), dtype=np.uint8)
+    writer = ScreenshotWriter(derivative_widths=settings.screenshot_derivative_widths)
+    revision = writer.submit(frame, str(screenshots / 'step_1.png')).result()
+    writer.flush()
+    return revision
+
+
+@pytest.mark.parametrize('size, filename', [
+    ('original', 'step_1.png'),
+    ('200', 'step_1_w320.png'),
+    ('320', 'step_1_w320.png'),
+    ('640', 'step_1_w800.png'),
+    ('1600', 'step_1.png'),
+])
+def test_size_selects_derivative(client, revision, tmp_path, size, filename):
+    response = client.get('/api/analysis/screenshots/job/step_1.png', params={'size': size})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'image/png'
+    assert response.content == (tmp_path / 'static' / 'job' / 'screenshots' / filename).read_bytes()
+
+
+def test_revision_controls_caching(client, revision):
+    url = '/api/analysis/screenshots/job/step_1.png'
+    cached = client.get(url, params={'size': '320', 'v': revision})
+    assert cached.headers['cache-control'].endswith('immutable')
+    assert client.get(url, params={'v': 'stale'}).headers['cache-control'] == 'no-cache'
+    assert client.get(url).headers['cache-control'] == 'no-cache'
+
+
+def test_invalid_requests(client, revision):
+    assert client.get('/api/analysis/screenshots/job/step_1.png', params={'size': 'large'}).status_code == 400
+    assert client.get('/api/analysis/screenshots/job/missing.png').status_code == 404
+    assert client.get('/api/analysis/screenshots/other/step_1.png').status_code == 404
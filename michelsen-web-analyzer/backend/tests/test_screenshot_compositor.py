@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分析截图合成：标题栏、时间戳和检测说明的版式，以及 save_analysis_screenshots 的输出"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from analysis_context import AnalysisContext
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from screenshot_compositor import BADGE_COLORS, ScreenshotCompositor
+
+WIDTH, HEIGHT = 640, 360
+
+
+@pytest.fixture
+def frame():
+    return np.full((HEIGHT, WIDTH, 3), 40, dtype=np.uint8)
+
+
+def _banner_height(composed):
+    return composed.shape[0] - HEIGHT
+
+
+def test_frame_below_title_banner(frame):
+    compositor = ScreenshotCompositor()
+    composed = compositor.compose(frame, "正确示例 1: 步骤正确")
+    banner = _banner_height(composed)
+
+    assert composed.shape == (HEIGHT + banner, WIDTH, 3)
+    # 标题栏为白底黑字，帧原样放在标题栏下方
+    assert np.array_equal(composed[banner:], frame)
+    assert (composed[:banner] == 255).mean() > 0.9
+    assert (composed[:banner] < 128).any()
+
+    # 多行标题的标题栏更高
+    two_lines = compositor.compose(frame, "问题截图 1: 步骤缺失\n未检测到扩束器")
+    assert _banner_height(two_lines) > banner
+
+
+def test_badge_and_caption(frame):
+    compositor = ScreenshotCompositor()
+    composed = compositor.compose(frame, "问题截图", badge="时间: 30s", badge_color='yellow',
+                                  caption="检测到设备: 动镜, 定镜")
+    banner = _banner_height(composed)
+    image = composed[banner:]
+    margin_x, margin_y = int(WIDTH * 0.02), int(HEIGHT * 0.02)
+
+    def expected_fill(color):
+        # 80%不透明的底色混合在帧上
+        return np.rint(40 + (np.asarray(color) - 40) * compositor.box_alpha).astype(np.uint8)
+
+    # 时间戳标签在帧左上角、检测说明在帧左下角，距边缘2%，底色内侧为混合后的颜色
+    pad = max(4, compositor.font_size(compositor.badge_points, WIDTH) // 3)
+    assert np.array_equal(image[margin_y + pad // 2, margin_x + pad // 2], expected_fill(BADGE_COLORS['yellow']))
+    pad = max(4, compositor.font_size(compositor.caption_points, WIDTH) // 3)
+    assert np.array_equal(image[HEIGHT - margin_y - pad // 2, margin_x + pad // 2],
+                          expected_fill(BADGE_COLORS['lightblue']))
+    # 标签以外的区域保持原帧
+    assert np.array_equal(image[HEIGHT // 2:HEIGHT // 2 + 10, WIDTH // 2:], frame[:10, WIDTH // 2:])
+
+
+def test_font_size_scales_with_frame_width():
+    # 与原matplotlib版式一致：15英寸宽的图上14磅标题
+    assert ScreenshotCompositor.font_size(14, 15 * 72) == 14
+    assert ScreenshotCompositor.font_size(14, 1920) == 25
+    assert ScreenshotCompositor.font_size(10, 320) == 10
+
+
+def test_save_analysis_screenshots(tmp_path, frame):
+    analyzer = MichelsonInterferometerAnalyzer(context=AnalysisContext(output_dir=str(tmp_path)))
+    detections = [{'name': '动镜', 'bbox': (100, 100, 200, 180), 'confidence': 0.8}]
+    comparison_results = {
+        'issues_found': [
+            {'timestamp': 30, 'frame': frame, 'issue_type': '步骤缺失', 'issue_description': '未检测到扩束器',
+             'detected_equipment': detections},
+            {'timestamp': 45, 'frame': None, 'issue_type': '步骤缺失', 'issue_description': '帧不可用'},
+        ],
+        'comparison_details': [
+            {'timestamp': t, 'frame': frame, 'is_correct': True, 'issue_description': '步骤正确'} for t in range(4)
+        ]
+    }
+    analyzer.save_analysis_screenshots(comparison_results, 'shots')
+
+    output_dir = tmp_path / 'shots'
+    assert sorted(os.listdir(output_dir)) == ['correct_01_t0s.png', 'correct_02_t1s.png', 'correct_03_t2s.png',
+                                              'issue_01_t30s.png']
+    issue = cv2.cvtColor(cv2.imread(str(output_dir / 'issue_01_t30s.png')), cv2.COLOR_BGR2RGB)
+    expected = analyzer.screenshot_compositor.compose(
+        analyzer.draw_detections_on_frame(frame, detections), "问题截图 1: 步骤缺失\n未检测到扩束器",
+        badge="时间: 30s", badge_color='yellow', caption="检测到设备: 动镜"
+    )
+    assert np.array_equal(issue, expected)
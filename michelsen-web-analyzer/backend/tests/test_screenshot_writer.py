@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""异步截图写入：与同步 cv2.imwrite 的输出一致，返回内容修订号，积压时阻塞提交"""
+
+import hashlib
+
+import cv2
+import numpy as np
+import pytest
+
+from screenshot_writer import ScreenshotWriter
+
+
+@pytest.fixture
+def frame():
+    """RGB帧"""
+    rng = np.random.default_rng(2)
+    return cv2.GaussianBlur(rng.integers(0, 256, (240, 400, 3), dtype=np.uint8), (7, 7), 0)
+
+
+def _revision(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+@pytest.mark.parametrize('image_format, params', [
+    ('png', [cv2.IMWRITE_PNG_COMPRESSION, 3]),
+    ('jpeg', [cv2.IMWRITE_JPEG_QUALITY, 90]),
+    ('webp', [cv2.IMWRITE_WEBP_QUALITY, 90]),
+])
+def test_matches_synchronous_write(tmp_path, frame, image_format, params):
+    writer = ScreenshotWriter(image_format=image_format)
+    path = tmp_path / writer.filename('step_1')
+    revision = writer.submit(frame, str(path)).result()
+    writer.flush()
+
+    # 原实现：分析线程中直接转换为BGR，按同样的编码参数写盘
+    expected_path = tmp_path / f'expected{writer.extension}'
+    cv2.imwrite(str(expected_path), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), params)
+    assert path.read_bytes() == expected_path.read_bytes()
+    assert revision == _revision(path)
+
+
+def test_revision_follows_content(tmp_path, frame):
+    writer = ScreenshotWriter()
+    first = writer.submit(frame, str(tmp_path / 'a.png')).result()
+    same = writer.submit(frame.copy(), str(tmp_path / 'b.png')).result()
+    changed = writer.submit(frame[::-1].copy(), str(tmp_path / 'c.png')).result()
+    writer.flush()
+    assert first == same != changed
+
+
+def test_backpressure(tmp_path, frame):
+    writer = ScreenshotWriter(workers=1, max_pending=1)
+    futures = [writer.submit(frame, str(tmp_path / f'{index}.png')) for index in range(5)]
+    writer.flush()
+    assert all(future.result() is not None for future in futures)
+    timings = writer.timings.snapshot()
+    assert timings['write_screenshot']['count'] == 5
+    assert timings['screenshot_backpressure']['count'] == 5
+
+    # flush后可继续提交
+    assert writer.submit(frame, str(tmp_path / 'again.png')).result() is not None
+    writer.flush()
+
+
+def test_grayscale_frame(tmp_path, frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    writer = ScreenshotWriter()
+    writer.submit(gray, str(tmp_path / 'gray.png')).result()
+    writer.flush()
+    assert np.array_equal(cv2.imread(str(tmp_path / 'gray.png'), cv2.IMREAD_UNCHANGED), gray)
+
+
+def test_write_failure_returns_none(tmp_path, frame):
+    writer = ScreenshotWriter()
+    assert writer.submit(frame, str(tmp_path / 'missing' / 'step.png')).result() is None
+    writer.flush()
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        ScreenshotWriter(image_format='gif')
+
+
+def test_derivative_widths(tmp_path, frame):
+    writer = ScreenshotWriter(derivative_widths=[800, 100, 320, 0, 320])
+    assert writer.derivative_widths == [100, 320, 800]
+    # 不小于帧宽的版本不生成
+    assert writer.derivative_widths_for(400) == [100, 320]
+
+    path = tmp_path / 'step_1.png'
+    revision = writer.submit(frame, str(path)).result()
+    writer.flush()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['step_1.png', 'step_1_w100.png', 'step_1_w320.png']
+    # 修订号只取决于原图
+    assert revision == _revision(path)
+    original = cv2.imread(str(path))
+    for width in (100, 320):
+        derivative = cv2.imread(str(tmp_path / writer.derivative_filename('step_1.png', width)))
+        height = round(240 * width / 400)
+        assert derivative.shape == (height, width, 3)
+        # 逐级缩小与从原图直接缩小的结果基本一致
+        direct = cv2.resize(original, (width, height), interpolation=cv2.INTER_AREA)
+        assert np.abs(derivative.astype(int) - direct).mean() < 2
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""老师视频分析缓存：按最近使用时间淘汰"""
+
+import os
+
+import pytest
+
+from services.teacher_cache import TeacherAnalysisCache
+
+SCREENSHOT_BYTES = 4000
+
+
+@pytest.fixture
+def screenshots_dir(tmp_path):
+    path = tmp_path / 'screenshots'
+    path.mkdir()
+    (path / 'teacher.png').write_bytes(b'\0' * SCREENSHOT_BYTES)
+    return str(path)
+
+
+def _put(cache, key, screenshots_dir, age):
+    points = [{'timestamp': 0, 'time_str': '00:00', 'frame_number': 0, 'current_step': 1, 'video_type': 'teacher'}]
+    explanations = {'teacher.png': {'type': '老师示范'}}
+    cache.put(key, points, explanations, screenshots_dir)
+    # 用修改时间区分使用先后（age越大越久未使用）
+    entry_dir = os.path.join(cache.cache_dir, key)
+    timestamp = os.path.getmtime(entry_dir) - age
+    os.utime(entry_dir, (timestamp, timestamp))
+
+
+def test_evicts_least_recently_used(tmp_path, screenshots_dir):
+    cache = TeacherAnalysisCache(str(tmp_path / 'cache'), max_bytes=SCREENSHOT_BYTES * 10)
+    _put(cache, 'old', screenshots_dir, age=300)
+    _put(cache, 'used', screenshots_dir, age=200)
+    assert sorted(os.listdir(cache.cache_dir)) == ['old', 'used']
+
+    # 命中刷新最近使用时间
+    assert cache.get('used', 'teacher.mp4', str(tmp_path / 'out')) is not None
+
+    cache.max_bytes = SCREENSHOT_BYTES * 2.5
+    _put(cache, 'new', screenshots_dir, age=0)
+    assert sorted(os.listdir(cache.cache_dir)) == ['new', 'used']
+    assert cache.get('old', 'teacher.mp4', str(tmp_path / 'out')) is None
+
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""多尺度模板匹配：金字塔模式、FFT后端与全分辨率穷举搜索的结果一致"""
+
+import pytest
+
+from analysis_context import AnalysisContext
+from conftest import PART_BOXES
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+
+def _analyzer(part_dir, **kwargs):
+    return MichelsonInterferometerAnalyzer(context=AnalysisContext(template_dir=str(part_dir)), **kwargs)
+
+
+@pytest.mark.parametrize('options', [
+    {'match_mode': 'pyramid'},
+    {'match_mode': 'pyramid', 'pyramid_levels': 1},
+    {'match_backend': 'fft'},
+    {'match_mode': 'pyramid', 'match_backend': 'fft'},
+])
+def test_matches_exhaustive_search(part_dir, scene, options):
+    exhaustive = _analyzer(part_dir)
+    analyzer = _analyzer(part_dir, **options)
+
+    for index, (x1, y1, _, _) in enumerate(PART_BOXES, start=1):
+        entry = analyzer.template_store.get(str(part_dir / f'part{index}.png'))
+        expected = exhaustive.multi_scale_template_matching(scene, entry['template'])
+        match = analyzer.multi_scale_template_matching(scene, entry['template'], template_pyramid=entry['pyramid'])
+
+        # 模板含红框边线，最佳位置在部件框左上角附近
+        assert abs(expected['location'][0] - (x1 - 1)) <= 2 and abs(expected['location'][1] - (y1 - 1)) <= 2
+        assert (match['location'], match['size'], match['scale'], match['method']) == \
+            (expected['location'], expected['size'], expected['scale'], expected['method'])
+        assert match['score'] == pytest.approx(expected['score'], abs=1e-4)
+
+
+def test_shared_frame_context(part_dir, scene):
+    """整帧共享的金字塔和相关器与单独匹配的结果相同"""
+    analyzer = _analyzer(part_dir, match_mode='pyramid', match_backend='fft')
+    part_paths = analyzer.component_part_paths()
+    frame_ctx = analyzer.prepare_frame_context(scene, part_paths)
+
+    for part_path in part_paths:
+        entry = analyzer.template_store.get(part_path)
+        shared = analyzer.multi_scale_template_matching(
+            scene, entry['template'], template_pyramid=entry['pyramid'],
+            target_pyramid=frame_ctx['target_pyramid'], target_correlators=frame_ctx['target_correlators']
+        )
+        assert shared == analyzer.multi_scale_template_matching(scene, entry['template'],
+                                                                template_pyramid=entry['pyramid'])
+
+
+def test_unknown_match_mode():
+    with pytest.raises(ValueError):
+        MichelsonInterferometerAnalyzer(match_mode='greedy')
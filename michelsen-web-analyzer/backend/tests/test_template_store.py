@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""部件模板仓库：与直接提取的模板一致，磁盘缓存按内容哈希复用和失效"""
+
+import cv2
+import numpy as np
+
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+from template_store import TemplateStore
+
+
+class CountingExtractor:
+    """记录调用次数的模板提取函数"""
+
+    def __init__(self):
+        self.extract = MichelsonInterferometerAnalyzer().extract_template_improved
+        self.calls = 0
+
+    def __call__(self, labeled_img):
+        self.calls += 1
+        return self.extract(labeled_img)
+
+
+def _assert_same_entry(entry, expected):
+    assert entry['bbox'] == expected['bbox']
+    assert entry['hash'] == expected['hash']
+    assert np.array_equal(entry['template'], expected['template'])
+    assert np.array_equal(entry['gray'], expected['gray'])
+    assert len(entry['pyramid']) == len(expected['pyramid'])
+    for level, expected_level in zip(entry['pyramid'], expected['pyramid']):
+        assert np.array_equal(level, expected_level)
+    assert np.array_equal(entry['descriptors'], expected['descriptors'])
+    assert [kp.pt for kp in entry['keypoints']] == [kp.pt for kp in expected['keypoints']]
+
+
+def test_matches_direct_extraction(part_dir):
+    part_path = str(part_dir / 'part1.png')
+    extractor = CountingExtractor()
+    entry = TemplateStore(extractor, use_disk_cache=False).get(part_path)
+
+    template, bbox = extractor.extract(cv2.imread(part_path))
+    assert entry['bbox'] == tuple(bbox)
+    assert np.array_equal(entry['template'], template)
+
+
+def test_disk_cache(part_dir, tmp_path):
+    part_path = str(part_dir / 'part1.png')
+    cache_dir = str(tmp_path / 'cache')
+
+    extractor = CountingExtractor()
+    store = TemplateStore(extractor, cache_dir=cache_dir)
+    first = store.get(part_path)
+    assert store.get(part_path) is first
+    assert extractor.calls == 1
+
+    # 新进程（新仓库实例）直接读取磁盘缓存，不再提取
+    reloaded_extractor = CountingExtractor()
+    reloaded = TemplateStore(reloaded_extractor, cache_dir=cache_dir).get(part_path)
+    assert reloaded_extractor.calls == 0
+    _assert_same_entry(reloaded, first)
+
+    # 标注图片内容变化后哈希不同，重新提取
+    cv2.imwrite(part_path, cv2.imread(str(part_dir / 'part2.png')))
+    changed_extractor = CountingExtractor()
+    changed = TemplateStore(changed_extractor, cache_dir=cache_dir).get(part_path)
+    assert changed_extractor.calls == 1
+    assert changed['hash'] != first['hash']
+    assert changed['bbox'] != first['bbox']
+
+
+def test_missing_file(tmp_path):
+    assert TemplateStore(CountingExtractor()).get(str(tmp_path / 'missing.png')) is None
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分块上传会话：偏移量、大小限制、续传与写盘缓冲"""
+
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from api.routers.upload import UploadSessionRequest
+from services import upload_service
+from services.upload_service import (
+    UploadOffsetError,
+    UploadSessionNotFoundError,
+    UploadSessionStore,
+    UploadTooLargeError,
+    _write_stream,
+)
+
+DATA = bytes(range(256)) * 40  # 10240 字节
+
+
+async def _chunks(data: bytes, size: int = 100):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _append(store, upload_id, offset, data, size=100):
+    return asyncio.run(store.append(upload_id, offset, _chunks(data, size)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadSessionStore(str(tmp_path / 'sessions'))
+
+
+@pytest.fixture
+def session(store, tmp_path):
+    return store.create(str(tmp_path / 'videos' / 'student.mp4'), len(DATA), metadata={'video_type': 'student'})
+
+
+def test_resumable_upload(store, session, tmp_path):
+    upload_id = session['upload_id']
+    assert session['offset'] == 0
+
+    status = _append(store, upload_id, 0, DATA[:4000])
+    assert status['offset'] == 4000 and not status['complete']
+    assert store.status(upload_id)['offset'] == 4000
+
+    # 模拟换一个工作进程续传：内存中没有哈希状态，需从 .part 文件重新计算
+    store._digests.clear()
+    result = _append(store, upload_id, 4000, DATA[4000:])
+    assert result['complete']
+    assert result['size'] == len(DATA)
+    assert result['sha256'] == hashlib.sha256(DATA).hexdigest()
+    with open(result['target_path'], 'rb') as f:
+        assert f.read() == DATA
+    assert os.listdir(store.sessions_dir) == []
+    with pytest.raises(UploadSessionNotFoundError):
+        store.status(upload_id)
+
+
+def test_offset_mismatch(store, session):
+    upload_id = session['upload_id']
+    _append(store, upload_id, 0, DATA[:1000])
+    with pytest.raises(UploadOffsetError) as excinfo:
+        _append(store, upload_id, 500, DATA[500:2000])
+    assert excinfo.value.expected_offset == 1000
+    assert store.status(upload_id)['offset'] == 1000
+
+
+def test_data_beyond_declared_size_is_rejected(store, session):
+    upload_id = session['upload_id']
+    _append(store, upload_id, 0, DATA[:1000])
+    with pytest.raises(UploadTooLargeError):
+        _append(store, upload_id, 1000, DATA[1000:] + b'extra')
+    # 超出部分不保留，可从原偏移量重试
+    assert store.status(upload_id)['offset'] == 1000
+    assert _append(store, upload_id, 1000, DATA[1000:])['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_session_larger_than_limit(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_service.settings, 'max_file_size', 100)
+    with pytest.raises(UploadTooLargeError):
+        store.create(str(tmp_path / 'student.mp4'), 101)
+
+
+@pytest.mark.parametrize('total_size', [0, -1])
+def test_session_without_content(store, tmp_path, total_size):
+    with pytest.raises(ValueError):
+        store.create(str(tmp_path / 'student.mp4'), total_size)
+    with pytest.raises(ValidationError):
+        UploadSessionRequest(video_type='student', filename='student.mp4', total_size=total_size)
+
+
+def test_unknown_session(store):
+    with pytest.raises(UploadSessionNotFoundError):
+        _append(store, 'missing', 0, DATA)
+
+
+@pytest.mark.skipif(upload_service.fcntl is None, reason="需要 fcntl")
+def test_concurrent_writer_in_another_process(store, session):
+    upload_id = session['upload_id']
+    fcntl = upload_service.fcntl
+    # flock按打开的文件互斥，单独打开的锁文件等同于另一进程持有会话锁
+    with open(store._lock_path(upload_id), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        with pytest.raises(UploadOffsetError):
+            _append(store, upload_id, 0, DATA)
+    assert _append(store, upload_id, 0, DATA)['complete']
+
+
+class _CountingFile(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def test_small_chunks_are_buffered():
+    target = _CountingFile()
+    digest = hashlib.sha256()
+    size = asyncio.run(_write_stream(_chunks(DATA, 100), target, digest, 0, len(DATA), buffer_size=4096))
+    assert size == len(DATA)
+    assert target.getvalue() == DATA
+    assert digest.hexdigest() == hashlib.sha256(DATA).hexdigest()
+    # 10240字节按4096缓冲：4100、4100、余下2040
+    assert target.writes == 3
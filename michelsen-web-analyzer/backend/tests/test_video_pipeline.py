@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""整段视频分析：解码/检测进程流水线与串行逐帧分析的结果一致，进程出错时报告错误"""
+
+import cv2
+import numpy as np
+import pytest
+
+from analysis_context import AnalysisContext
+from experiment_analyzer_prototype import MichelsonInterferometerAnalyzer
+
+FPS = 1.0
+
+
+@pytest.fixture
+def video(write_video, scene):
+    """33秒的合成视频（关键帧间隔15秒：t=0/15/30），画面每秒平移1像素，各关键帧可区分"""
+    frames = []
+    for second in range(33):
+        matrix = np.float32([[1, 0, second], [0, 1, 0]])
+        frames.append(cv2.warpAffine(scene, matrix, (scene.shape[1], scene.shape[0]), borderMode=cv2.BORDER_REFLECT))
+    return write_video(frames, fps=FPS)
+
+
+def _analyzer(part_dir, events=None):
+    return MichelsonInterferometerAnalyzer(context=AnalysisContext(template_dir=str(part_dir)),
+                                           progress_hook=events.append if events is not None else None)
+
+
+def test_pipeline_matches_serial(part_dir, video):
+    serial = _analyzer(part_dir).analyze_video(video, workers=1)
+    events = []
+    analyzer = _analyzer(part_dir, events)
+    pipelined = analyzer.analyze_video(video, workers=2)
+
+    assert [frame['timestamp'] for frame in pipelined['key_frames']] == [0, 15, 30]
+    assert pipelined['total_frames_analyzed'] == serial['total_frames_analyzed'] == 3
+    assert sorted(pipelined['steps_detected']) == sorted(serial['steps_detected'])
+    for frame, expected in zip(pipelined['key_frames'], serial['key_frames']):
+        assert frame['frame_number'] == expected['frame_number']
+        assert np.array_equal(frame['frame'], expected['frame'])
+        assert frame['analysis'] == expected['analysis']
+
+    # 主进程按完成顺序报告进度，并合并子进程的耗时直方图
+    key_frame_events = [event for event in events if event['stage'] == 'key_frames']
+    assert [event['current'] for event in key_frame_events] == [1, 2, 3]
+    assert analyzer.progress['frames_decoded'] == 3
+    timings = analyzer.timings.snapshot()
+    assert timings['decode_frame']['count'] == 3
+    assert timings['detect_equipment_in_frame']['count'] == 3
+
+
+def test_pipeline_without_frames(part_dir, video):
+    result = _analyzer(part_dir).analyze_video(video, workers=2, keep_frames=False)
+    assert all(frame['frame'] is None for frame in result['key_frames'])
+    assert all(frame['analysis'] is not None for frame in result['key_frames'])
+
+
+def test_pipeline_reports_decode_error(part_dir, tmp_path):
+    missing = str(tmp_path / 'missing.avi')
+    with pytest.raises(RuntimeError, match=f"流水线分析失败: 无法打开视频: {missing}"):
+        _analyzer(part_dir).analyze_video(missing, workers=2)
+
+
+def test_serial_reports_decode_error(part_dir, tmp_path):
+    with pytest.raises(ValueError, match="无法打开视频文件"):
+        _analyzer(part_dir).analyze_video(str(tmp_path / 'missing.avi'), workers=1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""视频分段传输：Range解析与响应状态码"""
+
+import pytest
+
+from services.video_streaming import build_video_response, parse_range
+
+FILE_SIZE = 1000
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-99', (0, 99)),
+    ('bytes=500-', (500, 999)),
+    ('bytes=900-5000', (900, 999)),
+    ('bytes=-100', (900, 999)),
+    ('bytes=-5000', (0, 999)),
+    ('bytes=10-10', (10, 10)),
+    ('Bytes = 1-2', (1, 2)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, FILE_SIZE) == expected
+
+
+@pytest.mark.parametrize('header', [
+    'bytes=500-100',  # 结束位置小于起始位置
+    'bytes=0-10,20-30',  # 多段范围
+    'bytes=abc-def',
+    'bytes=5-abc',
+    'bytes=+5-10',
+    'bytes=-',
+    'bytes=10',
+    'items=0-10',
+])
+def test_invalid_ranges_are_ignored(header):
+    assert parse_range(header, FILE_SIZE) is None
+
+
+@pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=2000-3000', 'bytes=-0'])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, FILE_SIZE)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(bytes(range(256)) * 4)
+    return str(path)
+
+
+@pytest.mark.parametrize('header, status, length', [
+    ('bytes=0-99', 206, '100'),
+    ('bytes=500-100', 200, '1024'),
+    ('bytes=5000-', 416, '0'),
+])
+def test_response_status(video, header, status, length):
+    response = build_video_response(video, {'range': header})
+    assert response.status_code == status
+    assert response.headers.get('content-length') == length
+    if status == 416:
+        assert response.headers['content-range'] == 'bytes */1024'
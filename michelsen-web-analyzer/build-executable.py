@@ -54,7 +54,6 @@ hiddenimports = [
     'cv2',
     'numpy',
     'PIL',
-    'matplotlib',
     'imageio',
     'skimage',
     'anthropic',
@@ -159,7 +159,7 @@ if [ $? -ne 0 ]; then
 fi
 
 # 创建必要目录
-mkdir -p uploads static/screenshots static/videos static/images static/reports
+mkdir -p uploads static/videos
 
 # 启动服务器
 echo
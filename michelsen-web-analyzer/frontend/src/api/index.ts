@@ -73,7 +73,12 @@ export const analysisApi = {
     return response.data
   },
 
-  // 获取分析进度
+  // 分析进度推送（Server-Sent Events）地址，事件类型: status / step / progress
+  getProgressStreamUrl: (analysisId: string): string => {
+    return `/api/analysis/progress/${analysisId}/stream`
+  },
+
+  // 获取分析进度（轮询，SSE 不可用时使用）
   getProgress: async (analysisId: string): Promise<AnalysisProgress> => {
     const response = await api.get<AnalysisProgress>(`/analysis/progress/${analysisId}`)
     return response.data
@@ -85,9 +90,13 @@ export const analysisApi = {
     return response.data
   },
 
-  // 获取截图 URL
-  getScreenshotUrl: (filename: string): string => {
-    return `/api/analysis/screenshots/${filename}`
+  // 获取截图 URL（size: 显示宽度，不传时为原图；revision: 截图修订号，用于浏览器长期缓存）
+  getScreenshotUrl: (analysisId: string, filename: string, revision?: string, size?: number): string => {
+    const params = new URLSearchParams()
+    if (size) params.set('size', String(size))
+    if (revision) params.set('v', revision)
+    const query = params.toString()
+    return `/api/analysis/screenshots/${analysisId}/${filename}${query ? `?${query}` : ''}`
   },
 
   // 获取分析列表
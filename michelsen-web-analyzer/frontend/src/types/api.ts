@@ -38,6 +38,7 @@ export interface AnalysisProgress {
   status: 'running' | 'completed' | 'error';
   progress: number;
   current_step: string;
+  eta_seconds?: number | null;
   include_device_detection: boolean;
   created_at: string;
   error?: string;
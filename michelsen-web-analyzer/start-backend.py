@@ -42,7 +42,7 @@ def main():
     os.chdir(backend_dir)
     
     # 创建必要的目录
-    for directory in ["uploads", "static", "static/screenshots", "static/videos"]:
+    for directory in ["uploads", "static", "static/videos"]:
         Path(directory).mkdir(parents=True, exist_ok=True)
     
     print(f"🌐 正在启动服务器: http://localhost:8080")